@@ -1,16 +1,16 @@
-import gspread
 import pandas as pd
 import keyboard
 import pyperclip
-import time
 import os
 import sys
-from google.oauth2.service_account import Credentials
+import threading
 
 # 세특 프로젝트 경로 추가 및 설정 로드
 sys.path.append(os.path.join(os.getcwd(), '세특'))
 try:
-    from seteuk_config import SERVICE_ACCOUNT_FILE, SPREADSHEET_ID
+    from seteuk_config import SPREADSHEET_ID, RESULT_SHEET
+    from sheet_snapshot import get_shared_snapshot, RESULT_KEY
+    from clients import get_shared_clients
 except ImportError:
     print("❌ 세특 설정을 찾을 수 없습니다. 경로를 확인해주세요.")
     sys.exit()
@@ -23,144 +23,219 @@ MODES = [
     {"key": "behavior",   "name": "행발종합(F열)", "col_idx": 5}
 ]
 
-def load_sheet_data():
+def parse_students(data):
+    students = []
+    for row in data[1:]:
+        if len(row) < 2 or not row[1].strip(): continue # 이름 없으면 스킵
+        student_data = {'name': row[1]}
+        for mode in MODES:
+            try:
+                content = row[mode["col_idx"]]
+                student_data[mode["key"]] = str(content).strip()
+            except IndexError:
+                student_data[mode["key"]] = ""
+        students.append(student_data)
+    return students
+
+def load_sheet_data(offline=False):
+    """결과 탭 로드 (시트가 바뀌지 않았으면 로컬 스냅샷 사용, offline 이면 API 호출 없이 스냅샷만 사용)"""
+    snapshot = get_shared_snapshot()
+    if offline:
+        data = snapshot.load_offline(SPREADSHEET_ID, RESULT_KEY)
+        if data is not None:
+            print("💾 저장된 스냅샷으로 시작합니다. (F10 으로 시트 새로고침)")
+            return parse_students(data)
+        print("⚠️ 저장된 스냅샷이 없어 시트에서 불러옵니다.")
+
     print("🌐 구글 스프레드시트에서 데이터를 가져오는 중...")
     try:
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-        client = gspread.authorize(creds)
-        sh = client.open_by_key(SPREADSHEET_ID)
-        
-        # '세특최종결과물' 탭 읽기 (또는 적절한 탭 이름)
-        ws = sh.worksheet("세특최종결과물")
-        data = ws.get_all_values()
-        
-        headers = data[0]
-        rows = data[1:]
-        
-        students = []
-        for row in rows:
-            if not row[1].strip(): continue # 이름 없으면 스킵
-            student_data = {'name': row[1]}
-            for mode in MODES:
-                try:
-                    content = row[mode["col_idx"]]
-                    student_data[mode["key"]] = str(content).strip()
-                except IndexError:
-                    student_data[mode["key"]] = ""
-            students.append(student_data)
-        return students
+        # 공용 등록부: F10 새로고침 시 인증/연결을 재사용 (토큰은 만료 전 자동 갱신)
+        clients = get_shared_clients()
+        client = clients.sheets()
+
+        # 스냅샷이 오래된 경우에만 시트를 열어 결과 탭 전체를 읽음
+        def fetch():
+            return clients.spreadsheet(SPREADSHEET_ID).worksheet(RESULT_SHEET).get_all_values()
+
+        data, from_snapshot = snapshot.load(client, SPREADSHEET_ID, RESULT_KEY, fetch)
+        if from_snapshot:
+            print("💾 시트 변경 없음: 로컬 스냅샷을 사용합니다.")
+        return parse_students(data)
     except Exception as e:
         print(f"❌ 데이터 로드 오류: {e}")
+        data = snapshot.load_offline(SPREADSHEET_ID, RESULT_KEY)
+        if data is not None:
+            print("💾 마지막 스냅샷으로 대신 시작합니다.")
+            return parse_students(data)
         return []
 
-def wait_key_release(key_name):
-    while keyboard.is_pressed(key_name):
-        time.sleep(0.05)
-    time.sleep(0.1)
+class Roster:
+    """학생 목록 + 이름→위치 색인 (새로고침 시 두 값을 한 번에 교체하여 읽는 쪽은 잠금 없이 일관된 쌍을 봄)"""
+
+    def __init__(self, students):
+        self.data = self._build(students)
+
+    @staticmethod
+    def _build(students):
+        index = {}
+        for i, s in enumerate(students):
+            index.setdefault(s['name'], i)  # 동명이인은 기존 순차 검색처럼 첫 학생
+        return students, index
+
+    def swap(self, students):
+        self.data = self._build(students)
+
+    def find(self, name):
+        return self.data[1].get(name)
+
+
+class Helper:
+    """단축키 콜백으로 동작하는 나이스 입력 도우미 (키 입력이 없으면 메인 스레드는 종료 이벤트만 대기)"""
+
+    def __init__(self, students):
+        self.roster = Roster(students)
+        self.mode_idx = 0
+        self.idx = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.held = set()
+        self.refreshing = threading.Event()
+
+    @property
+    def students(self):
+        return self.roster.data[0]
+
+    @property
+    def mode(self):
+        return MODES[self.mode_idx]
+
+    def bind(self, hotkey, key, action):
+        """hotkey 누름마다 action 실행 (키를 누르고 있는 동안의 자동 반복은 무시, key 를 떼면 다시 허용)"""
+        def on_press():
+            with self.lock:
+                if key in self.held:
+                    return
+                self.held.add(key)
+                action()
+
+        keyboard.add_hotkey(hotkey, on_press)
+        keyboard.on_release_key(key, lambda e: self.held.discard(key))
+
+    def paste_next(self):
+        students = self.students
+        if self.idx < len(students):
+            student = students[self.idx]
+            content = student[self.mode["key"]]
+
+            if content:
+                pyperclip.copy(content)
+                keyboard.press_and_release('ctrl+v')
+                print(f" ✅ [입력 성공] {student['name']}")
+            else:
+                print(f" ⚠️ [건너뜀] {student['name']} (내용 없음)")
+
+            # 다음 학생으로 이동
+            if self.idx < len(students) - 1:
+                self.idx += 1
+                print(f" ⏩ 다음 학생: {students[self.idx]['name']}")
+            else:
+                print(f" 🎉 [{self.mode['name']}] 마지막 학생입니다!")
+
+    def search(self):
+        search_name = pyperclip.paste().strip()
+        i = self.roster.find(search_name)
+        if i is None:
+            print(f"\n❌ 검색 실패: '{search_name}' 학생을 찾을 수 없습니다.")
+            return
+        self.idx = i
+        print(f"\n🎯 검색 성공: [{search_name}] 학생으로 이동했습니다.")
+
+    def refresh(self):
+        """백그라운드 새로고침 시작 (불러오는 동안에도 붙여넣기/이동은 이전 데이터로 계속 동작)"""
+        if self.refreshing.is_set():
+            print("\n⏳ 이미 새로고침 중입니다.")
+            return
+        self.refreshing.set()
+        print("\n🔄 데이터를 백그라운드에서 새로고침합니다...")
+        threading.Thread(target=self._refresh, name="neis-refresh", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            students = load_sheet_data()
+            if not students:
+                print("⚠️ 새로 불러온 데이터가 없어 기존 데이터를 유지합니다.")
+                return
+            with self.lock:
+                # 보던 학생이 새 목록에도 있으면 그 위치로, 없으면 범위 안으로 보정
+                current = self.students[self.idx]['name'] if self.idx < len(self.students) else None
+                self.roster.swap(students)
+                i = self.roster.find(current)
+                self.idx = i if i is not None else min(self.idx, len(students) - 1)
+            print(f"✅ {len(students)}명의 데이터를 다시 불러왔습니다. (현재 학생: {self.students[self.idx]['name']})")
+        finally:
+            self.refreshing.clear()
+
+    def home(self):
+        self.idx = 0
+        print(f"\n🏠 처음으로 이동: {self.students[self.idx]['name']}")
+
+    def change_mode(self, step):
+        self.mode_idx = (self.mode_idx + step) % len(MODES)
+        print(f"\n{'👉' if step > 0 else '👈'} 모드 변경: [ {self.mode['name']} ]")
+
+    def move(self, step):
+        i = self.idx + step
+        if 0 <= i < len(self.students):
+            self.idx = i
+            print(f" {'⬇ [아래]' if step > 0 else '⬆ [위]'} {self.students[self.idx]['name']}")
+
+    def quit(self):
+        print("\n👋 프로그램을 종료합니다.")
+        self.stop.set()
+
+    def run(self):
+        self.bind('f9', 'f9', self.paste_next)
+        self.bind('f10', 'f10', self.refresh)
+        self.bind('f7', 'f7', self.search)
+        self.bind('ctrl+home', 'home', self.home)
+        self.bind('ctrl+right', 'right', lambda: self.change_mode(1))
+        self.bind('ctrl+left', 'left', lambda: self.change_mode(-1))
+        self.bind('ctrl+down', 'down', lambda: self.move(1))
+        self.bind('ctrl+up', 'up', lambda: self.move(-1))
+        self.bind('esc', 'esc', self.quit)
+        try:
+            # 키 입력은 keyboard 후킹 스레드가 콜백으로 처리하므로 메인 스레드는 폴링 없이 대기
+            while not self.stop.wait(1.0):
+                pass
+        finally:
+            keyboard.unhook_all()
 
 def main():
-    students = load_sheet_data()
+    # --offline: 시트 API 가 느리거나 불안정할 때 마지막 스냅샷으로 바로 시작
+    students = load_sheet_data(offline="--offline" in sys.argv)
     if not students:
         print("❌ 표시할 학생 데이터가 없습니다.")
         return
 
-    current_mode_idx = 0
-    current_idx = 0
-    current_mode = MODES[current_mode_idx]
-    
+    helper = Helper(students)
+
     os.system('cls' if os.name == 'nt' else 'clear')
     print("="*60)
     print(f" 🚀 [Modern NEIS Helper] 구글 시트 연동 모드")
     print(f" 🔗 연결된 시트: {SPREADSHEET_ID}")
     print("="*60)
     print(" ● [     F9     ] : 붙여넣기 + 다음 유효 학생 이동")
-    print(" ● [     F10    ] : 구글 시트 데이터 새로고침")
+    print(" ● [     F10    ] : 구글 시트 데이터 새로고침 (백그라운드)")
     print(" ● [     F7     ] : 클립보드 이름으로 학생 검색")
     print(" ↕ [ Ctrl + ↑/↓ ] : 수동 학생 변경")
     print(" ↔ [ Ctrl + ←/→ ] : 입력 항목 변경 (교과/진로/자율/행발)")
     print(" 🏠 [ Ctrl+Home  ] : 맨 처음으로")
     print(" ❌ [     ESC    ] : 종료")
     print("="*60)
-    print(f" ✨ 현재 모드: [{current_mode['name']}]")
-    print(f" 👤 현재 학생: [{students[current_idx]['name']}]")
-
-    while True:
-        time.sleep(0.01)
-
-        if keyboard.is_pressed('esc'):
-            print("\n👋 프로그램을 종료합니다.")
-            break
-            
-        elif keyboard.is_pressed('f10'):
-            print("\n🔄 데이터를 새로고침합니다...")
-            students = load_sheet_data()
-            print(f"✅ {len(students)}명의 데이터를 다시 불러왔습니다.")
-            wait_key_release('f10')
-
-        elif keyboard.is_pressed('f7'):
-            search_name = pyperclip.paste().strip()
-            found = False
-            for i, s in enumerate(students):
-                if s['name'] == search_name:
-                    current_idx = i
-                    found = True
-                    print(f"\n🎯 검색 성공: [{s['name']}] 학생으로 이동했습니다.")
-                    break
-            if not found:
-                print(f"\n❌ 검색 실패: '{search_name}' 학생을 찾을 수 없습니다.")
-            wait_key_release('f7')
-
-        elif keyboard.is_pressed('ctrl+home'):
-            current_idx = 0
-            print(f"\n🏠 처음으로 이동: {students[current_idx]['name']}")
-            wait_key_release('home')
-
-        elif keyboard.is_pressed('ctrl+right'):
-            current_mode_idx = (current_mode_idx + 1) % len(MODES)
-            current_mode = MODES[current_mode_idx]
-            print(f"
-👉 모드 변경: [ {current_mode['name']} ]")
-            wait_key_release('right')
-
-        elif keyboard.is_pressed('ctrl+left'):
-            current_mode_idx = (current_mode_idx - 1) % len(MODES)
-            current_mode = MODES[current_mode_idx]
-            print(f"
-👈 모드 변경: [ {current_mode['name']} ]")
-            wait_key_release('left')
-
-        elif keyboard.is_pressed('f9'):
-            if current_idx < len(students):
-                student = students[current_idx]
-                content = student[current_mode["key"]]
-                
-                if content:
-                    pyperclip.copy(content)
-                    keyboard.press_and_release('ctrl+v')
-                    print(f" ✅ [입력 성공] {student['name']}")
-                else:
-                    print(f" ⚠️ [건너뜀] {student['name']} (내용 없음)")
-                
-                # 다음 학생으로 이동
-                if current_idx < len(students) - 1:
-                    current_idx += 1
-                    print(f" ⏩ 다음 학생: {students[current_idx]['name']}")
-                else:
-                    print(f" 🎉 [{current_mode['name']}] 마지막 학생입니다!")
-            wait_key_release('f9')
-
-        elif keyboard.is_pressed('ctrl+down'):
-            if current_idx < len(students) - 1:
-                current_idx += 1
-                print(f" ⬇ [아래] {students[current_idx]['name']}")
-            wait_key_release('down')
-
-        elif keyboard.is_pressed('ctrl+up'):
-            if current_idx > 0:
-                current_idx -= 1
-                print(f" ⬆ [위] {students[current_idx]['name']}")
-            wait_key_release('up')
+    print(f" ✨ 현재 모드: [{helper.mode['name']}]")
+    print(f" 👤 현재 학생: [{students[0]['name']}]")
+
+    helper.run()
 
 if __name__ == "__main__":
     main()
@@ -1,29 +1,90 @@
+import time
+_T_START = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import json
 import os
-from seteuk_core import SeteukEngine
-from homeroom_engine import HomeroomEngine
-from seteuk_config import INPUT_CSV, SPREADSHEET_ID, SERVICE_ACCOUNT_FILE
+from seteuk_config import INPUT_CSV, SPREADSHEET_ID, NEIS_BYTE_LIMITS, USE_OBSERVATION_STORE
 from keywords_config import KEYWORD_LIBRARY
-from st_aggrid import AgGrid, GridOptionsBuilder
-import gspread
-from google.oauth2.service_account import Credentials
+from homeroom_config import HOMEROOM_SHEET_MAP
+from sheet_snapshot import load_tabs
+from quicklog_queue import get_shared_quicklog, append_csv_row
+from observation_store import get_shared_store, HEADERS as OBS_HEADERS
+from run_journal import RunJournal, latest_run_id
+from metrics import get_shared_metrics, latest_report
+from near_duplicates import check_near_duplicates, describe, update_near_duplicates
+import text_rules
+from neis_bytes import neis_bytes as get_neis_bytes, byte_report, over_budget, SECTION_LABELS
 
 import random
 
-def get_neis_bytes(text):
-    """나이스(NEIS) 기준 바이트 계산 (한글 3바이트, 나머지 1바이트)"""
-    if not text: return 0
-    count = 0
-    for char in text:
-        if ord(char) > 127:
-            count += 3
-        elif char == '\n': # 줄바꿈 처리
-            count += 2
-        else:
-            count += 1
-    return count
+# google.genai / gspread / st_aggrid 및 엔진 모듈은 해당 화면이나 버튼에서 처음 필요할 때 불러옴
+_T_IMPORTS = time.perf_counter()
+
+@st.cache_resource
+def get_course_engine():
+    """교과 엔진 (프로세스당 1회 생성, 버튼을 누를 때마다 인증/환경 로드를 반복하지 않음)"""
+    from seteuk_core import SeteukEngine
+    return SeteukEngine()
+
+@st.cache_resource
+def get_home_engine():
+    """담임 엔진 (프로세스당 1회 생성)"""
+    from homeroom_engine import HomeroomEngine
+    return HomeroomEngine()
+
+@st.cache_data(ttl=60)
+def get_home_data():
+    """담임 영역 학급 데이터 (단일 영역 재생성 시 클릭마다 학급 전체를 다시 수집하지 않도록 60초 보관)"""
+    return get_home_engine().collect_all_data()
+
+def get_clients():
+    """공용 클라이언트 등록부 (엔진/퀵 로그가 같은 인증·연결 풀·스프레드시트 핸들 사용)"""
+    from clients import get_shared_clients
+    return get_shared_clients()
+
+@st.cache_resource
+def startup_report():
+    """프로세스 최초 실행(콜드 스타트)의 import / 첫 화면 시간 기록"""
+    return {}
+
+def show_diagnostics(text):
+    """영역 본문 검증 결과 표시 (금지어 위치/분류, '~하였음.' 종결 위반 문장)"""
+    diagnostics = text_rules.validate(text)
+    if diagnostics["prohibited"]:
+        terms = ", ".join(f"{m['term']}({m['category']})" for m in diagnostics["prohibited"])
+        st.warning(f"⚠️ 금지어: {terms}")
+    if diagnostics["bad_endings"]:
+        st.caption("✏️ 종결 어미 확인: " + " / ".join(e["sentence"] for e in diagnostics["bad_endings"]))
+
+def load_observations():
+    """편집 탭용 관찰 기록 표 (저장소 사용 시 행 id 포함)"""
+    if USE_OBSERVATION_STORE:
+        return get_shared_store().to_dataframe()
+    return pd.read_csv(INPUT_CSV, encoding='utf-8-sig')
+
+def save_observation(record):
+    """관찰 기록 1행 추가 (저장소 또는 CSV 끝에 추가, 파일 전체를 다시 쓰지 않음)"""
+    if USE_OBSERVATION_STORE:
+        get_shared_store().append(record)
+    elif os.path.exists(INPUT_CSV):
+        append_csv_row(record)
+
+def save_edited_observations(original_df, edited_df):
+    """편집 표와 원본을 id 기준으로 비교하여 바뀐 행만 저장소에 반영 (반환: 반영 행 수)"""
+    store = get_shared_store()
+    original = {int(r["id"]): r for r in original_df.fillna("").to_dict('records')}
+    edited = {int(r["id"]): r for r in edited_df.fillna("").to_dict('records') if str(r.get("id", "")) != ""}
+    changed = 0
+    for row_id, row in edited.items():
+        before = original.get(row_id)
+        if before is None:
+            continue
+        diff = {h: row.get(h, "") for h in OBS_HEADERS if str(row.get(h, "")) != str(before.get(h, ""))}
+        if diff and store.update(row_id, diff):
+            changed += 1
+    return changed
 
 # 지루함 방지용 메시지 풀
 WAITING_MESSAGES = [
@@ -36,6 +97,84 @@ WAITING_MESSAGES = [
     "🔍 생성된 문장에 대학교 이름이나 부모님 직업이 포함되지 않도록 한 번 더 확인해 주세요!"
 ]
 
+def run_pipeline(bypass_cache, run_id=None):
+    """전처리 → 교과 생성 → 담임 수집/생성 → 통합 (run_id 를 주면 해당 실행 이어하기)"""
+    status_container = st.container()
+    with status_container:
+        with st.status("🛠️ AI 생기부 생성 시스템 가동 중...", expanded=True) as status:
+            course_engine = get_course_engine()
+            home_engine = get_home_engine()
+            metrics = get_shared_metrics()
+            metrics.reset()
+            # 실행 기록부 (학생/영역 단위로 즉시 기록, 이어하기 시 완료 단위 건너뜀)
+            journal = RunJournal(run_id)
+            if run_id:
+                st.write(f"⏯️ 실행 [{run_id}] 이어하기: 완료 단위 {len(journal.completed())}개 복원")
+            
+            # 1. 교과 데이터 전처리
+            try:
+                st.write("📂 교과 데이터 전처리 중...")
+                metrics.stage("preprocess")
+                course_engine.preprocess()
+            except Exception as e:
+                st.error(f"전처리 중 오류 발생: {e}")
+                st.stop()
+            
+            # 2. 교과 세특 생성
+            st.write("🧬 교과 세특 AI 생성 중...")
+            metrics.stage("course")
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            course_results = {}
+            only = None if bypass_cache else course_engine.dirty_students
+            if only is not None:
+                st.write(f"🔎 관찰 기록 변경 학생 {len(only)}명만 새로 생성합니다.")
+            for prog, name, current_results in course_engine.generate_course_seteuk(bypass_cache=bypass_cache, only=only, journal=journal):
+                status_text.info(f"✨ [{name}] 학생 생성 중... \n\n {random.choice(WAITING_MESSAGES)}")
+                progress_bar.progress(prog)
+                course_results = current_results
+            
+            # 3. 담임 영역 데이터 수집
+            st.write("📥 구글 시트에서 담임 영역 데이터 수집 중...")
+            metrics.stage("homeroom")
+            home_data = home_engine.collect_all_data()
+            
+            # 4. 담임 영역 생성
+            st.write("🏠 진로/자율/행종 AI 생성 중...")
+            progress_bar_home = st.progress(0)
+            status_text_home = st.empty()
+            home_results = {}
+            for prog, name, current_results in home_engine.generate_homeroom_sections(home_data, bypass_cache=bypass_cache, journal=journal):
+                status_text_home.info(f"🏠 [{name}] 학생 생성 중... \n\n {random.choice(WAITING_MESSAGES)}")
+                progress_bar_home.progress(prog)
+                home_results = current_results
+            
+            # 5. 통합 작업
+            st.write("🔄 모든 데이터 통합 및 최종 검증 중...")
+            all_names = set(course_results.keys()) | set(home_results.keys())
+            integrated = {}
+            for name in sorted(all_names):
+                integrated[name] = {
+                    "course": course_results.get(name, ""),
+                    "career": home_results.get(name, {}).get("career", ""),
+                    "autonomous": home_results.get(name, {}).get("autonomous", ""),
+                    "behavior": home_results.get(name, {}).get("behavior", "")
+                }
+            st.session_state.final_results = integrated
+            metrics.stage("near_dup")
+            near_dups = check_near_duplicates(integrated)
+            if near_dups:
+                st.warning(f"⚠️ 학생 간 거의 같은 본문 {len(near_dups)}쌍이 있습니다. 시트 전송 전에 확인하세요.\n\n"
+                           + "\n".join(f"- {describe(p)}" for p in near_dups[:20]))
+            journal.finish()
+            metrics.write_report(journal.run_id)
+            cache_stats = course_engine.cache.stats()
+            st.write(f"💾 응답 캐시: 적중 {cache_stats['hits']}건 / 미스 {cache_stats['misses']}건")
+            status.update(label="✅ 모든 학생 데이터 생성 완료!", state="complete", expanded=False)
+        
+        st.balloons()
+        st.success("데이터 생성이 성공적으로 완료되었습니다!")
+
 # 페이지 설정
 st.set_page_config(page_title="질적 연구 기반 세특 생성기", layout="wide", page_icon="📝")
 
@@ -49,99 +188,56 @@ if 'final_results' not in st.session_state:
 # 사이드바 설정
 with st.sidebar:
     st.header("⚙️ 제어판")
-    if st.button("🚀 전체 시스템 가동", use_container_width=True):
-        status_container = st.container()
-        with status_container:
-            with st.status("🛠️ AI 생기부 생성 시스템 가동 중...", expanded=True) as status:
-                course_engine = SeteukEngine()
-                home_engine = HomeroomEngine()
-                
-                # 1. 교과 데이터 전처리
-                try:
-                    st.write("📂 교과 데이터 전처리 중...")
-                    course_engine.preprocess()
-                except Exception as e:
-                    st.error(f"전처리 중 오류 발생: {e}")
-                    st.stop()
-                
-                # 2. 교과 세특 생성
-                st.write("🧬 교과 세특 AI 생성 중...")
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                course_results = {}
-                for prog, name, current_results in course_engine.generate_course_seteuk():
-                    status_text.info(f"✨ [{name}] 학생 생성 중... \n\n {random.choice(WAITING_MESSAGES)}")
-                    progress_bar.progress(prog)
-                    course_results = current_results
-                
-                # 3. 담임 영역 데이터 수집
-                st.write("📥 구글 시트에서 담임 영역 데이터 수집 중...")
-                home_data = home_engine.collect_all_data()
-                
-                # 4. 담임 영역 생성
-                st.write("🏠 진로/자율/행종 AI 생성 중...")
-                progress_bar_home = st.progress(0)
-                status_text_home = st.empty()
-                home_results = {}
-                for prog, name, current_results in home_engine.generate_homeroom_sections(home_data):
-                    status_text_home.info(f"🏠 [{name}] 학생 생성 중... \n\n {random.choice(WAITING_MESSAGES)}")
-                    progress_bar_home.progress(prog)
-                    home_results = current_results
-                
-                # 5. 통합 작업
-                st.write("🔄 모든 데이터 통합 및 최종 검증 중...")
-                all_names = set(course_results.keys()) | set(home_results.keys())
-                integrated = {}
-                for name in sorted(all_names):
-                    integrated[name] = {
-                        "course": course_results.get(name, ""),
-                        "career": home_results.get(name, {}).get("career", ""),
-                        "autonomous": home_results.get(name, {}).get("autonomous", ""),
-                        "behavior": home_results.get(name, {}).get("behavior", "")
-                    }
-                st.session_state.final_results = integrated
-                status.update(label="✅ 모든 학생 데이터 생성 완료!", state="complete", expanded=False)
-            
-            st.balloons()
-            st.success("데이터 생성이 성공적으로 완료되었습니다!")
+    bypass_cache = st.checkbox("♻️ 캐시 무시하고 전체 재생성", value=False, help="관찰 데이터가 바뀌지 않은 학생도 AI를 다시 호출합니다.")
+    run_clicked = st.button("🚀 전체 시스템 가동", use_container_width=True)
+    last_run_id = latest_run_id()
+    resume_clicked = st.button("⏯️ 마지막 실행 이어하기", use_container_width=True, disabled=last_run_id is None,
+                               help=f"중단된 실행({last_run_id})에서 이미 완료된 학생/영역은 건너뜁니다.")
+    if run_clicked or resume_clicked:
+        run_pipeline(bypass_cache, last_run_id if resume_clicked else None)
 
     if st.button("📤 구글 시트 전송", type="primary", use_container_width=True):
         if not st.session_state.final_results:
             st.error("먼저 시스템을 가동하여 데이터를 생성하세요.")
         else:
             with st.spinner("구글 시트 동기화 중..."):
-                engine = SeteukEngine()
-                engine.sync_all(st.session_state.final_results)
+                get_course_engine().sync_all(st.session_state.final_results)
                 st.success("업로드 완료!")
 
+    if st.button("🔌 연결 상태 점검", use_container_width=True):
+        for service, result in get_clients().health_check(ping=True).items():
+            if result["ok"]:
+                st.success(f"{service}: 정상" + (" (토큰 갱신)" if result.get("token_refreshed") else ""))
+            else:
+                st.error(f"{service}: {result['error']}")
+
     st.markdown("---")
     st.info(f"""📍 연결된 시트 ID:
 `{SPREADSHEET_ID}`""")
 
-# 메인 화면 탭 구성
-tab0, tab1, tab2, tab3 = st.tabs(["⚡ 실시간 퀵 로그", "📊 데이터 대시보드", "📋 관찰 로그(CSV) 편집", "🔍 AI 생성 결과 프리뷰"])
+# 메인 화면 구성 (st.tabs 는 모든 탭 본문을 매번 실행하므로, 선택한 화면만 실행하여 필요한 SDK 만 불러옴)
+VIEWS = ["⚡ 실시간 퀵 로그", "📊 데이터 대시보드", "📋 관찰 로그(CSV) 편집", "🔍 AI 생성 결과 프리뷰"]
+view = st.radio("화면 선택", VIEWS, horizontal=True, label_visibility="collapsed", key="view")
 
-with tab0:
+if view == VIEWS[0]:
     st.subheader("⚡ 실시간 키워드 중심 관찰 기록")
     st.markdown("수업 중이나 활동 직후, 학생의 핵심 행동을 키워드 중심으로 즉시 기록합니다.")
 
-    # 구글 시트 연결 (기록용)
-    @st.cache_resource
-    def get_gspread_client():
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-        return gspread.authorize(creds)
+    # 구글 시트 연결 (기록용, 공용 등록부)
+    client = get_clients().sheets()
+    get_spreadsheet = get_clients().spreadsheet
 
-    client = get_gspread_client()
-    sh = client.open_by_key(SPREADSHEET_ID)
-    
-    # 학생 명단 로드 (캐싱)
-    @st.cache_data(ttl=600)
+    # 시트 기록 대기열 (재시작 전 남은 기록도 백그라운드에서 이어서 반영)
+    quicklog = get_shared_quicklog(get_spreadsheet)
+
+    # 학생 명단 로드 (시트 수정 시각이 같으면 로컬 스냅샷 사용, 메타데이터 1회 조회)
+    @st.cache_data(ttl=60)
     def get_student_names():
         try:
-            ws = sh.worksheet("생기부data")
-            names = ws.col_values(2)[2:] # 3행부터 성명
-            return [n.strip() for n in names if n.strip()]
+            name_map = {"생기부data": {"start_row": HOMEROOM_SHEET_MAP["생기부data"]["start_row"],
+                                     "columns": {"name": HOMEROOM_SHEET_MAP["생기부data"]["columns"]["name"]}}}
+            tabs, _ = load_tabs(client, SPREADSHEET_ID, name_map, get_spreadsheet, prefix="names")
+            return [row["name"].strip() for row in tabs["생기부data"] if row["name"].strip()]
         except:
             return []
 
@@ -182,52 +278,44 @@ with tab0:
             if not selected_keywords and not context_input:
                 st.warning("키워드를 선택하거나 내용을 입력해 주세요.")
             else:
-                with st.spinner(f"{selected_name} 학생 기록 중..."):
-                    try:
-                        # 1. 조합된 텍스트 생성
-                        combined_fact = ", ".join(selected_keywords)
-                        full_entry = f"[{pd.Timestamp.now().strftime('%m/%d')}] {combined_fact}"
-                        if context_input:
-                            full_entry += f" - {context_input}"
-
-                        # 2. 구글 시트 저장 (생기부data 시트)
-                        ws = sh.worksheet("생기부data")
-                        all_names = ws.col_values(2)
-                        try:
-                            row_idx = all_names.index(selected_name) + 1
-                            
-                            # 영역에 따른 컬럼 결정 (과학: 36열(career_raw 대용 혹은 별도), 담임: 42열 등)
-                            # 여기서는 기존 엔진이 사용하는 'career_raw'(36열)와 'behavior_raw'(42열)를 활용
-                            col_idx = 36 if "과학" in selected_domain else 42
-                            
-                            current_val = ws.cell(row_idx, col_idx).value or ""
-                            new_val = (current_val + "\n" + full_entry).strip()
-                            ws.update_cell(row_idx, col_idx, new_val)
-                            
-                            # 3. 교과일 경우 CSV에도 추가 (선택사항)
-                            if "과학" in selected_domain and os.path.exists(INPUT_CSV):
-                                df_logs = pd.read_csv(INPUT_CSV, encoding='utf-8-sig')
-                                new_row = {
-                                    "날짜": pd.Timestamp.now().strftime('%Y-%m-%d'),
-                                    "이름": selected_name,
-                                    "대분류(상황)": selected_category,
-                                    "소분류(활동)": selected_sub_category,
-                                    "구체적 행동(Fact)": context_input if context_input else combined_fact,
-                                    "핵심 키워드": combined_fact,
-                                    "영향/반응": "긍정적 변화",
-                                    "교사 메모": ""
-                                }
-                                df_logs = pd.concat([df_logs, pd.DataFrame([new_row])], ignore_index=True)
-                                df_logs.to_csv(INPUT_CSV, index=False, encoding='utf-8-sig')
-
-                            st.success(f"✅ {selected_name} 학생의 기록이 성공적으로 업데이트되었습니다!")
-                            st.toast(f"{selected_name} 기록 완료")
-                        except ValueError:
-                            st.error(f"시트에서 '{selected_name}' 학생을 찾을 수 없습니다.")
-                    except Exception as e:
-                        st.error(f"저장 중 오류 발생: {e}")
-
-with tab1:
+                try:
+                    # 1. 조합된 텍스트 생성
+                    combined_fact = ", ".join(selected_keywords)
+                    full_entry = f"[{pd.Timestamp.now().strftime('%m/%d')}] {combined_fact}"
+                    if context_input:
+                        full_entry += f" - {context_input}"
+
+                    # 2. 구글 시트 저장 예약 (생기부data 시트, 대기열이 모아서 일괄 반영)
+                    # 영역에 따른 컬럼 결정: 과학은 'career_raw'(AJ열), 담임은 'behavior_raw'(AP열)
+                    field = "career_raw" if "과학" in selected_domain else "behavior_raw"
+                    quicklog.enqueue(selected_name, field, full_entry)
+
+                    # 3. 교과일 경우 관찰 기록에도 추가 (저장소 1행 추가 또는 CSV 끝에 한 행 추가)
+                    if "과학" in selected_domain:
+                        save_observation({
+                            "날짜": pd.Timestamp.now().strftime('%Y-%m-%d'),
+                            "이름": selected_name,
+                            "대분류(상황)": selected_category,
+                            "소분류(활동)": selected_sub_category,
+                            "구체적 행동(Fact)": context_input if context_input else combined_fact,
+                            "핵심 키워드": combined_fact,
+                            "영향/반응": "긍정적 변화",
+                            "교사 메모": ""
+                        })
+
+                    st.success(f"✅ {selected_name} 학생의 기록이 저장되었습니다! (시트에는 잠시 후 반영)")
+                    st.toast(f"{selected_name} 기록 완료")
+                except Exception as e:
+                    st.error(f"저장 중 오류 발생: {e}")
+
+        # 시트 반영 대기/실패 현황
+        pending = quicklog.pending_count()
+        if pending:
+            st.caption(f"📤 시트 반영 대기 중: {pending}건")
+        for name, entry, error in quicklog.failed():
+            st.error(f"시트 반영 실패 ({error}): {name} - {entry}")
+
+elif view == VIEWS[1]:
     st.subheader("📌 작업 현황")
     if st.session_state.final_results:
         df_summary = pd.DataFrame([
@@ -239,10 +327,39 @@ with tab1:
             for k, v in st.session_state.final_results.items()
         ])
         st.dataframe(df_summary, use_container_width=True)
+
+        # 학급 전체 나이스 바이트 한도 점검
+        st.subheader("📏 나이스 바이트 한도 점검")
+        overflow = over_budget(st.session_state.final_results)
+        if overflow:
+            st.error(f"⚠️ 한도 초과 {len(overflow)}건 (초과량 큰 순)")
+            st.dataframe(pd.DataFrame(overflow), use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ 모든 학생의 모든 영역이 바이트 한도 이내입니다.")
+        with st.expander("학생별 영역 바이트 전체 보기"):
+            st.dataframe(byte_report(st.session_state.final_results), use_container_width=True)
     else:
         st.write("시스템 가동 버튼을 눌러 작업을 시작하세요.")
 
-with tab2:
+    # 최근 실행 성능 지표 (CLI 실행 포함, runs/<run_id>.metrics.json)
+    report = latest_report()
+    if report:
+        st.subheader(f"⏱️ 성능 지표 (실행 {report['run_id']}, 총 {report['elapsed']:.1f}초)")
+        col_stage, col_slow = st.columns(2)
+        with col_stage:
+            st.caption("단계별 소요 시간(초)")
+            if report["stages"]:
+                st.bar_chart(pd.DataFrame(report["stages"]).set_index("stage"))
+        with col_slow:
+            st.caption("가장 느린 학생 (생성 + 검증 + 보정 합계)")
+            slow = [{"영역": kind, "성명": name, "초": sec} for kind, rows in report["slowest"].items() for name, sec in rows]
+            if slow:
+                st.dataframe(pd.DataFrame(slow).sort_values("초", ascending=False).head(10), use_container_width=True, hide_index=True)
+        with st.expander("외부 호출 지연 / 카운터 전체 보기"):
+            st.dataframe(pd.DataFrame(report["histograms"]).T, use_container_width=True)
+            st.dataframe(pd.Series(report["counters"], name="값"), use_container_width=True)
+
+elif view == VIEWS[2]:
     st.subheader("📝 교과 관찰 로그 편집 (observation_logs.csv)")
     st.markdown("""
     💡 **팁:** 
@@ -251,8 +368,9 @@ with tab2:
     - 수정 후 반드시 하단의 **'💾 로그 파일 저장'** 버튼을 눌러주세요.
     """)
     
-    if os.path.exists(INPUT_CSV):
-        df_logs = pd.read_csv(INPUT_CSV, encoding='utf-8-sig')
+    if USE_OBSERVATION_STORE or os.path.exists(INPUT_CSV):
+        from st_aggrid import AgGrid, GridOptionsBuilder
+        df_logs = load_observations()
         
         # 드롭다운 옵션 정의
         options_main = ["수업시간", "쉬는/점심시간", "학급자치/조종례", "동아리활동", "진로활동", "기타"]
@@ -277,6 +395,8 @@ with tab2:
         # 날짜 컬럼 너비 조정
         gb.configure_column("날짜", width=120)
         gb.configure_column("이름", width=100)
+        if "id" in df_logs.columns:
+            gb.configure_column("id", hide=True, editable=False)
         
         grid_options = gb.build()
         
@@ -284,10 +404,7 @@ with tab2:
         col_btn1, col_btn2 = st.columns([1, 5])
         with col_btn1:
             if st.button("➕ 행 추가", use_container_width=True):
-                new_row = pd.DataFrame([[pd.Timestamp.now().strftime('%Y-%m-%d'), "이름", "수업시간", "활동", "내용", "키워드", "영향/반응", "메모"]], 
-                                     columns=df_logs.columns)
-                df_logs = pd.concat([df_logs, new_row], ignore_index=True)
-                df_logs.to_csv(INPUT_CSV, index=False, encoding='utf-8-sig')
+                save_observation(dict(zip(OBS_HEADERS, [pd.Timestamp.now().strftime('%Y-%m-%d'), "이름", "수업시간", "활동", "내용", "키워드", "영향/반응", "메모"])))
                 st.rerun()
 
         grid_response = AgGrid(
@@ -301,12 +418,20 @@ with tab2:
         
         if st.button("💾 로그 파일 저장", type="primary"):
             updated_df = pd.DataFrame(grid_response['data'])
-            updated_df.to_csv(INPUT_CSV, index=False, encoding='utf-8-sig')
-            st.success("✅ CSV 파일이 성공적으로 업데이트되었습니다!")
+            if USE_OBSERVATION_STORE:
+                changed = save_edited_observations(df_logs, updated_df)
+                st.success(f"✅ 관찰 기록 {changed}행이 저장소에 반영되었습니다!")
+            else:
+                updated_df.to_csv(INPUT_CSV, index=False, encoding='utf-8-sig')
+                st.success("✅ CSV 파일이 성공적으로 업데이트되었습니다!")
+
+        if USE_OBSERVATION_STORE:
+            st.download_button("📤 CSV 내보내기", get_shared_store().export_csv().encode('utf-8-sig'),
+                               file_name="observation_logs.csv", mime="text/csv")
     else:
         st.error("관찰 로그 파일을 찾을 수 없습니다.")
 
-with tab3:
+elif view == VIEWS[3]:
     st.subheader("🔍 학생별 생성 결과 상세 확인")
     if st.session_state.final_results:
         student_list = list(st.session_state.final_results.keys())
@@ -317,7 +442,7 @@ with tab3:
         col1, col2 = st.columns(2)
         
         # 바이트 제한 설정 (나이스 기준)
-        LIMITS = {"course": 1500, "career": 2100, "autonomous": 1500, "behavior": 1500}
+        LIMITS = NEIS_BYTE_LIMITS
         
         # 복사 상태 관리를 위한 세션 초기화
         if 'copy_status' not in st.session_state:
@@ -336,6 +461,7 @@ with tab3:
                     st.session_state.copy_status[f"{selected_student}_course"] = True
             
             st.progress(min(b_course / LIMITS['course'], 1.0))
+            show_diagnostics(res['course'])
             st.session_state.final_results[selected_student]['course'] = st.text_area("내용 편집", res['course'], height=300, key=f"course_{selected_student}", label_visibility="collapsed")
             
             # 2) 진로활동
@@ -350,6 +476,7 @@ with tab3:
                     st.session_state.copy_status[f"{selected_student}_career"] = True
 
             st.progress(min(b_career / LIMITS['career'], 1.0))
+            show_diagnostics(res['career'])
             st.session_state.final_results[selected_student]['career'] = st.text_area("내용 편집", res['career'], height=200, key=f"career_{selected_student}", label_visibility="collapsed")
             
         with col2:
@@ -365,6 +492,7 @@ with tab3:
                     st.session_state.copy_status[f"{selected_student}_auto"] = True
 
             st.progress(min(b_auto / LIMITS['auto_label' if 'auto_label' in locals() else 'autonomous'], 1.0))
+            show_diagnostics(res['autonomous'])
             st.session_state.final_results[selected_student]['autonomous'] = st.text_area("내용 편집", res['autonomous'], height=200, key=f"auto_{selected_student}", label_visibility="collapsed")
             
             # 4) 행동특성
@@ -379,8 +507,70 @@ with tab3:
                     st.session_state.copy_status[f"{selected_student}_behav"] = True
 
             st.progress(min(b_behav / LIMITS['behavior'], 1.0))
+            show_diagnostics(res['behavior'])
             st.session_state.final_results[selected_student]['behavior'] = st.text_area("내용 편집", res['behavior'], height=300, key=f"behav_{selected_student}", label_visibility="collapsed")
             
         st.caption(f"💡 위 텍스트박스에서 내용을 직접 수정하면 즉시 반영되며, '구글 시트 전송'을 누르면 저장됩니다.")
+
+        # 검증 실패(금지어/종결 어미/바이트 초과) 문장만 재요청하여 보정
+        if st.button("🩹 검증 실패 문장만 자동 보정", key=f"repair_{selected_student}"):
+            with st.spinner(f"[{selected_student}] 문제 문장 보정 중..."):
+                widget_keys = {"course": "course", "career": "career", "autonomous": "auto", "behavior": "behav"}
+                repaired = {}
+                for area in LIMITS:
+                    # 영역을 만든 엔진/모델로 보정 (교과는 교과 엔진, 담임 영역은 담임 엔진)
+                    engine = get_course_engine() if area == "course" else get_home_engine()
+                    text, report = engine.repair(area, selected_student, res[area])
+                    if report["attempts"]:
+                        repaired[area] = text
+                        st.session_state.final_results[selected_student][area] = text
+                        st.session_state.pop(f"{widget_keys[area]}_{selected_student}", None)
+                update_near_duplicates(selected_student, repaired)
+            st.rerun()
+
+        # 선택 영역 1개를 스트리밍으로 다시 생성 (도착하는 대로 표시, 끝난 문장부터 중간 검증)
+        st.markdown("#### ⚡ 실시간 재생성")
+        if st.session_state.get("stream_notice"):
+            st.caption(st.session_state.pop("stream_notice"))
+        regen_area = st.selectbox("재생성 영역", list(LIMITS), format_func=lambda a: SECTION_LABELS.get(a, a), key=f"regen_area_{selected_student}")
+        if st.button("⚡ 선택 영역 다시 생성 (실시간 표시)", key=f"stream_{selected_student}"):
+            widget_keys = {"course": "course", "career": "career", "autonomous": "auto", "behavior": "behav"}
+            live_text, live_diag = st.empty(), st.empty()
+            started, first_text = time.perf_counter(), None
+            stream = None
+            if regen_area == "course":
+                stream = get_course_engine().stream_course(selected_student, bypass_cache=True)
+            else:
+                home_row = get_home_data().get(selected_student)
+                if home_row is None:
+                    st.warning(f"'생기부data' 탭에서 [{selected_student}] 학생 행을 찾지 못해 {SECTION_LABELS[regen_area]} 영역을 생성할 수 없습니다.")
+                else:
+                    stream = get_home_engine().stream_section(selected_student, regen_area, home_row, bypass_cache=True)
+            if stream is not None:
+                for text, diagnostics, done in stream:
+                    if first_text is None and text:
+                        first_text = time.perf_counter() - started
+                    live_text.markdown(text + ("" if done else " ▌"))
+                    with live_diag.container():
+                        if done:
+                            show_diagnostics(text)
+                        else:
+                            st.caption(f"끝난 문장 기준 금지어 {len(diagnostics['prohibited'])}건 / 종결 어미 확인 {len(diagnostics['bad_endings'])}건")
+                st.session_state.final_results[selected_student][regen_area] = text
+                st.session_state.pop(f"{widget_keys[regen_area]}_{selected_student}", None)
+                update_near_duplicates(selected_student, {regen_area: text})
+                st.session_state.stream_notice = (f"⚡ [{SECTION_LABELS[regen_area]}] 첫 글자 {first_text or 0:.2f}초 / "
+                                                  f"전체 {time.perf_counter() - started:.1f}초, {get_neis_bytes(text)}/{LIMITS[regen_area]} bytes")
+                st.rerun()
     else:
         st.write("생성된 결과가 없습니다.")
+
+# 시작 시간 보고 (import / 첫 화면 그리기, 콜드 스타트 값은 프로세스당 1회 기록)
+_T_RENDER = time.perf_counter()
+timing = {"imports_ms": round((_T_IMPORTS - _T_START) * 1000), "render_ms": round((_T_RENDER - _T_START) * 1000)}
+cold = startup_report()
+if not cold:
+    cold.update(timing)
+    print(f"⏱️ 앱 콜드 스타트: import {timing['imports_ms']}ms, 첫 화면 {timing['render_ms']}ms")
+with st.sidebar:
+    st.caption(f"⏱️ 콜드 스타트 import {cold['imports_ms']}ms / 첫 화면 {cold['render_ms']}ms · 이번 실행 {timing['render_ms']}ms")
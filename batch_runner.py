@@ -0,0 +1,226 @@
+import json
+import os
+import time
+import uuid
+from seteuk_config import STRUCTURED_JSON, SYSTEM_PROMPT, GEMINI_MODEL, BATCH_DIR, BATCH_STATE_JSON
+
+# 작업 상태 값
+PENDING, SUCCEEDED, FAILED = "pending", "succeeded", "failed"
+
+
+def build_batch_requests(course_engine, home_engine, home_data, bypass_cache=False):
+    """교과/담임 전체 프롬프트를 일괄 작업 요청 목록으로 직렬화 (캐시 적중분은 제외하고 바로 결과로 반환)
+
+    키는 요청 순번 기반(c00001, h00002 ...)이며, 이름에 '/' 등이 있어도 깨지지 않도록
+    키 → [영역, 이름] 대응표를 함께 반환합니다 (교과 영역은 "course").
+    교과 프롬프트는 요약 요청 없이 압축하여 요청 구성 단계에서는 API 를 호출하지 않습니다.
+    반환: (요청 목록, {키: 캐시 응답}, {키: [영역, 이름]})
+    """
+    requests, cached, targets = [], {}, {}
+
+    def add(area, name, system_instr, user_input):
+        key = f"{'c' if area == 'course' else 'h'}{len(targets) + 1:05d}"
+        targets[key] = [area, name]
+        hit = course_engine.cache.get(GEMINI_MODEL, system_instr, user_input, bypass=bypass_cache)
+        if hit is not None:
+            cached[key] = hit
+        else:
+            requests.append({"key": key, "model": GEMINI_MODEL, "system": system_instr, "user": user_input})
+
+    with open(STRUCTURED_JSON, 'r', encoding='utf-8') as f:
+        course_data = json.load(f)
+    for name, obs_list in course_data.items():
+        add("course", name, SYSTEM_PROMPT, course_engine.build_course_prompt(name, obs_list, summarize=False))
+    for name, data in home_data.items():
+        for area, system_instr, user_input in home_engine.build_section_prompts(name, data):
+            add(area, name, system_instr, user_input)
+    return requests, cached, targets
+
+
+def echo_responder(system_instr, user_input):
+    """네트워크 없는 로컬 일괄 작업용 응답 (입력 첫 줄을 종결 어미 규칙에 맞춘 문장으로 반환)"""
+    first = user_input.strip().splitlines()[0] if user_input.strip() else ""
+    return f"{first[:200]} 내용을 바탕으로 활동하였음."
+
+
+def read_job_file(job_file):
+    with open(job_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path, rows):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+
+class BatchBackend:
+    """일괄 작업 제출 백엔드 인터페이스"""
+    name = "base"
+
+    def submit(self, job_file):
+        """작업 파일 제출 후 작업 ID 반환"""
+        raise NotImplementedError
+
+    def poll(self, job_id):
+        """작업 상태 반환 (PENDING / SUCCEEDED / FAILED)"""
+        raise NotImplementedError
+
+    def fetch(self, job_id, job_file):
+        """완료된 작업의 {키: 응답 본문} 반환"""
+        raise NotImplementedError
+
+
+class LocalBatchBackend(BatchBackend):
+    """네트워크 없이 동작하는 파일 기반 대체 백엔드
+
+    제출 시 <root>/<작업ID>/requests.jsonl 로 복사하고, 같은 폴더에 responses.jsonl 이 생기면 완료로 봅니다.
+    responder(system, user) 를 주면 poll 시점에 직접 응답을 만들어 저장합니다
+    (기본 echo_responder 는 API 를 호출하지 않음, None 이면 외부에서 responses.jsonl 을 만들 때까지 대기).
+    """
+    name = "local"
+
+    def __init__(self, root=os.path.join(BATCH_DIR, "local"), responder=echo_responder):
+        self.root = root
+        self.responder = responder
+        # 가짜 응답은 응답 캐시에 저장하지 않음 (이후 실제 실행이 가짜 응답을 재사용하지 않도록)
+        self.cache_results = responder is not echo_responder
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.root, job_id)
+
+    def submit(self, job_file):
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        write_jsonl(os.path.join(self._job_dir(job_id), "requests.jsonl"), read_job_file(job_file))
+        return job_id
+
+    def poll(self, job_id):
+        job_dir = self._job_dir(job_id)
+        if not os.path.isdir(job_dir):
+            return FAILED
+        responses = os.path.join(job_dir, "responses.jsonl")
+        if os.path.exists(responses):
+            return SUCCEEDED
+        if self.responder is not None:
+            rows = [{"key": r["key"], "text": self.responder(r["system"], r["user"])}
+                    for r in read_job_file(os.path.join(job_dir, "requests.jsonl"))]
+            write_jsonl(responses, rows)
+            return SUCCEEDED
+        return PENDING
+
+    def fetch(self, job_id, job_file):
+        rows = read_job_file(os.path.join(self._job_dir(job_id), "responses.jsonl"))
+        return {r["key"]: r["text"] for r in rows}
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Gemini Batch API 백엔드 (인라인 요청, 응답 순서 = 요청 순서)"""
+    name = "gemini"
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, job_file):
+        rows = read_job_file(job_file)
+        inline = [{"contents": [{"role": "user", "parts": [{"text": r["system"]}, {"text": r["user"]}]}]} for r in rows]
+        job = self.client.batches.create(
+            model=rows[0]["model"] if rows else GEMINI_MODEL,
+            src=inline,
+            config={"display_name": os.path.basename(job_file)}
+        )
+        return job.name
+
+    def poll(self, job_id):
+        state = self.client.batches.get(name=job_id).state.name
+        if state == "JOB_STATE_SUCCEEDED":
+            return SUCCEEDED
+        if state in ("JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"):
+            return FAILED
+        return PENDING
+
+    def fetch(self, job_id, job_file):
+        job = self.client.batches.get(name=job_id)
+        results = {}
+        for row, item in zip(read_job_file(job_file), job.dest.inlined_responses):
+            if item.response is not None and item.response.text:
+                results[row["key"]] = item.response.text.strip()
+            else:
+                print(f"⚠️ 일괄 작업 응답 누락: {row['key']} ({item.error})")
+        return results
+
+
+def load_batch_state():
+    if not os.path.exists(BATCH_STATE_JSON):
+        return None
+    with open(BATCH_STATE_JSON, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_batch_state(state):
+    os.makedirs(os.path.dirname(BATCH_STATE_JSON), exist_ok=True)
+    tmp = BATCH_STATE_JSON + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=4)
+    os.replace(tmp, BATCH_STATE_JSON)
+
+
+def run_batch(course_engine, home_engine, backend, poll_interval=60, bypass_cache=False):
+    """일괄 작업 제출(또는 진행 중 작업 재개) → 완료까지 대기 → (교과 결과, 담임 결과) 반환
+
+    작업 ID 와 작업 파일 경로는 BATCH_STATE_JSON 에 저장되므로 프로세스가 재시작되어도
+    같은 작업을 이어서 기다립니다.
+    """
+    state = load_batch_state()
+    # 키 대응표가 없는 상태 파일은 지난 형식이므로 새로 구성하여 다시 제출
+    if state and state.get("status") == PENDING and state.get("backend") == backend.name and "targets" in state:
+        print(f"🔁 진행 중인 일괄 작업 재개: {state['job_id']}")
+        cached = state.get("cached", {})
+    else:
+        home_data = home_engine.collect_all_data()
+        requests, cached, targets = build_batch_requests(course_engine, home_engine, home_data, bypass_cache)
+        os.makedirs(BATCH_DIR, exist_ok=True)
+        job_file = os.path.join(BATCH_DIR, f"job_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+        write_jsonl(job_file, requests)
+        job_id = backend.submit(job_file) if requests else None
+        state = {"job_id": job_id, "backend": backend.name, "job_file": job_file,
+                 "submitted_at": time.time(), "status": PENDING if job_id else SUCCEEDED, "cached": cached,
+                 "targets": targets}
+        save_batch_state(state)
+        print(f"📦 일괄 작업 제출: 요청 {len(requests)}건, 캐시 적중 {len(cached)}건 (작업 ID: {job_id})")
+
+    responses = dict(cached)
+    if state["job_id"]:
+        status = backend.poll(state["job_id"])
+        while status == PENDING:
+            print(f"⏳ 일괄 작업 대기 중... ({poll_interval}초 후 재확인)")
+            time.sleep(poll_interval)
+            status = backend.poll(state["job_id"])
+        if status == FAILED:
+            state["status"] = FAILED
+            save_batch_state(state)
+            raise RuntimeError(f"일괄 작업 실패: {state['job_id']}")
+
+        fetched = backend.fetch(state["job_id"], state["job_file"])
+        # 받은 응답은 캐시에도 저장하여 이후 대화형 실행에서 재사용
+        for row in read_job_file(state["job_file"]) if getattr(backend, "cache_results", True) else []:
+            if row["key"] in fetched:
+                course_engine.cache.put(row["model"], row["system"], row["user"], fetched[row["key"]])
+        responses.update(fetched)
+
+    state["status"] = SUCCEEDED
+    save_batch_state(state)
+
+    # 기존 clean_and_validate 경로로 정제 (키 → [영역, 이름] 대응표로 복원)
+    targets = state["targets"]
+    course_results, home_results = {}, {}
+    for key, text in responses.items():
+        area, name = targets[key]
+        if area == "course":
+            course_results[name], _ = course_engine.clean_and_validate(text, name)
+        else:
+            home_results.setdefault(name, {})[area] = home_engine.clean_and_validate(text, name)
+    return course_results, home_results
+
@@ -0,0 +1,115 @@
+"""학생 간 유사 본문 검출 벤치마크: 전체 쌍 비교(O(n²)) vs MinHash/LSH 색인
+
+학년 규모의 합성 교과 세특에 거의 같은 본문 쌍을 심어 두고, 색인 구성/증분 갱신/쌍 검출 시간과
+심어 둔 쌍의 검출률을 측정합니다. 전체 쌍 비교는 --exact-limit 명 이하에서만 함께 실행합니다.
+
+사용법: python benchmarks/bench_near_duplicates.py [--texts 3000] [--planted 50] [--regen 0.02]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keywords_config import KEYWORD_LIBRARY
+from seteuk_config import NEAR_DUP_THRESHOLD
+from near_duplicates import NearDuplicateIndex, shingles
+
+ENDINGS = ["하였음.", "보였음.", "드러냈음.", "발휘하였음.", "이끌어 냈음."]
+
+
+def synthetic_texts(n, seed=0):
+    """KEYWORD_LIBRARY 문구로 만든 세특 길이(약 500자) 본문 (같은 어미/문구를 공유하는 학년 규모 분포)"""
+    rnd = random.Random(seed)
+    phrases = [kw for domain in KEYWORD_LIBRARY.values() for cat in domain.values() for kws in cat.values() for kw in kws]
+    return [" ".join(f"{rnd.choice(phrases)} 활동에서 {rnd.choice(phrases)} 역량을 {rnd.choice(ENDINGS)}"
+                     for _ in range(rnd.randint(8, 12))) for _ in range(n)]
+
+
+def mutate(text, rate, rnd):
+    """문장 일부만 바꾼 거의 같은 본문 (모델이 다른 학생에게 같은 틀을 재사용한 경우)"""
+    sentences = text.split(". ")
+    for i in range(len(sentences)):
+        if rnd.random() < rate:
+            sentences[i] = sentences[rnd.randrange(len(sentences))]
+    return ". ".join(sentences)
+
+
+def data_for(texts):
+    return {f"학생{i:05d}": {"course": t} for i, t in enumerate(texts)}
+
+
+def exact_pairs(texts, threshold):
+    sets = [shingles(t) for t in texts]
+    found = set()
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            inter = len(sets[i] & sets[j])
+            if inter and inter / len(sets[i] | sets[j]) >= threshold:
+                found.add((i, j))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=3000, help="학년 전체 본문 수")
+    parser.add_argument("--planted", type=int, default=50, help="심어 둘 거의 같은 본문 쌍 수")
+    parser.add_argument("--mutate", type=float, default=0.15, help="심은 쌍에서 바꿀 문장 비율")
+    parser.add_argument("--regen", type=float, default=0.02, help="증분 갱신 시 다시 생성된 학생 비율")
+    parser.add_argument("--threshold", type=float, default=NEAR_DUP_THRESHOLD)
+    parser.add_argument("--exact-limit", type=int, default=3000, help="이 수 이하일 때만 전체 쌍 비교 실행")
+    args = parser.parse_args()
+
+    rnd = random.Random(2)
+    texts = synthetic_texts(args.texts)
+    planted = set()
+    for src in rnd.sample(range(args.texts), args.planted):
+        dst = rnd.randrange(args.texts)
+        if dst != src:
+            texts[dst] = mutate(texts[src], args.mutate, rnd)
+            planted.add((min(src, dst), max(src, dst)))
+    names = list(data_for(texts))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NearDuplicateIndex(os.path.join(tmp, "near_dup.sqlite3"), threshold=args.threshold)
+        print(f"본문 {args.texts}개, 평균 {sum(len(t) for t in texts) / len(texts):.0f}자, "
+              f"밴드 {index.bands} x 행 {index.rows}, 기준 유사도 {args.threshold}")
+
+        start = time.perf_counter()
+        index.sync(data_for(texts), scope="bench")
+        t_build = time.perf_counter() - start
+        start = time.perf_counter()
+        found = index.pairs("bench")
+        t_query = time.perf_counter() - start
+        lsh = {tuple(sorted((names.index(p["a"][1]), names.index(p["b"][1])))) for p in found}
+        print(f"{'LSH 색인 구성':<24} {t_build:8.3f}s  ({args.texts / t_build:,.0f} texts/s)")
+        print(f"{'LSH 쌍 검출':<24} {t_query:8.3f}s  (검출 {len(lsh)}쌍)")
+
+        # 증분 갱신: 일부 학생만 재생성된 경우 바뀐 본문만 다시 서명
+        regen = rnd.sample(range(args.texts), max(1, int(args.texts * args.regen)))
+        fresh = synthetic_texts(len(regen), seed=99)
+        for i, t in zip(regen, fresh):
+            texts[i] = t
+        start = time.perf_counter()
+        changed = index.sync(data_for(texts), scope="bench")
+        found = index.pairs("bench")
+        t_incr = time.perf_counter() - start
+        print(f"{'증분 갱신 + 검출':<24} {t_incr:8.3f}s  (다시 서명 {changed}건)")
+
+        planted_left = {p for p in planted if p[0] not in regen and p[1] not in regen}
+        lsh = {tuple(sorted((names.index(p["a"][1]), names.index(p["b"][1])))) for p in found}
+        print(f"심은 쌍 검출률: {len(planted_left & lsh)}/{len(planted_left)}")
+
+        if args.texts <= args.exact_limit:
+            start = time.perf_counter()
+            exact = exact_pairs(texts, args.threshold)
+            t_exact = time.perf_counter() - start
+            print(f"{'전체 쌍 비교 (정확)':<24} {t_exact:8.3f}s  (검출 {len(exact)}쌍)")
+            print(f"정확 결과 대비 재현율 {len(exact & lsh)}/{len(exact)}, 오탐 {len(lsh - exact)}쌍, "
+                  f"속도 향상 x{t_exact / (t_build + t_query):.1f} (전체 구성 기준), x{t_exact / t_incr:.1f} (증분 기준)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""오프라인 전 구간 벤치마크: 전처리 → 교과 생성 → 담임 취합/생성 → 시트 업로드 (main.py 흐름 그대로)
+
+가짜 Gemini/시트 백엔드(fake_backends)를 공용 클라이언트 등록부에 끼워 넣고, 학급 규모마다
+새 프로세스 + 임시 출력 폴더(응답 캐시 포함)에서 main.main() 을 1회 실행합니다.
+보고 항목: 처리량(명/초), 학생별 지연 p50/p99, 단계별 시간, API 호출 수/토큰, 최대 메모리(RSS)
+
+사용법: python benchmarks/bench_pipeline.py [--students 30 300] [--latency-ms 800] [--rate-limit 0.02]
+결과는 --save 파일(JSONL)에 커밋 해시와 함께 누적되며, 같은 조건의 직전 기록과 비교해 출력합니다.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SPREADSHEET_ID = "bench-spreadsheet"
+PARAM_KEYS = ("students", "rows", "latency_ms", "sigma", "rate_limit", "server_error", "bad_output", "workers", "rate", "sheets_latency_ms")
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+
+def run_child(params):
+    """(자식 프로세스) 가짜 백엔드를 설치하고 main.main() 1회 실행 후 측정값 반환"""
+    import resource
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, HERE)
+    import fake_backends as fb
+
+    names = fb.student_names(params["students"])
+    t0 = time.perf_counter()
+    obs_rows = fb.write_observations_csv(os.environ["SETEUK_INPUT_CSV"], names, tuple(params["rows"]))
+    tabs = fb.homeroom_tabs(names)
+    setup_s = time.perf_counter() - t0
+
+    import clients
+    import gen_executor
+    import main
+    from seteuk_core import SeteukEngine
+    from homeroom_engine import HomeroomEngine
+
+    accounting = fb.Accounting()
+    latency = fb.LatencyModel(params["latency_ms"], params["sigma"], params["rate_limit"], params["server_error"])
+    registry = clients.get_shared_clients()
+    registry._genai = fb.FakeGenaiClient(latency, params["bad_output"], accounting)
+    registry._sheets = fb.FakeSheetsClient({SPREADSHEET_ID: tabs}, params["sheets_latency_ms"], accounting)
+    gen_executor._shared_executor = gen_executor.GenerationExecutor(max_workers=params["workers"], rate_per_minute=params["rate"])
+
+    # 학생(교과) / 학생·영역(담임) 단위 작업 시간 기록
+    spans = {"course": {}, "homeroom": {}}
+
+    def timed(kind, fn):
+        def wrapper(self, name, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(self, name, *args, **kwargs)
+            finally:
+                first, last = spans[kind].get(name, (start, 0))
+                spans[kind][name] = (min(first, start), max(last, time.perf_counter()))
+        return wrapper
+
+    SeteukEngine._generate_course = timed("course", SeteukEngine._generate_course)
+    HomeroomEngine._generate_section = timed("homeroom", HomeroomEngine._generate_section)
+    HomeroomEngine._generate_sections_json = timed("homeroom", HomeroomEngine._generate_sections_json)
+
+    # 단계 전환 시각 기록 (main 의 상태 기록 호출을 가로챔)
+    stages = []
+    write_status = main.write_status
+
+    def record_stage(stage, *args, **info):
+        if not stages or stages[-1][0] != stage:
+            stages.append((stage, time.perf_counter()))
+        write_status(stage, *args, **info)
+
+    main.write_status = record_stage
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    log = io.StringIO()
+    sys.argv = ["main.py"]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        main.main()
+    total_s = time.perf_counter() - start
+
+    stage_s = {}
+    for (stage, t), (_, t_next) in zip(stages, stages[1:] + [("end", start + total_s)]):
+        stage_s[stage] = round(stage_s.get(stage, 0) + t_next - t, 3)
+    course = [b - a for a, b in spans["course"].values()]
+    homeroom = [b - a for a, b in spans["homeroom"].values()]
+    return {
+        "observations": obs_rows,
+        "setup_s": round(setup_s, 2),
+        "total_s": round(total_s, 2),
+        "students_per_s": round(params["students"] / total_s, 2),
+        "stages_s": stage_s,
+        "course_ms": {"p50": percentile(course, 0.5), "p99": percentile(course, 0.99)},
+        "homeroom_ms": {"p50": percentile(homeroom, 0.5), "p99": percentile(homeroom, 0.99)},
+        "api": accounting.snapshot(),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "pipeline_rss_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        "log_tail": log.getvalue().splitlines()[-3:],
+    }
+
+
+def measure(params):
+    """새 프로세스 + 임시 출력 폴더에서 1회 측정"""
+    with tempfile.TemporaryDirectory(prefix="seteuk_bench_") as tmp:
+        env = dict(os.environ,
+                   SETEUK_OUTPUT_DIR=os.path.join(tmp, "out"),
+                   SETEUK_SHARED_OUTPUT_DIR=os.path.join(tmp, "shared"),
+                   SETEUK_INPUT_CSV=os.path.join(tmp, "observation_logs.csv"),
+                   SETEUK_SPREADSHEET_ID=SPREADSHEET_ID)
+        env.pop("SETEUK_BUDGET_ADDRESS", None)
+        os.makedirs(env["SETEUK_SHARED_OUTPUT_DIR"])
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(params)],
+                             cwd=ROOT, env=env, capture_output=True, text=True)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if out.returncode or not lines:
+        raise RuntimeError(out.stderr[-2000:])
+    return json.loads(lines[-1])
+
+
+def git_commit():
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True)
+    return out.stdout.strip() + ("+" if dirty.stdout.strip() else "")
+
+
+def previous_record(path, params):
+    if not os.path.exists(path):
+        return None
+    found = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("params") == params:
+                found = record
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--students", type=int, nargs="+", default=[30, 300], help="학급 규모 (30~5000명)")
+    parser.add_argument("--rows", type=int, nargs=2, default=[4, 12], metavar=("MIN", "MAX"), help="학생당 관찰 기록 행 수 범위 (긴 누적 기록: 200 400)")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Gemini 응답 지연 중앙값(ms)")
+    parser.add_argument("--sigma", type=float, default=0.4, help="지연 로그정규 분산 (꼬리 길이)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="429 주입 비율 (0~1)")
+    parser.add_argument("--server-error", type=float, default=0.0, help="503 주입 비율 (0~1)")
+    parser.add_argument("--bad-output", type=float, default=0.05, help="금지어가 섞인 응답 비율 (문장 보정 경로)")
+    parser.add_argument("--workers", type=int, default=8, help="실행기 동시 요청 수")
+    parser.add_argument("--rate", type=int, default=6000, help="실행기 분당 요청 한도")
+    parser.add_argument("--sheets-latency-ms", type=float, default=150, help="시트 API 호출당 지연(ms)")
+    parser.add_argument("--save", default=os.path.join(HERE, "results", "bench_pipeline.jsonl"), help="결과 누적 파일 (JSONL, 빈 문자열이면 저장 안 함)")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child)), ensure_ascii=False))
+        return
+
+    commit = git_commit()
+    for n in args.students:
+        params = {k: getattr(args, k) for k in PARAM_KEYS}
+        params["students"] = n
+        r = measure(params)
+        api = r["api"]
+        print(f"👥 {n:>5}명  {r['total_s']:8.2f}초  {r['students_per_s']:7.2f}명/초  "
+              f"교과 p50/p99 {r['course_ms']['p50']}/{r['course_ms']['p99']}ms  "
+              f"담임 p50/p99 {r['homeroom_ms']['p50']}/{r['homeroom_ms']['p99']}ms")
+        print(f"   단계: " + ", ".join(f"{k} {v:.2f}s" for k, v in r["stages_s"].items()))
+        print(f"   Gemini 호출 {api.get('gemini.calls', 0)}회 (보정 {api.get('gemini.repair_calls', 0)}, "
+              f"429 {api.get('gemini.injected_429', 0)}, 503 {api.get('gemini.injected_503', 0)}), "
+              f"토큰 입력 {api.get('gemini.prompt_tokens', 0):,} / 출력 {api.get('gemini.output_tokens', 0):,}")
+        sheet_calls = sum(v for k, v in api.items() if k.startswith("sheets.") and k != "sheets.ranges_written")
+        print(f"   시트 호출 {sheet_calls}회 (쓰기 범위 {api.get('sheets.ranges_written', 0)}개), 최대 RSS {r['peak_rss_mb']}MB")
+
+        if args.save:
+            prev = previous_record(args.save, params)
+            if prev:
+                delta = (r["students_per_s"] / prev["result"]["students_per_s"] - 1) * 100
+                print(f"   📈 직전 기록({prev['commit']}) 대비 처리량 {delta:+.1f}%")
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"commit": commit, "time": time.strftime('%Y-%m-%d %H:%M:%S'), "params": params, "result": r}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""금지어 검사 처리량 벤치마크: 기존 목록 순회(kw in text) vs Aho-Corasick 자동자
+
+사용법: python benchmarks/bench_prohibited.py [--terms 5000] [--texts 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from seteuk_config import PROHIBITED_CATEGORIES, PROHIBITED_KEYWORDS
+from keywords_config import KEYWORD_LIBRARY
+from prohibited_matcher import Automaton
+
+SYLLABLES = "가나다라마바사아자차카타파하강남대학교원과학고등중앙국제한국서울부산연세고려성균관"
+
+
+def synthetic_lexicon(n, seed=0):
+    """학교 단위 사전 규모의 가짜 금지어 (대학명/학원명 형태)"""
+    rnd = random.Random(seed)
+    suffixes = ["대학교", "학원", "아카데미", "자격증", "과학고", "연구소"]
+    terms = set()
+    while len(terms) < n:
+        stem = "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        terms.add(stem + rnd.choice(suffixes))
+    return sorted(terms)
+
+
+def synthetic_texts(n, lexicon, seed=1):
+    """KEYWORD_LIBRARY 문구로 만든 세특 길이(약 500자) 본문, 일부에 금지어 삽입"""
+    rnd = random.Random(seed)
+    phrases = [kw for domain in KEYWORD_LIBRARY.values() for cat in domain.values() for kws in cat.values() for kw in kws]
+    texts = []
+    for _ in range(n):
+        sentences = [rnd.choice(phrases) + "하였음." for _ in range(rnd.randint(10, 16))]
+        if rnd.random() < 0.1:
+            sentences.insert(rnd.randrange(len(sentences)), rnd.choice(lexicon) + "에 참여하였음.")
+        texts.append(" ".join(sentences))
+    return texts
+
+
+def bench(label, fn, texts, repeat):
+    start = time.perf_counter()
+    hits = 0
+    for _ in range(repeat):
+        for t in texts:
+            hits += len(fn(t))
+    elapsed = time.perf_counter() - start
+    total_chars = sum(len(t) for t in texts) * repeat
+    print(f"{label:<28} {elapsed:8.3f}s  {len(texts) * repeat / elapsed:10.0f} texts/s  {total_chars / elapsed / 1e6:7.2f} Mchar/s  (일치 {hits})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=5000, help="확장 사전 단어 수")
+    parser.add_argument("--texts", type=int, default=2000, help="검사할 본문 수")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    lexicon = synthetic_lexicon(args.terms)
+    texts = synthetic_texts(args.texts, lexicon)
+    keywords = PROHIBITED_KEYWORDS + lexicon
+
+    start = time.perf_counter()
+    automaton = Automaton({**PROHIBITED_CATEGORIES, "synthetic": lexicon})
+    print(f"자동자 구성: {len(automaton.terms)}개 단어, 노드 {len(automaton.goto)}개, {time.perf_counter() - start:.3f}s")
+
+    def list_scan(text):
+        return [kw for kw in keywords if kw in text]
+
+    def automaton_scan(text):
+        return {idx for _, _, idx in automaton.iter_matches(text)}
+
+    # 결과 일치 확인
+    for t in texts[:200]:
+        assert sorted(list_scan(t)) == sorted(automaton.terms[i][0] for i in automaton_scan(t))
+
+    t_list = bench("기존 목록 순회", list_scan, texts, args.repeat)
+    t_auto = bench("Aho-Corasick 자동자", automaton_scan, texts, args.repeat)
+    print(f"속도 향상: x{t_list / t_auto:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Streamlit 앱 콜드 스타트 측정: 화면별 import / 첫 화면 시간과 불러온 무거운 SDK 목록
+
+화면마다 새 프로세스에서 streamlit AppTest 로 app.py 를 1회 실행합니다.
+(퀵 로그 화면은 서비스 계정 인증이 필요하므로 기본 측정 대상에서 제외)
+
+사용법: python benchmarks/bench_startup.py [--views 1 2 3] [--json 결과.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app.py 의 VIEWS 와 같은 순서
+VIEWS = ["⚡ 실시간 퀵 로그", "📊 데이터 대시보드", "📋 관찰 로그(CSV) 편집", "🔍 AI 생성 결과 프리뷰"]
+HEAVY_MODULES = ["google.genai", "gspread", "google.oauth2.service_account", "st_aggrid", "seteuk_core", "homeroom_engine"]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_st = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120)
+at.session_state["view"] = VIEW
+at.run()
+t_end = time.perf_counter()
+caption = [c.value for c in at.sidebar.caption if c.value.startswith("⏱️")]
+print(json.dumps({
+    "view": VIEW,
+    "streamlit_import_ms": round((t_st - t0) * 1000),
+    "script_ms": round((t_end - t_st) * 1000),
+    "report": caption[0] if caption else None,
+    "exceptions": [e.value for e in at.exception],
+    "heavy_loaded": [m for m in HEAVY if m in sys.modules],
+}, ensure_ascii=False))
+"""
+
+
+def measure(view):
+    code = f"VIEW = {view!r}\nHEAVY = {HEAVY_MODULES!r}\n" + PROBE
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(out.stderr[-2000:])
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--views", type=int, nargs="+", default=[1, 2, 3], help="측정할 화면 번호 (0: 퀵 로그)")
+    parser.add_argument("--json", help="결과 저장 경로 (회귀 비교용)")
+    args = parser.parse_args()
+
+    results = []
+    for idx in args.views:
+        r = measure(VIEWS[idx])
+        results.append(r)
+        heavy = ", ".join(r["heavy_loaded"]) or "없음"
+        print(f"{r['view']:<20} 스크립트 {r['script_ms']:6d}ms  (streamlit import {r['streamlit_import_ms']}ms)  무거운 모듈: {heavy}")
+        if r["exceptions"]:
+            print(f"   ⚠️ 예외: {r['exceptions'][0][:200]}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""오프라인 벤치마크용 가짜 Gemini / 구글 시트 백엔드와 합성 학급 데이터
+
+실제 할당량을 쓰지 않고 파이프라인 성능을 재기 위해 genai.Client 와 gspread 클라이언트 자리에 끼워 넣습니다.
+- 응답 지연: 로그정규 분포 (중앙값/분산 지정), 요청별 결정적 난수
+- 오류 주입: 429(할당량 초과) / 503(서버 오류) 비율 지정, 실행기의 재시도 경로를 그대로 거침
+- 토큰 집계: 입력/출력 글자 수 기반 추정 (한글 약 1.5자 = 1토큰)
+- 시트: values_batch_get / get_all_values / batch_update 등 엔진이 쓰는 메서드만 메모리에서 처리
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keywords_config import KEYWORD_LIBRARY
+from observation_store import HEADERS
+from seteuk_config import REPAIR_PROMPT, COMPRESS_PROMPT, NEIS_BYTE_LIMITS
+
+PHRASES = [kw for domain in KEYWORD_LIBRARY.values() for cat in domain.values() for kws in cat.values() for kw in kws]
+CATEGORIES = [(cat, sub) for domain in KEYWORD_LIBRARY.values() for cat, subs in domain.items() for sub in subs]
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = "민서준지윤하도현우예은성재수연아진유주시영채원호"
+VERBS = ["을 주도하였음.", "에 적극 참여하였음.", "을 통해 성장하는 모습을 보였음.", "을 꾸준히 실천하였음."]
+_NUMBERED = re.compile(r'^\s*\d+\)', re.M)
+
+
+def estimate_tokens(text):
+    return max(1, round(len(text) / 1.5))
+
+
+class FakeAPIError(Exception):
+    """google-genai APIError 와 같이 code 속성으로 상태 코드를 전달"""
+
+    def __init__(self, code, message=""):
+        super().__init__(f"{code} {message}".strip())
+        self.code = code
+
+
+class Accounting:
+    """가짜 백엔드 호출/토큰/주입 오류 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, key, n=1):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def snapshot(self):
+        with self.lock:
+            return dict(sorted(self.counts.items()))
+
+
+class LatencyModel:
+    """로그정규 지연 (median_ms, sigma) 및 오류 주입 비율"""
+
+    def __init__(self, median_ms=800, sigma=0.4, rate_limit=0.0, server_error=0.0, seed=0):
+        self.median = median_ms / 1000.0
+        self.sigma = sigma
+        self.rate_limit = rate_limit
+        self.server_error = server_error
+        self.seed = seed
+
+    def rng(self, key, attempt):
+        digest = hashlib.sha256(f"{self.seed}:{attempt}:{key}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def delay(self, rnd):
+        return self.median * rnd.lognormvariate(0, self.sigma) if self.median else 0.0
+
+
+def _sentences(rnd, count):
+    return [rnd.choice(PHRASES) + rnd.choice(VERBS) for _ in range(count)]
+
+
+def fake_section(rnd, byte_limit):
+    """검증을 통과하는 '~하였음.' 종결 문장들 (한도의 약 50~80% 분량)"""
+    out, size = [], 0
+    target = byte_limit * rnd.uniform(0.5, 0.8)
+    while size < target:
+        s = _sentences(rnd, 1)[0]
+        out.append(s)
+        size += len(s.encode("utf-8"))
+    return " ".join(out)
+
+
+class _Response:
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=estimate_tokens(text))
+
+
+class _FakeModels:
+    def __init__(self, client):
+        self.client = client
+
+    def _respond(self, contents, config):
+        system_instr, user_input = contents[0], contents[-1]
+        key = hashlib.sha256((system_instr + "\x00" + user_input).encode("utf-8")).hexdigest()
+        client = self.client
+        with client.lock:
+            attempt = client.attempts.get(key, 0)
+            client.attempts[key] = attempt + 1
+        rnd = client.latency.rng(key, attempt)
+        client.accounting.add("gemini.calls")
+        client.accounting.add("gemini.prompt_tokens", estimate_tokens(system_instr) + estimate_tokens(user_input))
+        time.sleep(client.latency.delay(rnd))
+
+        roll = rnd.random()
+        if roll < client.latency.rate_limit:
+            client.accounting.add("gemini.injected_429")
+            raise FakeAPIError(429, "RESOURCE_EXHAUSTED")
+        if roll < client.latency.rate_limit + client.latency.server_error:
+            client.accounting.add("gemini.injected_503")
+            raise FakeAPIError(503, "UNAVAILABLE")
+
+        if system_instr in (REPAIR_PROMPT, COMPRESS_PROMPT):
+            client.accounting.add("gemini.repair_calls")
+            text = "\n".join(_sentences(rnd, len(_NUMBERED.findall(user_input))))
+        elif getattr(config, "response_mime_type", None) == "application/json":
+            text = json.dumps({area: fake_section(rnd, NEIS_BYTE_LIMITS[area]) for area in ("career", "autonomous", "behavior")}, ensure_ascii=False)
+        else:
+            text = fake_section(rnd, NEIS_BYTE_LIMITS["behavior"])
+            # 일부 응답에 기재 금지어를 섞어 문장 보정 경로도 측정
+            if rnd.random() < client.bad_output:
+                text += " 교외 대회에서 1위를 차지하였음."
+        client.accounting.add("gemini.output_tokens", estimate_tokens(text))
+        return _Response(text, estimate_tokens(user_input))
+
+    def generate_content(self, model, contents, config=None):
+        return self._respond(contents, config)
+
+    def generate_content_stream(self, model, contents, config=None):
+        text = self._respond(contents, config).text
+        for i in range(0, len(text), 40):
+            yield _Response(text[i:i + 40], 0)
+
+
+class FakeGenaiClient:
+    """genai.Client 대역 (client.models.generate_content / generate_content_stream)"""
+
+    def __init__(self, latency=None, bad_output=0.05, accounting=None):
+        self.latency = latency or LatencyModel()
+        self.bad_output = bad_output
+        self.accounting = accounting or Accounting()
+        self.lock = threading.Lock()
+        self.attempts = {}
+        self.models = _FakeModels(self)
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows, cols, sheet_id):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.row_count = rows
+        self.col_count = cols
+        self.cells = {}
+
+    def _call(self, name):
+        self.spreadsheet.client._call(f"sheets.{name}")
+
+    def get_all_values(self):
+        self._call("get_all_values")
+        if not self.cells:
+            return []
+        height = max(r for r, _ in self.cells) + 1
+        width = max(c for _, c in self.cells) + 1
+        return [[self.cells.get((r, c), "") for c in range(width)] for r in range(height)]
+
+    def clear(self):
+        self._call("clear")
+        self.cells.clear()
+
+    def resize(self, rows=None, cols=None):
+        self._call("resize")
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+
+    def batch_update(self, data, **kwargs):
+        import gspread
+        self._call("batch_update")
+        self.spreadsheet.client.accounting.add("sheets.ranges_written", len(data))
+        for item in data:
+            start = item["range"].split(":")[0]
+            r0, c0 = gspread.utils.a1_to_rowcol(start)
+            for dr, row in enumerate(item["values"]):
+                for dc, value in enumerate(row):
+                    self.cells[(r0 - 1 + dr, c0 - 1 + dc)] = value
+        self.spreadsheet.touch()
+
+
+class FakeSpreadsheet:
+    """탭 = 2차원 값 목록 (values_batch_get 은 열 우선 범위 응답 생성)"""
+
+    def __init__(self, client, spreadsheet_id, tabs):
+        self.client = client
+        self.id = spreadsheet_id
+        self.tabs = tabs
+        self.sheets = {}
+        self.modified = 0
+
+    def touch(self):
+        self.modified += 1
+
+    def worksheets(self):
+        self.client._call("sheets.worksheets")
+        return [FakeWorksheet(self, t, len(v), 26, i) for i, (t, v) in enumerate(self.tabs.items())] + list(self.sheets.values())
+
+    def worksheet(self, title):
+        import gspread
+        self.client._call("sheets.worksheet")
+        if title not in self.sheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.client._call("sheets.add_worksheet")
+        self.sheets[title] = FakeWorksheet(self, title, rows, cols, 1000 + len(self.sheets))
+        self.touch()
+        return self.sheets[title]
+
+    def batch_update(self, body):
+        self.client._call("sheets.format_batch_update")
+
+    def values_batch_get(self, ranges, params=None):
+        import gspread
+        self.client._call("sheets.values_batch_get")
+        out = []
+        for rng in ranges:
+            tab, cells = rng.rsplit("!", 1)
+            grid = self.tabs[tab.strip("'").replace("''", "'")]
+            first, last = cells.split(":")
+            row0, col0 = gspread.utils.a1_to_rowcol(first)
+            width = max((len(row) for row in grid), default=0)
+            col1 = min(width, gspread.utils.column_letter_to_index(re.sub(r'\d', '', last)))
+            columns = [[row[c] if c < len(row) else "" for row in grid[row0 - 1:]] for c in range(col0 - 1, col1)]
+            out.append({"range": rng, "values": columns})
+        return {"valueRanges": out}
+
+
+class FakeSheetsClient:
+    """gspread.Client 대역 (get_file_drive_metadata / open_by_key)"""
+
+    def __init__(self, spreadsheets, latency_ms=150, accounting=None):
+        self.latency = latency_ms / 1000.0
+        self.accounting = accounting or Accounting()
+        self.spreadsheets = {sid: FakeSpreadsheet(self, sid, tabs) for sid, tabs in spreadsheets.items()}
+
+    def _call(self, name):
+        self.accounting.add(name)
+        time.sleep(self.latency)
+
+    def open_by_key(self, key):
+        self._call("sheets.open_by_key")
+        return self.spreadsheets[key]
+
+    def get_file_drive_metadata(self, key):
+        self._call("sheets.drive_metadata")
+        return {"modifiedTime": f"rev-{self.spreadsheets[key].modified}"}
+
+
+def student_names(n, seed=0):
+    """겹치지 않는 n명의 합성 이름 (부족하면 번호 접미)"""
+    rnd = random.Random(seed)
+    names = []
+    seen = set()
+    while len(names) < n:
+        name = rnd.choice(SURNAMES) + rnd.choice(GIVEN) + rnd.choice(GIVEN)
+        if name in seen:
+            name = f"{name}{len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def write_observations_csv(path, names, per_student=(4, 12), seed=0):
+    """KEYWORD_LIBRARY 어휘로 만든 관찰 기록 CSV (학생당 per_student 범위의 행 수)"""
+    import csv
+    rnd = random.Random(seed)
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for name in names:
+            for _ in range(rnd.randint(*per_student)):
+                cat, sub = rnd.choice(CATEGORIES)
+                writer.writerow([
+                    f"2026-{rnd.randint(3, 12):02d}-{rnd.randint(1, 28):02d}", name, cat, sub,
+                    " ".join(rnd.sample(PHRASES, 2)) + "함", rnd.choice(PHRASES),
+                    "수업/활동의 효율을 높임 (긍정)", rnd.choice(PHRASES)
+                ])
+                rows += 1
+    return rows
+
+
+def homeroom_tabs(names, seed=0):
+    """HOMEROOM_SHEET_MAP 열 배치를 따르는 담임 영역 탭 (생기부data / 진학희망교 / 자율 종합 / 1인 1역)"""
+    import gspread
+    rnd = random.Random(seed)
+
+    def grid(start_row, columns, records):
+        width = max(gspread.utils.column_letter_to_index(c) for c in columns.values())
+        rows = [[""] * width for _ in range(start_row - 1)]
+        for record in records:
+            row = [""] * width
+            for field, col in columns.items():
+                row[gspread.utils.column_letter_to_index(col) - 1] = record[field]
+            rows.append(row)
+        return rows
+
+    from homeroom_config import HOMEROOM_SHEET_MAP as m
+    text = lambda k: " ".join(rnd.sample(PHRASES, k))
+    return {
+        "생기부data": grid(m["생기부data"]["start_row"], m["생기부data"]["columns"], [
+            {"name": n, "dream": "연구원", "major": "공학", "career_raw": text(3), "behavior_raw": text(4)} for n in names]),
+        "진학희망교": grid(m["진학희망교"]["start_row"], m["진학희망교"]["columns"], [
+            {"name": n, "target_school": "", "target_note": text(1)} for n in names]),
+        "자율 종합(Random)": grid(m["자율 종합(Random)"]["start_row"], m["자율 종합(Random)"]["columns"], [
+            {"name": n, "auto_content": text(2)} for n in names]),
+        "1인 1역": [[n, rnd.choice(["학습 도우미", "환경 부장", "급식 도우미"])] for n in names],
+    }
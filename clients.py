@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+import seteuk_config
+from seteuk_config import SPREADSHEET_ID, GEMINI_MODEL, GOOGLE_SCOPES, HTTP_POOL_SIZE, TOKEN_REFRESH_MARGIN
+
+
+def load_api_key():
+    """GEMINI_API_KEY 조회 (중앙 .secrets/.env → 현재 폴더 .env → st.secrets 순)"""
+    try:
+        from dotenv import load_dotenv
+        from pathlib import Path
+        # [보안 패치] 중앙 .env 로드 로직
+        current = Path(os.getcwd())
+        env_loaded = False
+        while current != current.parent:
+            target = current / '.secrets' / '.env'
+            if target.exists():
+                load_dotenv(target)
+                print(f"🔐 Loaded central .env from {target}")
+                env_loaded = True
+                break
+            current = current.parent
+        if not env_loaded: load_dotenv()
+    except:
+        pass
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    # Streamlit Cloud 대응
+    if not api_key:
+        try:
+            import streamlit as st
+            api_key = st.secrets.get("GEMINI_API_KEY")
+        except:
+            pass
+
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment or secrets.")
+    return api_key
+
+
+class ClientRegistry:
+    """프로세스 공용 Gemini / 구글 시트 클라이언트 등록부
+
+    인증 정보, 연결 재사용(keep-alive) HTTP 세션 풀, 열어 둔 스프레드시트 핸들을 한 곳에서 소유하여
+    교과/담임 엔진, 대시보드, NEIS 도우미가 TLS/인증 절차를 반복하지 않도록 합니다.
+    각 클라이언트는 처음 요청될 때 만들어지며, 만료 임박 토큰은 ensure_fresh() 에서 미리 갱신합니다.
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        self.pool_size = pool_size
+        self.lock = threading.RLock()
+        self._api_key = None
+        self._credentials = None
+        self._genai = None
+        self._sheets = None
+        self._spreadsheets = {}
+
+    def api_key(self):
+        with self.lock:
+            if self._api_key is None:
+                self._api_key = load_api_key()
+            return self._api_key
+
+    def credentials(self):
+        """서비스 계정 인증 정보 (토큰은 만료 전에 자동 갱신)"""
+        with self.lock:
+            if self._credentials is None:
+                from google.oauth2.service_account import Credentials
+                self._credentials = Credentials.from_service_account_file(seteuk_config.SERVICE_ACCOUNT_FILE, scopes=GOOGLE_SCOPES)
+            return self._credentials
+
+    def genai(self):
+        """공용 Gemini 클라이언트 (동시 생성 요청이 하나의 연결 풀을 재사용)"""
+        with self.lock:
+            if self._genai is None:
+                import httpx
+                from google import genai
+                from google.genai import types
+                limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                self._genai = genai.Client(
+                    api_key=self.api_key(),
+                    http_options=types.HttpOptions(client_args={"limits": limits})
+                )
+            return self._genai
+
+    def sheets(self):
+        """공용 gspread 클라이언트 (연결 풀 크기를 지정한 인증 세션 사용)"""
+        with self.lock:
+            if self._sheets is None:
+                import gspread
+                from google.auth.transport.requests import AuthorizedSession
+                from requests.adapters import HTTPAdapter
+                session = AuthorizedSession(self.credentials())
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                self._sheets = gspread.Client(auth=None, session=session)
+            return self._sheets
+
+    def spreadsheet(self, spreadsheet_id=SPREADSHEET_ID):
+        """열어 둔 스프레드시트 핸들 (ID 별 1회만 open_by_key)"""
+        with self.lock:
+            if spreadsheet_id not in self._spreadsheets:
+                self._spreadsheets[spreadsheet_id] = self.sheets().open_by_key(spreadsheet_id)
+            return self._spreadsheets[spreadsheet_id]
+
+    def ensure_fresh(self):
+        """시트 인증 토큰이 만료되었거나 TOKEN_REFRESH_MARGIN 초 안에 만료되면 미리 갱신"""
+        with self.lock:
+            creds = self.credentials()
+            expiry = getattr(creds, "expiry", None)
+            remaining = (expiry.timestamp() - time.time()) if expiry else -1
+            if creds.valid and remaining > TOKEN_REFRESH_MARGIN:
+                return False
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+            return True
+
+    def health_check(self, ping=False):
+        """클라이언트 상태 점검 {sheets, gemini} (ping=True 이면 실제 API 를 1회씩 호출)"""
+        report = {}
+        try:
+            refreshed = self.ensure_fresh()
+            if ping:
+                self.sheets().get_file_drive_metadata(SPREADSHEET_ID)
+            report["sheets"] = {"ok": True, "token_refreshed": refreshed}
+        except Exception as e:
+            report["sheets"] = {"ok": False, "error": str(e)}
+        try:
+            client = self.genai()
+            if ping:
+                client.models.get(model=GEMINI_MODEL)
+            report["gemini"] = {"ok": True}
+        except Exception as e:
+            report["gemini"] = {"ok": False, "error": str(e)}
+        return report
+
+    def reset(self, spreadsheets_only=False):
+        """클라이언트 폐기 (연결 오류가 반복될 때 다음 요청에서 새로 생성)"""
+        with self.lock:
+            self._spreadsheets.clear()
+            if not spreadsheets_only:
+                self._genai = None
+                self._sheets = None
+                self._credentials = None
+
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_clients():
+    """교과/담임 엔진, 대시보드, NEIS 도우미가 함께 쓰는 프로세스 단일 클라이언트 등록부"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = ClientRegistry()
+        return _shared_registry
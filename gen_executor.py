@@ -0,0 +1,235 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing.managers import BaseManager
+from seteuk_config import GEN_MAX_CONCURRENCY, GEN_RATE_PER_MINUTE, GEN_MAX_RETRIES
+from metrics import get_shared_metrics
+
+# 재시도 대상 상태 코드 (할당량 초과 및 서버 오류)
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+def get_status_code(exc):
+    """SDK 예외 객체에서 HTTP 상태 코드 추출 (google-genai: code, requests 계열: status_code)"""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return code
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+class TokenBucket:
+    """분당 요청 수 제한용 토큰 버킷 (429 발생 시 속도 자동 감속, 성공 시 서서히 회복)"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.max_rate = rate_per_minute / 60.0
+        self.rate = self.max_rate
+        self.capacity = capacity or max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self):
+        with self.lock:
+            self._refill()
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def reward(self):
+        with self.lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class GenerationExecutor:
+    """Gemini 호출 공용 워커 풀 (동시 실행 수 제한 + 토큰 버킷 + 429/5xx 지수 백오프)"""
+
+    def __init__(self, max_workers=GEN_MAX_CONCURRENCY, rate_per_minute=GEN_RATE_PER_MINUTE, max_retries=GEN_MAX_RETRIES,
+                 bucket=None, slots=None):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        # bucket/slots 를 주면 (다중 학급 실행 시) 여러 프로세스가 공유하는 전체 예산을 사용
+        self.bucket = bucket or TokenBucket(rate_per_minute)
+        self.slots = slots
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="seteuk-gen")
+
+    def _retry_delay(self, exc, attempt, op):
+        """재시도 전 대기 시간(초), 재시도 대상이 아니거나 횟수를 넘었으면 None"""
+        metrics = get_shared_metrics()
+        code = get_status_code(exc)
+        metrics.inc("api_errors", op=op, code=code)
+        if code not in RETRYABLE_CODES or attempt >= self.max_retries:
+            return None
+        metrics.inc("api_retries", op=op)
+        if code == 429:
+            self.bucket.penalize()
+        delay = min(60.0, 2 ** attempt) + random.uniform(0, 1)
+        print(f"⏳ API 응답 {code}, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+        return delay
+
+    def _acquire(self, op):
+        """토큰/동시 요청 슬롯 확보 (대기 시간 기록 후 호출 시작 시각 반환)"""
+        waited = time.perf_counter()
+        self.bucket.acquire()
+        if self.slots:
+            self.slots.acquire()
+        start = time.perf_counter()
+        get_shared_metrics().observe("executor_wait_seconds", start - waited, op=op)
+        return start
+
+    def _release(self, op, start):
+        get_shared_metrics().observe("api_call_seconds", time.perf_counter() - start, op=op)
+        if self.slots:
+            self.slots.release()
+
+    def call(self, fn, *args, **kwargs):
+        """단일 호출 실행 (속도 제한 및 재시도 포함)"""
+        op = getattr(fn, "__name__", "call")
+        attempt = 0
+        while True:
+            start = self._acquire(op)
+            error = None
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+            finally:
+                self._release(op, start)
+            if error is None:
+                self.bucket.reward()
+                return result
+            delay = self._retry_delay(error, attempt, op)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+
+    def stream(self, fn, *args, **kwargs):
+        """스트리밍 호출 (fn 은 조각을 내보내는 이터러블 반환)
+
+        첫 조각을 받기 전 오류만 재시도합니다. 이미 화면에 내보낸 뒤의 오류는 그대로 전달합니다.
+        """
+        op = getattr(fn, "__name__", "stream")
+        attempt = 0
+        while True:
+            start = self._acquire(op)
+            started = False
+            error = None
+            try:
+                for chunk in fn(*args, **kwargs):
+                    if not started:
+                        get_shared_metrics().observe("api_first_chunk_seconds", time.perf_counter() - start, op=op)
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    get_shared_metrics().inc("api_errors", op=op, code=get_status_code(e))
+                    raise
+                error = e
+            finally:
+                self._release(op, start)
+            if error is None:
+                self.bucket.reward()
+                return
+            delay = self._retry_delay(error, attempt, op)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+
+    def run(self, tasks, managed=True):
+        """(key, fn, args) 작업 목록을 병렬 실행하고 완료 순서대로 (key, 결과) 반환
+
+        managed=False 이면 fn 이 내부에서 직접 self.call 로 API 호출을 감싸는 것으로 간주하여
+        작업 전체를 재시도하지 않음 (한 작업 안에 여러 API 호출이 있는 경우).
+        """
+        if managed:
+            futures = {self.pool.submit(self.call, fn, *args): key for key, fn, args in tasks}
+        else:
+            futures = {self.pool.submit(fn, *args): key for key, fn, args in tasks}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # 오류 발생 또는 소비 중단 시 대기 중인 작업 취소
+            for future in futures:
+                future.cancel()
+
+
+class BudgetManager(BaseManager):
+    """여러 학급 프로세스가 하나의 토큰 버킷/동시 요청 슬롯을 공유하기 위한 관리자"""
+
+
+# 다중 학급 실행 시 학급 프로세스가 접속할 예산 서버 주소("host:port")와 인증키(hex)
+BUDGET_ADDRESS_ENV = "SETEUK_BUDGET_ADDRESS"
+BUDGET_AUTHKEY_ENV = "SETEUK_BUDGET_AUTHKEY"
+
+
+def serve_budget(max_concurrency=GEN_MAX_CONCURRENCY, rate_per_minute=GEN_RATE_PER_MINUTE):
+    """전체 API 예산 서버를 백그라운드 스레드로 시작하고 학급 프로세스에 넘길 환경 변수 반환"""
+    bucket = TokenBucket(rate_per_minute)
+    slots = threading.BoundedSemaphore(max_concurrency)
+    authkey = os.urandom(16)
+
+    class _Server(BudgetManager):
+        pass
+
+    _Server.register("bucket", callable=lambda: bucket)
+    _Server.register("slots", callable=lambda: slots)
+    server = _Server(address=("127.0.0.1", 0), authkey=authkey).get_server()
+    threading.Thread(target=server.serve_forever, name="seteuk-budget", daemon=True).start()
+    host, port = server.address
+    return {BUDGET_ADDRESS_ENV: f"{host}:{port}", BUDGET_AUTHKEY_ENV: authkey.hex()}
+
+
+def connect_budget():
+    """환경 변수에 예산 서버가 지정되어 있으면 (bucket, slots) 프록시 반환, 없으면 None"""
+    address = os.environ.get(BUDGET_ADDRESS_ENV)
+    if not address:
+        return None
+
+    class _Client(BudgetManager):
+        pass
+
+    _Client.register("bucket")
+    _Client.register("slots")
+    host, port = address.rsplit(":", 1)
+    manager = _Client(address=(host, int(port)), authkey=bytes.fromhex(os.environ[BUDGET_AUTHKEY_ENV]))
+    manager.connect()
+    return manager.bucket(), manager.slots()
+
+
+_shared_executor = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_executor():
+    """교과/담임 엔진이 함께 쓰는 프로세스 단일 실행기 (예산 서버가 지정되면 전체 학급 예산 공유)"""
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            budget = connect_budget()
+            if budget:
+                bucket, slots = budget
+                _shared_executor = GenerationExecutor(bucket=bucket, slots=slots)
+            else:
+                _shared_executor = GenerationExecutor()
+        return _shared_executor
@@ -1,5 +1,9 @@
 # [담임 영역 프롬프트 고도화 - 군소리 배제 및 순수 본문만 출력]
 
+# [단일 요청 모드] True 이면 학생당 1회 요청으로 진로/자율/행종을 JSON 객체로 한 번에 생성
+# (파싱 실패 영역만 기존 영역별 프롬프트로 재요청)
+HOMEROOM_JSON_MODE = False
+
 # [중요] 모든 영역 공통 지침
 COMMON_STRICT_GUIDE = """
 [절대 규칙: 위반 시 시스템 데이터가 파손됨]
@@ -27,3 +31,46 @@ PROMPT_BEHAVIOR = f"""
 {COMMON_STRICT_GUIDE}
 - 내용: 상담 기록과 학급 생활 전반을 토대로 학생의 인성과 잠재력 서술 (450~500자 내외)
 """
+
+PROMPT_HOMEROOM_JSON = f"""
+당신은 담임교사입니다. 한 학생의 진로활동, 자율활동, 행동특성 및 종합의견을 한 번에 작성하십시오.
+{COMMON_STRICT_GUIDE}
+- career: 학생의 진로 희망과 전공 탐색 과정을 전문적으로 서술 (300자 내외)
+- autonomous: 1인 1역 활동과 공통 교육 활동에서 배운 점을 결합 (300자 내외)
+- behavior: 상담 기록과 학급 생활 전반을 토대로 학생의 인성과 잠재력 서술 (450~500자 내외)
+- 출력 형식: career, autonomous, behavior 세 필드만 가진 JSON 객체 (각 값은 순수 본문 문자열)
+"""
+
+# 단일 요청 모드 응답 스키마 (Gemini response_schema)
+HOMEROOM_JSON_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "career": {"type": "STRING"},
+        "autonomous": {"type": "STRING"},
+        "behavior": {"type": "STRING"}
+    },
+    "required": ["career", "autonomous", "behavior"]
+}
+
+# [담임 영역 시트 열 지도]
+# 필요한 열만 범위로 지정하여 한 번의 values_batch_get 요청으로 모든 탭을 가져옵니다.
+# start_row: 데이터 시작 행(1부터), columns: {필드명: 열 문자}, columns=None 이면 탭 전체(비정형 스캔용)
+HOMEROOM_SHEET_MAP = {
+    "생기부data": {
+        "start_row": 3,
+        "columns": {"name": "B", "dream": "C", "major": "N", "career_raw": "AJ", "behavior_raw": "AP"},
+        "required": True
+    },
+    "진학희망교": {
+        "start_row": 2,
+        "columns": {"name": "C", "target_school": "H", "target_note": "P"}
+    },
+    "자율 종합(Random)": {
+        "start_row": 2,
+        "columns": {"name": "I", "auto_content": "J"}
+    },
+    "1인 1역": {
+        "start_row": 1,
+        "columns": None
+    }
+}
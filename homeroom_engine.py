@@ -1,58 +1,49 @@
-import gspread
 import pandas as pd
-from google.oauth2.service_account import Credentials
 import os
 import json
-import re
-from google import genai
-from seteuk_config import SERVICE_ACCOUNT_FILE, SPREADSHEET_ID, PROHIBITED_KEYWORDS
-from homeroom_config import PROMPT_CAREER, PROMPT_AUTONOMOUS, PROMPT_BEHAVIOR
+import time
+from seteuk_config import SPREADSHEET_ID, GEMINI_MODEL, NEIS_BYTE_LIMITS, REPAIR_ENABLED, ROUTE_MAX_CALLS
+from google.genai import types
+from homeroom_config import PROMPT_CAREER, PROMPT_AUTONOMOUS, PROMPT_BEHAVIOR, PROMPT_HOMEROOM_JSON, HOMEROOM_JSON_SCHEMA, HOMEROOM_JSON_MODE, HOMEROOM_SHEET_MAP
+from gen_executor import get_shared_executor
+from clients import get_shared_clients
+import text_rules
+from sheet_snapshot import load_tabs
+from sentence_repair import repair_section
+from llm_cache import get_shared_cache
+from metrics import get_shared_metrics, record_usage
+from model_router import get_shared_router, section_ok
+from observation_compactor import estimate_tokens
+
+# 담임 영역 키 (결과 딕셔너리 순서)
+AREAS = ("career", "autonomous", "behavior")
 
 class HomeroomEngine:
     def __init__(self):
+        # 인증/HTTP 연결은 프로세스 공용 등록부에서 재사용
+        self.clients = get_shared_clients()
+        self.client_ai = self.clients.genai()
+        self.client_sheets = self.clients.sheets()
+        self.executor = get_shared_executor()
+        self.cache = get_shared_cache()
+        self.router = get_shared_router()
+
+    @property
+    def sh(self):
+        """스프레드시트 핸들 (스냅샷이 최신이면 열지 않도록 처음 필요할 때 연결)"""
+        return self.clients.spreadsheet(SPREADSHEET_ID)
+
+    def _load_tabs(self, sheet_map):
+        return load_tabs(self.client_sheets, SPREADSHEET_ID, sheet_map, lambda: self.sh, prefix="homeroom")
+
+    def get_individual_roles(self, rows=None):
+        """'1인 1역' 시트 비정형 스캔 (rows 를 주지 않으면 해당 탭만 조회)"""
         try:
-            from dotenv import load_dotenv
-            from pathlib import Path
-            # [보안 패치] 중앙 .env 로드 로직
-            current = Path(os.getcwd())
-            env_loaded = False
-            while current != current.parent:
-                target = current / '.secrets' / '.env'
-                if target.exists():
-                    load_dotenv(target)
-                    print(f"🔐 Loaded central .env from {target}")
-                    env_loaded = True
-                    break
-                current = current.parent
-            if not env_loaded: load_dotenv() # Fallback
-        except:
-            pass
-            
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            try:
-                import streamlit as st
-                self.api_key = st.secrets.get("GEMINI_API_KEY")
-            except:
-                pass
-
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment or secrets.")
-            
-        self.client_ai = genai.Client(api_key=self.api_key)
-        
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-        self.client_sheets = gspread.authorize(creds)
-        self.sh = self.client_sheets.open_by_key(SPREADSHEET_ID)
-
-    def get_individual_roles(self):
-        """'1인 1역' 시트 비정형 스캔"""
-        try:
-            ws = self.sh.worksheet("1인 1역")
-            data = ws.get_all_values()
+            if rows is None:
+                tabs, _ = self._load_tabs({"1인 1역": HOMEROOM_SHEET_MAP["1인 1역"]})
+                rows = tabs.get("1인 1역", [])
             role_map = {}
-            for row in data:
+            for row in rows:
                 for i in range(len(row)-1):
                     val = str(row[i]).strip()
                     next_val = str(row[i+1]).strip()
@@ -63,84 +54,274 @@ class HomeroomEngine:
             return {}
 
     def collect_all_data(self):
-        """담임 영역 통합 데이터 수집"""
+        """담임 영역 통합 데이터 수집 (HOMEROOM_SHEET_MAP 의 필요한 열만 1회 일괄 조회, 시트 변경이 없으면 스냅샷 사용)"""
         student_data = {}
-        roles = self.get_individual_roles()
+        tabs, self.last_fetch_stats = self._load_tabs(HOMEROOM_SHEET_MAP)
+        roles = self.get_individual_roles(tabs.get("1인 1역", []))
 
-        ws_data = self.sh.worksheet("생기부data")
-        rows = ws_data.get_all_values()
-        for row in rows[2:]:
-            if len(row) < 42: continue
-            name = row[1].strip()
+        for row in tabs["생기부data"]:
+            name = row["name"].strip()
             if not name: continue
             student_data[name] = {
-                "dream": row[2],
-                "major": row[13],
-                "career_raw": row[35],
-                "behavior_raw": row[41],
+                "dream": row["dream"],
+                "major": row["major"],
+                "career_raw": row["career_raw"],
+                "behavior_raw": row["behavior_raw"],
                 "role": roles.get(name, "학급 구성원")
             }
 
+        for row in tabs.get("진학희망교", []):
+            name = row["name"].strip()
+            if name in student_data:
+                student_data[name]["target_school"] = row["target_school"]
+                student_data[name]["target_note"] = row["target_note"]
+
+        for row in tabs.get("자율 종합(Random)", []):
+            name = row["name"].strip()
+            if name in student_data:
+                student_data[name]["auto_content"] = row["auto_content"]
+
+        return student_data
+
+    def _call_ai(self, system_instr, user_input, model=GEMINI_MODEL):
+        resp = self.client_ai.models.generate_content(
+            model=model,
+            contents=[system_instr, user_input]
+        )
+        record_usage(resp, "homeroom", model)
+        return resp.text.strip()
+
+    def _generate(self, system_instr, user_input, bypass_cache=False, model=GEMINI_MODEL):
+        """응답 캐시 조회 후 미스일 때만 API 호출 (속도 제한/재시도는 공용 실행기 경유)"""
+        text = self.cache.get(model, system_instr, user_input, bypass=bypass_cache)
+        if text is None:
+            text = self.executor.call(self._call_ai, system_instr, user_input, model)
+            self.cache.put(model, system_instr, user_input, text)
+        return text
+
+    def _call_ai_stream(self, system_instr, user_input, model=GEMINI_MODEL):
+        for chunk in self.client_ai.models.generate_content_stream(model=model, contents=[system_instr, user_input]):
+            if chunk.text:
+                yield chunk.text
+
+    def _stream(self, system_instr, user_input, bypass_cache=False, model=GEMINI_MODEL):
+        """스트리밍 생성: 조각이 도착할 때마다 누적 원문 반환 (캐시 적중 시 한 번에 반환, 완료 후 캐시 저장)"""
+        text = self.cache.get(model, system_instr, user_input, bypass=bypass_cache)
+        if text is not None:
+            yield text
+            return
+        parts = []
+        for piece in self.executor.stream(self._call_ai_stream, system_instr, user_input, model):
+            parts.append(piece)
+            yield "".join(parts)
+        self.cache.put(model, system_instr, user_input, "".join(parts).strip())
+
+    def stream_section(self, name, area, data, bypass_cache=False):
+        """학생 1명 담임 영역 1개 스트리밍 생성 ((정제된 본문, 진단, 완료 여부) 순회, 마지막은 전체 검증)"""
+        system_instr, user_input = next((s, u) for a, s, u in self.build_section_prompts(name, data) if a == area)
+        tokens = estimate_tokens(user_input)
+        model, reason = self.router.choose(area, tokens)
+        raw = ""
+        for raw in self._stream(system_instr, user_input, bypass_cache, model):
+            partial = text_rules.normalize(raw, name)
+            yield partial, text_rules.validate_partial(partial), False
+        text, diagnostics = text_rules.clean_and_validate(raw, name)
+        self.router.record(area, model, reason, section_ok(text, NEIS_BYTE_LIMITS[area]), name, tokens)
+        yield text, diagnostics, True
+
+    def build_section_prompts(self, name, data):
+        """학생 한 명의 담임 영역 (영역 키, 시스템 프롬프트, 입력) 목록"""
+        return [
+            ("career", PROMPT_CAREER, f"이름:{name}, 꿈:{data['dream']}, 전공:{data['major']}, 기록:{data['career_raw']}"),
+            ("autonomous", PROMPT_AUTONOMOUS, f"이름:{name}, 역할:{data['role']}, 활동:{data.get('auto_content','')}"),
+            ("behavior", PROMPT_BEHAVIOR, f"이름:{name}, 역할:{data['role']}, 관찰:{data['behavior_raw']}"),
+        ]
+
+    def _call_ai_json(self, user_input, model=GEMINI_MODEL):
+        resp = self.client_ai.models.generate_content(
+            model=model,
+            contents=[PROMPT_HOMEROOM_JSON, user_input],
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=HOMEROOM_JSON_SCHEMA
+            )
+        )
+        record_usage(resp, "homeroom_json", model)
+        return resp.text
+
+    def build_json_prompt(self, name, data):
+        """단일 요청 모드용 학생 통합 입력"""
+        return (f"이름:{name}, 꿈:{data['dream']}, 전공:{data['major']}, 진로기록:{data['career_raw']}, "
+                f"역할:{data['role']}, 자율활동:{data.get('auto_content','')}, 행동관찰:{data['behavior_raw']}")
+
+    def parse_sections_json(self, raw):
+        """JSON 응답에서 유효한 영역만 추출 (누락/빈 값/비문자열 필드는 제외)"""
         try:
-            ws_target = self.sh.worksheet("진학희망교")
-            rows_target = ws_target.get_all_values()
-            for row in rows_target[1:]:
-                if len(row) < 16: continue
-                name = row[2].strip()
-                if name in student_data:
-                    student_data[name]["target_school"] = row[7]
-                    student_data[name]["target_note"] = row[15]
-        except:
-            pass
+            obj = json.loads(raw)
+        except (TypeError, ValueError):
+            return {}
+        if not isinstance(obj, dict):
+            return {}
+        return {area: obj[area].strip() for area in AREAS
+                if isinstance(obj.get(area), str) and obj[area].strip()}
+
+    def _finish_section(self, name, area, text, repair=REPAIR_ENABLED, model=GEMINI_MODEL, max_calls=None):
+        """영역 본문 정제 → (검증 실패 시) 문장 단위 보정 (보정 요청은 본문을 만든 모델로)
+
+        반환: (본문, 보정 요청 수)
+        """
+        with get_shared_metrics().timer("validate_seconds", area=area):
+            text = self.clean_and_validate(text, name)
+        if not repair or max_calls == 0:
+            return text, 0
+        text, report = self._repair(name, area, text, model, max_calls)
+        return text, report["calls"]
+
+    def _repair(self, name, area, text, model, max_calls=None):
+        """검증 실패 문장만 model 로 재요청하여 보정 → (본문, 보정 보고)"""
+        metrics = get_shared_metrics()
+        text, report = repair_section(text, name, NEIS_BYTE_LIMITS[area],
+                                      lambda s, u: self._generate(s, u, model=model), max_calls=max_calls)
+        metrics.inc("repair_attempts", report["attempts"], area=area)
+        if report["attempts"] and not report["ok"]:
+            metrics.inc("repair_failed", area=area)
+            print(f"⚠️ [{name}] {area} 문장 보정 {report['attempts']}회 후에도 검증 미통과 ({model})")
+        return text, report
+
+    def repair(self, area, name, text):
+        """미리보기/편집 본문의 검증 실패 문장만 보정 (그 학생 영역을 마지막으로 만든 모델 사용) → (본문, 보정 보고)"""
+        model = self.router.model_for(name, area, "homeroom_json") or self.router.choose(area)[0]
+        return self._repair(name, area, text, model, ROUTE_MAX_CALLS)
 
+    def _route_section(self, name, area, system_instr, user_input, bypass_cache=False, repair=REPAIR_ENABLED,
+                       max_calls=ROUTE_MAX_CALLS):
+        """영역 경로의 모델로 생성 → 정제/보정, 보정 후에도 검증/바이트 한도 미통과 시 (요청 수 상한 이내에서) 상위 모델로 승급"""
+        def attempt(model, calls_left):
+            text, used = self._finish_section(name, area, self._generate(system_instr, user_input, bypass_cache, model),
+                                              repair, model, max_calls=calls_left - 1)
+            return text, used + 1
+
+        return self.router.run(area, user_input, attempt, lambda t: section_ok(t, NEIS_BYTE_LIMITS[area]), key=name,
+                               max_calls=max_calls)
+
+    def _generate_section(self, name, area, system_instr, user_input, bypass_cache=False, repair=REPAIR_ENABLED):
+        """학생 1명 담임 영역 1개 생성 → 정제/보정 (학생별 담임 영역 소요 시간 누적)"""
+        start = time.perf_counter()
+        text = self._route_section(name, area, system_instr, user_input, bypass_cache, repair)
+        get_shared_metrics().unit("homeroom", name, time.perf_counter() - start)
+        return text
+
+    def _generate_sections_json(self, name, data, bypass_cache=False, repair=REPAIR_ENABLED):
+        """학생 1명 담임 영역 단일 요청 생성
+
+        파싱 실패 영역과, 단일 응답이 보정 후에도 검증/바이트 한도를 통과하지 못한 영역은
+        영역별 프롬프트로 (영역 경로의 승급 규칙에 따라) 다시 생성합니다.
+        """
+        start = time.perf_counter()
+        user_input = self.build_json_prompt(name, data)
+        tokens = estimate_tokens(user_input)
+        model, reason = self.router.choose("homeroom_json", tokens)
+        raw = self.cache.get(model, PROMPT_HOMEROOM_JSON, user_input, extra=HOMEROOM_JSON_SCHEMA, bypass=bypass_cache)
         try:
-            ws_auto = self.sh.worksheet("자율 종합(Random)")
-            rows_auto = ws_auto.get_all_values()
-            for row in rows_auto[1:]:
-                if len(row) < 10: continue
-                name = row[8].strip()
-                if name in student_data:
-                    student_data[name]["auto_content"] = row[9]
-        except:
-            pass
+            if raw is None:
+                raw = self.executor.call(self._call_ai_json, user_input, model)
+            sections = self.parse_sections_json(raw)
+        except Exception as e:
+            print(f"⚠️ [{name}] 단일 요청 생성 실패, 영역별 생성으로 전환: {e}")
+            sections = {}
+        # 세 영역이 모두 유효한 응답만 캐시에 저장
+        if len(sections) == 3:
+            self.cache.put(model, PROMPT_HOMEROOM_JSON, user_input, raw, extra=HOMEROOM_JSON_SCHEMA)
+        # 단일 요청 1회를 영역마다 요청 수 상한에 포함
+        used = {area: 1 for area in AREAS}
+        for area in list(sections):
+            sections[area], calls = self._finish_section(name, area, sections[area], repair, model, max_calls=ROUTE_MAX_CALLS - 1)
+            used[area] += calls
+            if self.router.enabled and used[area] < ROUTE_MAX_CALLS and not section_ok(sections[area], NEIS_BYTE_LIMITS[area]):
+                del sections[area]
+        self.router.record("homeroom_json", model, reason, len(sections) == 3, name, tokens)
+        for area, system_instr, section_input in self.build_section_prompts(name, data):
+            if area not in sections:
+                sections[area] = self._route_section(name, area, system_instr, section_input, bypass_cache, repair,
+                                                     max_calls=ROUTE_MAX_CALLS - used[area])
+        get_shared_metrics().unit("homeroom", name, time.perf_counter() - start)
+        return {area: sections[area] for area in AREAS}
 
-        return student_data
+    def clean_and_validate(self, text, student_name):
+        """군소리 제거 (검증 결과는 text_rules.validate 로 조회, 본문에 경고 문구를 붙이지 않음)"""
+        text, _ = text_rules.clean_and_validate(text, student_name)
+        return text
+
+    def generate_homeroom_sections(self, student_data, json_mode=HOMEROOM_JSON_MODE, bypass_cache=False, journal=None, repair=REPAIR_ENABLED):
+        """담임 영역 AI 생성 및 금지어/맞춤법 검증 (제너레이터 방식, 병렬 호출 후 학생 단위 완료 순서대로 반환)
 
-    def generate_homeroom_sections(self, student_data):
-        """담임 영역 AI 생성 및 금지어/맞춤법 검증 (제너레이터 방식)"""
+        json_mode=True 이면 학생당 1회 요청으로 세 영역을 JSON 객체로 생성합니다.
+        bypass_cache=True 이면 응답 캐시를 무시하고 전원 강제 재생성합니다.
+        journal(RunJournal)을 주면 검증된 영역을 즉시 기록하고, 이미 기록된 영역은 건너뜁니다.
+        repair=True 이면 검증에 실패한 문장만 재요청하여 보정합니다.
+        """
         results = {}
         total = len(student_data)
-        for i, (name, data) in enumerate(student_data.items()):
-            def call_ai_with_check(system_instr, user_input):
-                resp = self.client_ai.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=[system_instr, user_input]
-                )
-                return resp.text.strip()
-
-            career_text = call_ai_with_check(PROMPT_CAREER, f"이름:{name}, 꿈:{data['dream']}, 전공:{data['major']}, 기록:{data['career_raw']}")
-            auto_text = call_ai_with_check(PROMPT_AUTONOMOUS, f"이름:{name}, 역할:{data['role']}, 활동:{data.get('auto_content','')}")
-            behave_text = call_ai_with_check(PROMPT_BEHAVIOR, f"이름:{name}, 역할:{data['role']}, 관찰:{data['behavior_raw']}")
-
-            def clean_and_validate(text, student_name):
-                # 1. 정제
-                text = re.sub(r'^\*\*.*?\*\*.*', '', text, flags=re.MULTILINE)
-                text = re.sub(r'^\[.*?\]', '', text, flags=re.MULTILINE)
-                text = text.replace(f"{student_name}은", "").replace(f"{student_name}는", "").replace(f"{student_name}의", "")
-                text = text.replace(f"{student_name}", "").replace("이 학생은", "").replace("학생은", "").strip()
-                text = text.strip('"').strip("'")
-                text = re.sub(r'^[은는이가]\s*', '', text)
-
-                # 2. 금지어 체크
-                found_prohibited = [kw for kw in PROHIBITED_KEYWORDS if kw in text]
-                if found_prohibited:
-                    text = f"[⚠️금지어주의: {', '.join(found_prohibited)}] " + text
-                return text
-
-            results[name] = {
-                "career": clean_and_validate(career_text, name),
-                "autonomous": clean_and_validate(auto_text, name),
-                "behavior": clean_and_validate(behave_text, name)
-            }
+        done = 0
+
+        # 1. 이어하기: 기록부에 있는 영역 복원 (세 영역 모두 있으면 학생 전체 건너뜀)
+        restored = {}
+        for name in student_data:
+            sections = {}
+            if journal:
+                for area in AREAS:
+                    text = journal.get(f"homeroom/{name}/{area}")
+                    if text is not None:
+                        sections[area] = text
+            if len(sections) == len(AREAS):
+                results[name] = sections
+                done += 1
+                yield done / total, name, results
+            else:
+                restored[name] = sections
+        todo = {name: data for name, data in student_data.items() if name in restored}
+
+        # 2. 나머지 학생 생성
+        if json_mode:
+            tasks = [(name, self._generate_sections_json, (name, data, bypass_cache, repair)) for name, data in todo.items()]
+            completed = self.executor.run(tasks, managed=False)
+        else:
+            # 영역별 모드는 영역이 끝나는 즉시 작업 루프에서 기록
+            completed = self._run_per_section(todo, bypass_cache, restored, repair, journal)
+
+        for name, sections in completed:
+            # 작업자에서 정제/보정을 마친 영역 + 기록부에서 복원한 영역
+            cleaned = dict(restored[name])
+            for area in AREAS:
+                if area in cleaned:
+                    continue
+                cleaned[area] = sections[area]
+                if journal and json_mode:
+                    journal.record(f"homeroom/{name}/{area}", cleaned[area])
+            results[name] = {area: cleaned[area] for area in AREAS}
+            done += 1
             # 진행률, 현재 학생 이름, 결과 데이터 반환
-            yield (i + 1) / total, name, results
+            yield done / total, name, results
+
+    def _run_per_section(self, student_data, bypass_cache=False, skip=None, repair=REPAIR_ENABLED, journal=None):
+        """영역별 요청을 병렬 실행하고 남은 영역이 모두 끝난 학생부터 (이름, 영역별 정제 본문) 반환
+
+        skip 에 {이름: {영역: 본문}} 을 주면 해당 영역은 요청하지 않습니다.
+        journal 을 주면 학생의 다른 영역을 기다리지 않고 영역이 끝나는 즉시 기록합니다.
+        """
+        skip = skip or {}
+        pending = {name: {} for name in student_data}
+        remaining = {}
+        tasks = []
+        for name, data in student_data.items():
+            prompts = [p for p in self.build_section_prompts(name, data) if p[0] not in skip.get(name, {})]
+            remaining[name] = len(prompts)
+            for area, system_instr, user_input in prompts:
+                tasks.append(((name, area), self._generate_section, (name, area, system_instr, user_input, bypass_cache, repair)))
+
+        for (name, area), text in self.executor.run(tasks, managed=False):
+            if journal:
+                journal.record(f"homeroom/{name}/{area}", text)
+            pending[name][area] = text
+            if len(pending[name]) == remaining[name]:
+                yield name, pending.pop(name)
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from seteuk_config import CACHE_DB, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_MAX_AGE_DAYS
+from metrics import get_shared_metrics
+
+
+def make_key(model, system_instr, user_input, extra=None):
+    """모델명 + 시스템 프롬프트 + 사용자 입력(+ 응답 스키마 등 부가 설정) 기반 콘텐츠 해시"""
+    payload = json.dumps([model, system_instr, user_input, extra], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite 기반 LLM 응답 캐시 (최근 사용 순 LRU + 보관 기간/용량 제한)"""
+
+    EVICT_EVERY = 100
+
+    def __init__(self, path=CACHE_DB, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, max_age_days=CACHE_MAX_AGE_DAYS,
+                 timeout=30):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self.lock = threading.Lock()
+        # 여러 학급 프로세스(--manifest)가 같은 캐시 파일을 쓰므로 잠금 대기 시간 지정
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                text TEXT,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, model, system_instr, user_input, extra=None, bypass=False):
+        """캐시 조회 (bypass=True 이면 강제 재생성을 위해 항상 미스 처리)"""
+        if bypass:
+            with self.lock:
+                self.misses += 1
+            get_shared_metrics().inc("cache_lookups", result="bypass")
+            return None
+        key = make_key(model, system_instr, user_input, extra)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                get_shared_metrics().inc("cache_lookups", result="miss")
+                return None
+            self._write("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        get_shared_metrics().inc("cache_lookups", result="hit")
+        return row[0]
+
+    def put(self, model, system_instr, user_input, text, extra=None):
+        key = make_key(model, system_instr, user_input, extra)
+        now = time.time()
+        with self.lock:
+            self._write(
+                "INSERT OR REPLACE INTO responses (key, model, text, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, text, len(text.encode("utf-8")), now, now)
+            )
+            self._puts += 1
+            run_evict = self._puts % self.EVICT_EVERY == 0
+        if run_evict:
+            self.evict()
+
+    def _write(self, sql, params):
+        """캐시 쓰기 (대기 시간 안에 잠금을 얻지 못하면 저장을 건너뜀, 캐시는 없어도 생성에 지장 없음), 잠금 보유 상태에서 호출"""
+        try:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+            return True
+        except sqlite3.OperationalError as e:
+            self.conn.rollback()
+            get_shared_metrics().inc("cache_write_skipped")
+            print(f"⚠️ LLM 캐시 쓰기 건너뜀: {e}")
+            return False
+
+    def evict(self):
+        """보관 기간 초과 항목 삭제 후, 개수/용량 한도를 넘으면 오래 안 쓴 항목부터 삭제 (다른 프로세스가 쓰는 중이면 다음 기회로 미룸)"""
+        try:
+            self._evict()
+        except sqlite3.OperationalError as e:
+            with self.lock:
+                self.conn.rollback()
+            print(f"⚠️ LLM 캐시 정리 건너뜀: {e}")
+
+    def _evict(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,))
+            count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            if count > self.max_entries or total > self.max_bytes:
+                removed = 0
+                for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                    if count <= self.max_entries and total <= self.max_bytes:
+                        break
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    count -= 1
+                    total -= size
+                    removed += 1
+                print(f"🧹 LLM 캐시 정리: {removed}건 삭제")
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def stats(self):
+        with self.lock:
+            count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total}
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """교과/담임 엔진이 함께 쓰는 프로세스 단일 캐시"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
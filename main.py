@@ -1,50 +1,173 @@
+import argparse
 from seteuk_core import SeteukEngine
 from homeroom_engine import HomeroomEngine
+from batch_runner import run_batch, LocalBatchBackend, GeminiBatchBackend, echo_responder
+from gen_executor import get_shared_executor
+from run_journal import RunJournal, latest_run_id
+from observation_store import get_shared_store
+from shard_runner import load_manifest, run_manifest, write_status
+from metrics import get_shared_metrics
+from near_duplicates import check_near_duplicates
+from seteuk_config import SHARD_MAX_PARALLEL, RESULT_SHEET
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="교과 및 담임 영역 통합 세특 생성")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 무시하고 전원 강제 재생성")
+    parser.add_argument("--resume", metavar="RUN_ID", help="중단된 실행 이어하기 (last: 가장 최근 실행)")
+    parser.add_argument("--batch", action="store_true", help="전체 프롬프트를 일괄 작업으로 제출 (진행 중 작업이 있으면 이어서 대기)")
+    parser.add_argument("--batch-backend", choices=["gemini", "local"], default="gemini", help="일괄 작업 백엔드 (local: 파일 기반 대체 백엔드)")
+    parser.add_argument("--local-responder", choices=["echo", "file", "gemini"], default="echo",
+                        help="local 백엔드 응답 방식 (echo: API 호출 없는 가짜 응답, file: 외부에서 responses.jsonl 작성 대기, "
+                             "gemini: 공용 실행기(속도 제한/재시도) 경유 실제 호출)")
+    parser.add_argument("--poll-interval", type=int, default=60, help="일괄 작업 상태 확인 간격(초)")
+    parser.add_argument("--import-csv", metavar="PATH", help="CSV 로 관찰 기록 저장소를 교체한 뒤 종료")
+    parser.add_argument("--export-csv", metavar="PATH", help="관찰 기록 저장소를 CSV 로 내보낸 뒤 종료")
+    parser.add_argument("--manifest", metavar="PATH", help="학급 목록(JSON)의 모든 학급을 병렬 실행 (학년 전체 일괄 처리)")
+    parser.add_argument("--jobs", type=int, default=SHARD_MAX_PARALLEL, help="--manifest 실행 시 동시에 처리할 학급 수")
+    return parser.parse_args()
+
+def shard_passthrough(args):
+    """학급 하위 프로세스에 그대로 넘길 실행 옵션"""
+    argv = []
+    if args.no_cache:
+        argv.append("--no-cache")
+    if args.batch:
+        argv += ["--batch", "--batch-backend", args.batch_backend, "--local-responder", args.local_responder,
+                 "--poll-interval", str(args.poll_interval)]
+    return argv
+
+def report_stage(stage, **info):
+    """실행 단계 기록 (다중 학급 실행기용 상태 파일 + 단계별 소요 시간 지표)"""
+    write_status(stage, **info)
+    get_shared_metrics().stage(stage)
+
+def print_metrics(path):
+    """실행 보고서 요약 출력 (단계별 시간, Gemini 호출 지연/재시도)"""
+    summary = get_shared_metrics().summary()
+    stages = ", ".join(f"{s['stage']} {s['seconds']:.1f}s" for s in summary["stages"])
+    print(f"\n⏱️ 단계별 소요: {stages}")
+    calls = [(k, h) for k, h in summary["histograms"].items() if k.startswith("api_call_seconds")]
+    for key, h in calls:
+        print(f"   - {key}: {h['count']}회, p50 {h['p50']:.2f}s / p99 {h['p99']:.2f}s")
+    retries = sum(v for k, v in summary["counters"].items() if k.startswith("api_retries"))
+    if retries:
+        print(f"   - 재시도 {retries}회")
+    print(f"📊 성능 보고서: {path}")
+
+def integrate(course_results, home_results):
+    """교과/담임 결과를 이름 기준으로 통합"""
+    final_integrated_data = {}
+    
+    # 모든 학생 리스트 추출 (교과 데이터 + 담임 데이터 합집합)
+    all_student_names = set(course_results.keys()) | set(home_results.keys())
+    
+    for name in sorted(all_student_names):
+        final_integrated_data[name] = {
+            "course": course_results.get(name, ""),
+            "career": home_results.get(name, {}).get("career", ""),
+            "autonomous": home_results.get(name, {}).get("autonomous", ""),
+            "behavior": home_results.get(name, {}).get("behavior", "")
+        }
+    return final_integrated_data
+
+def main_batch(args, course_engine, home_engine):
+    """일괄 작업 모드: 제출/재개 → 대기 → 정제 → 통합 업로드"""
+    print("🚀 1단계: 교과 세특(질적 분석) 데이터 전처리 중...")
+    report_stage("preprocess")
+    course_engine.preprocess()
+
+    report_stage("batch")
+    print(f"\n🚀 2단계: 전체 프롬프트 일괄 작업 처리 중 (백엔드: {args.batch_backend})...")
+    if args.batch_backend == "local":
+        responders = {
+            "echo": echo_responder,
+            "file": None,
+            "gemini": lambda s, u: get_shared_executor().call(course_engine._call_ai, s, u),
+        }
+        backend = LocalBatchBackend(responder=responders[args.local_responder])
+    else:
+        backend = GeminiBatchBackend(course_engine.client_ai)
+    course_results, home_results = run_batch(course_engine, home_engine, backend, args.poll_interval, args.no_cache)
+
+    print("\n🚀 3단계: 모든 영역 데이터 통합 및 구글 스프레드시트 업로드 중...")
+    final_integrated_data = integrate(course_results, home_results)
+    report_stage("near_dup")
+    check_near_duplicates(final_integrated_data)
+    report_stage("sync")
+    course_engine.sync_all(final_integrated_data)
+    report_stage("done", students=len(course_results))
+    print_metrics(get_shared_metrics().write_report())
+    print("\n✨ [완료] 일괄 작업 기반 통합 세특 생성이 마무리되었습니다!")
 
 def main():
+    args = parse_args()
+    if args.import_csv or args.export_csv:
+        store = get_shared_store()
+        if args.import_csv:
+            print(f"📦 관찰 기록 {store.import_csv(args.import_csv)}행을 저장소로 가져왔습니다.")
+        if args.export_csv:
+            print(f"📤 관찰 기록을 내보냈습니다: {store.export_csv(args.export_csv)}")
+        return
+    if args.manifest:
+        raise SystemExit(1 if run_manifest(load_manifest(args.manifest), args.jobs, passthrough=shard_passthrough(args)) else 0)
+
     course_engine = SeteukEngine()
     home_engine = HomeroomEngine()
+    if args.batch:
+        return main_batch(args, course_engine, home_engine)
+
+    # 실행 기록부 (학생/영역 단위로 즉시 기록, --resume 시 완료 단위 건너뜀)
+    run_id = latest_run_id() if args.resume == "last" else args.resume
+    journal = RunJournal(run_id)
+    print(f"📝 실행 ID: {journal.run_id}" + (f" (완료 단위 {len(journal.completed())}개 복원)" if args.resume else ""))
     
     # 1. 교과 데이터 처리 (질적 연구 기반)
     print("🚀 1단계: 교과 세특(질적 분석) 데이터 전처리 중...")
+    report_stage("preprocess")
     course_count = course_engine.preprocess()
     course_results = {}
     if course_count > 0:
         print(f"   - {course_count}명의 교과 관찰 기록 분석 및 AI 생성 중...")
         # 제너레이터를 리스트/딕셔너리로 변환하여 마지막 결과 획득
-        for prog, name, current_results in course_engine.generate_course_seteuk():
+        # 관찰 기록이 바뀐 학생만 재생성 (--no-cache 이면 전원 재생성)
+        only = None if args.no_cache else course_engine.dirty_students
+        if only is not None:
+            print(f"   - 변경 감지: {len(only)}명 재생성, {course_count - len(only)}명 이전 결과 재사용")
+        for prog, name, current_results in course_engine.generate_course_seteuk(bypass_cache=args.no_cache, only=only, journal=journal):
             course_results = current_results
+            report_stage("course", done=len(course_results), total=course_count)
     
     # 2. 담임 영역 처리 (시트 데이터 기반)
     print("\n🚀 2단계: 담임 영역(진로/자율/행종) 시트 데이터 취합 중...")
+    report_stage("homeroom")
     home_data = home_engine.collect_all_data()
     print(f"   - {len(home_data)}명의 담임 영역 데이터 분석 및 AI 생성 중...")
     # 제너레이터를 리스트/딕셔너리로 변환하여 마지막 결과 획득
     home_results = {}
-    for prog, name, current_results in home_engine.generate_homeroom_sections(home_data):
+    for prog, name, current_results in home_engine.generate_homeroom_sections(home_data, bypass_cache=args.no_cache, journal=journal):
         home_results = current_results
+        report_stage("homeroom", done=len(home_results), total=len(home_data))
     
     # 3. 데이터 통합 (이름 기준 매칭)
     print("\n🚀 3단계: 모든 영역 데이터 통합 중...")
-    final_integrated_data = {}
-    
-    # 모든 학생 리스트 추출 (교과 데이터 + 담임 데이터 합집합)
-    all_student_names = set(course_results.keys()) | set(home_results.keys())
-    
-    for name in sorted(all_student_names):
-        final_integrated_data[name] = {
-            "course": course_results.get(name, ""),
-            "career": home_results.get(name, {}).get("career", ""),
-            "autonomous": home_results.get(name, {}).get("autonomous", ""),
-            "behavior": home_results.get(name, {}).get("behavior", "")
-        }
+    final_integrated_data = integrate(course_results, home_results)
+    # 학생 간 거의 같은 본문 검출 (업로드 전 경고)
+    report_stage("near_dup", students=len(final_integrated_data))
+    check_near_duplicates(final_integrated_data)
     
     # 4. 최종 동기화
     print("\n🚀 4단계: 구글 스프레드시트 최종 통합 업로드 중...")
+    report_stage("sync", students=len(final_integrated_data))
     course_engine.sync_all(final_integrated_data)
+    journal.finish()
+    report_stage("done", students=len(final_integrated_data))
     
+    print_metrics(get_shared_metrics().write_report(journal.run_id))
+
+    stats = course_engine.cache.stats()
+    print(f"\n💾 응답 캐시: 적중 {stats['hits']}건 / 미스 {stats['misses']}건 (저장 {stats['entries']}건)")
     print("\n✨ [완료] 교과 및 담임 영역 통합 세특 생성이 마무리되었습니다!")
-    print("🔗 구글 시트의 '세특최종결과물' 탭을 확인해 보세요.")
+    print(f"🔗 구글 시트의 '{RESULT_SHEET}' 탭을 확인해 보세요.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from seteuk_config import RUNS_DIR, METRICS_PROM_FILE, METRICS_SLOWEST
+
+# Prometheus 히스토그램 구간(초)
+BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _render(key):
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Metrics:
+    """생성 파이프라인 계측 (카운터 / 소요 시간 히스토그램 / 단계 / 학생 단위 작업 시간)
+
+    외부 호출(Gemini, 시트)과 파이프라인 단계를 감싸 실행 단위로 모읍니다.
+    실행이 끝나면 write_report() 로 runs/<run_id>.metrics.json 에 저장하고,
+    METRICS_PROM_FILE 이 지정되어 있으면 Prometheus 텍스트 파일도 함께 갱신합니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """새 실행 시작 (이전 실행 값 폐기)"""
+        with self.lock:
+            self.started = time.time()
+            self.counters = {}
+            self.histograms = {}
+            self.units = {}
+            self.stages = []
+            self._stage = None
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.histograms.setdefault(key, []).append(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def unit(self, kind, key, seconds):
+        """학생(또는 학생/영역) 단위 작업 시간 (가장 느린 학생 목록용)"""
+        with self.lock:
+            units = self.units.setdefault(kind, {})
+            units[key] = units.get(key, 0) + seconds
+
+    def stage(self, name):
+        """파이프라인 단계 전환 (같은 단계 반복 호출은 무시, 'done' 이면 마지막 단계 종료)"""
+        now = time.perf_counter()
+        with self.lock:
+            if self._stage and self._stage[0] == name:
+                return
+            if self._stage:
+                self.stages.append({"stage": self._stage[0], "seconds": round(now - self._stage[1], 3)})
+            self._stage = (name, now) if name != "done" else None
+
+    def summary(self):
+        """실행 요약 (카운터, 히스토그램 통계, 단계별 시간, 가장 느린 학생)"""
+        with self.lock:
+            counters = {_render(k): v for k, v in sorted(self.counters.items())}
+            histograms = {}
+            for key, values in sorted(self.histograms.items()):
+                values = sorted(values)
+                histograms[_render(key)] = {
+                    "count": len(values), "sum": round(sum(values), 3),
+                    "p50": round(_percentile(values, 0.5), 4), "p90": round(_percentile(values, 0.9), 4),
+                    "p99": round(_percentile(values, 0.99), 4), "max": round(values[-1], 4),
+                }
+            slowest = {
+                kind: [[key, round(sec, 3)] for key, sec in sorted(units.items(), key=lambda kv: -kv[1])[:METRICS_SLOWEST]]
+                for kind, units in self.units.items()
+            }
+            stages = list(self.stages)
+        return {"started": self.started, "elapsed": round(time.time() - self.started, 3), "stages": stages,
+                "counters": counters, "histograms": histograms, "slowest": slowest}
+
+    def prometheus(self):
+        """Prometheus 텍스트 형식 (node_exporter textfile collector 용)"""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((k, sorted(v)) for k, v in self.histograms.items())
+            stages = list(self.stages)
+        for (name, labels), value in counters:
+            lines.append(f"seteuk_{_render((name + '_total', labels))} {value}")
+        for (name, labels), values in histograms:
+            seen = 0
+            for bound in BUCKETS:
+                while seen < len(values) and values[seen] <= bound:
+                    seen += 1
+                lines.append(f"seteuk_{_render((name + '_bucket', labels + (('le', str(bound)),)))} {seen}")
+            lines.append(f"seteuk_{_render((name + '_bucket', labels + (('le', '+Inf'),)))} {len(values)}")
+            lines.append(f"seteuk_{_render((name + '_sum', labels))} {sum(values):.6f}")
+            lines.append(f"seteuk_{_render((name + '_count', labels))} {len(values)}")
+        for s in stages:
+            lines.append(f'seteuk_stage_seconds{{stage="{s["stage"]}"}} {s["seconds"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, run_id=None, prom_file=METRICS_PROM_FILE):
+        """실행 보고서 저장 (runs/<run_id>.metrics.json, 지정 시 Prometheus 텍스트 파일) 후 경로 반환"""
+        self.stage("done")
+        run_id = run_id or time.strftime('%Y%m%d_%H%M%S')
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        path = os.path.join(RUNS_DIR, f"{run_id}.metrics.json")
+        _write_atomic(path, json.dumps({"run_id": run_id, **self.summary()}, ensure_ascii=False, indent=2))
+        if prom_file:
+            _write_atomic(prom_file, self.prometheus())
+        return path
+
+
+def _write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def record_usage(response, op, model=None):
+    """Gemini 응답의 usage_metadata 토큰 수 집계 (없으면 무시, model 을 주면 모델별로 구분)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    metrics = get_shared_metrics()
+    labels = {"op": op, "model": model} if model else {"op": op}
+    for field, name in (("prompt_token_count", "prompt"), ("candidates_token_count", "output")):
+        count = getattr(usage, field, None)
+        if count:
+            metrics.inc("gemini_tokens", count, kind=name, **labels)
+
+
+def latest_report():
+    """가장 최근 실행 보고서 (없으면 None)"""
+    if not os.path.isdir(RUNS_DIR):
+        return None
+    reports = sorted(f for f in os.listdir(RUNS_DIR) if f.endswith(".metrics.json"))
+    if not reports:
+        return None
+    with open(os.path.join(RUNS_DIR, reports[-1]), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+_shared_metrics = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_metrics():
+    """엔진/실행기/시트 모듈이 함께 쓰는 프로세스 단일 계측기"""
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+        return _shared_metrics
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from seteuk_config import (GEMINI_MODEL, MODEL_ROUTING_ENABLED, MODEL_LADDER, MODEL_ROUTES, ROUTE_LONG_PROMPT_TOKENS,
+                           ROUTE_FAILURE_RATE, ROUTE_WINDOW, ROUTE_MIN_SAMPLES, ROUTE_MAX_CALLS, ROUTING_LOG)
+import text_rules
+from neis_bytes import neis_bytes
+from metrics import get_shared_metrics
+from observation_compactor import estimate_tokens
+
+# 기록 파일이 이 크기를 넘으면 시작 시 최근 기록만 남기고 정리
+ROUTING_LOG_MAX_BYTES = 5 * 1024 * 1024
+# 실패율 때문에 시작 모델을 건너뛰는 중에도 N 번에 한 번은 시작 모델로 시도하여 실패율 회복 여부 확인
+ROUTE_PROBE_EVERY = 10
+
+
+def section_ok(text, byte_limit):
+    """정제/보정을 마친 본문이 검증(금지어·종결 어미)과 나이스 바이트 한도를 모두 통과하는지"""
+    return bool(text) and text_rules.validate(text)["ok"] and neis_bytes(text) <= byte_limit
+
+
+class ModelRouter:
+    """작업별 모델 선택 및 실패 시 승급
+
+    작업(course/career/autonomous/behavior/summary ...)마다 MODEL_ROUTES 의 시작 모델에서 출발하며,
+    입력이 길거나 시작 모델의 최근 실패율이 높으면 한 단계 위 모델로 시작합니다.
+    각 단계에서 생성 후 문장 보정까지 했는데도 검증/바이트 한도를 통과하지 못할 때만
+    MODEL_LADDER 를 따라 상한 모델까지 한 단계씩 올리며, 영역 1개당 요청 수는 ROUTE_MAX_CALLS 이내입니다.
+    모든 결정은 출력 폴더의 routing.jsonl 에 기록되며, 다음 실행 시 실패율 계산에 다시 사용됩니다.
+    """
+
+    def __init__(self, log_path=ROUTING_LOG, enabled=MODEL_ROUTING_ENABLED):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.lock = threading.Lock()
+        self.outcomes = {}
+        self.skipped = {}
+        # (작업, 키)별 마지막으로 본문을 만든 모델 (미리보기 보정 시 같은 모델 사용)
+        self.produced = {}
+        self._seq = 0
+        for task, route in MODEL_ROUTES.items():
+            for model in (route["start"], route["max"]):
+                if model not in MODEL_LADDER:
+                    raise ValueError(f"MODEL_ROUTES[{task!r}] 의 모델 {model!r} 이 MODEL_LADDER 에 없습니다.")
+        self._load()
+
+    def _load(self):
+        """이전 실행 기록에서 (작업, 모델)별 최근 성공/실패 복원"""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            lines = deque(f, maxlen=ROUTE_WINDOW * 50)
+        if os.path.getsize(self.log_path) > ROUTING_LOG_MAX_BYTES:
+            tmp = self.log_path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            os.replace(tmp, self.log_path)
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "ok" in entry:
+                self._window(entry["task"], entry["model"]).append(bool(entry["ok"]))
+            self._remember(entry.get("task"), entry.get("key"), entry.get("model"))
+
+    def _remember(self, task, key, model):
+        if key is None:
+            return
+        self._seq += 1
+        self.produced[(task, key)] = (self._seq, model)
+
+    def model_for(self, key, *tasks):
+        """tasks 중 key(학생 이름)의 본문을 가장 최근에 만든 모델 (기록이 없으면 None)"""
+        with self.lock:
+            found = [self.produced[(t, key)] for t in tasks if (t, key) in self.produced]
+        return max(found)[1] if found else None
+
+    def _window(self, task, model):
+        return self.outcomes.setdefault((task, model), deque(maxlen=ROUTE_WINDOW))
+
+    def failure_rate(self, task, model):
+        """최근 실패율 (결과 수가 ROUTE_MIN_SAMPLES 미만이면 None)"""
+        with self.lock:
+            window = list(self.outcomes.get((task, model), ()))
+        if len(window) < ROUTE_MIN_SAMPLES:
+            return None
+        return 1 - sum(window) / len(window)
+
+    def _bounds(self, task):
+        route = MODEL_ROUTES.get(task)
+        if not route:
+            return None
+        return MODEL_LADDER.index(route["start"]), MODEL_LADDER.index(route["max"])
+
+    def choose(self, task, prompt_tokens=0):
+        """(모델, 선택 사유) — 라우팅이 꺼져 있거나 경로가 없는 작업은 GEMINI_MODEL"""
+        bounds = self._bounds(task) if self.enabled else None
+        if bounds is None:
+            return GEMINI_MODEL, "default"
+        level, top = bounds
+        reasons = []
+        if prompt_tokens > ROUTE_LONG_PROMPT_TOKENS:
+            level += 1
+            reasons.append("long_prompt")
+        rate = self.failure_rate(task, MODEL_LADDER[bounds[0]])
+        if rate is not None and rate >= ROUTE_FAILURE_RATE:
+            with self.lock:
+                self.skipped[task] = self.skipped.get(task, 0) + 1
+                probe = self.skipped[task] % ROUTE_PROBE_EVERY == 0
+            if probe:
+                reasons.append("probe")
+            else:
+                level += 1
+                reasons.append("failure_rate")
+        return MODEL_LADDER[min(level, top)], "+".join(reasons) or "start"
+
+    def escalate(self, task, model):
+        """다음 단계 모델 (상한에 이르렀거나 경로가 없으면 None)"""
+        bounds = self._bounds(task) if self.enabled else None
+        if bounds is None or model not in MODEL_LADDER:
+            return None
+        level = MODEL_LADDER.index(model) + 1
+        return MODEL_LADDER[level] if level <= bounds[1] else None
+
+    def record(self, task, model, reason, ok=None, key=None, prompt_tokens=0):
+        """라우팅 결정 기록 (ok 가 있으면 실패율 계산에도 반영)"""
+        entry = {"ts": round(time.time(), 3), "task": task, "key": key, "model": model, "reason": reason, "tokens": prompt_tokens}
+        if ok is not None:
+            entry["ok"] = ok
+        get_shared_metrics().inc("route_decisions", task=task, model=model, reason=reason,
+                                 ok="-" if ok is None else str(ok).lower())
+        with self.lock:
+            if ok is not None:
+                self._window(task, model).append(ok)
+            self._remember(task, key, model)
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def run(self, task, prompt, attempt, ok, key=None, max_calls=ROUTE_MAX_CALLS):
+        """attempt(모델, 남은 요청 수) -> (결과, 사용한 요청 수) 를 ok(결과) 통과 시까지 상위 모델로 승급하며 실행
+
+        attempt 는 생성 1회 + 남은 요청 수 이내의 문장 보정을 수행합니다.
+        상한 모델에 이르렀거나 요청 수를 다 쓰면 마지막 결과를 그대로 반환합니다.
+        """
+        tokens = estimate_tokens(prompt)
+        model, reason = self.choose(task, tokens)
+        left = max_calls
+        while True:
+            result, used = attempt(model, left)
+            left -= used
+            passed = ok(result)
+            self.record(task, model, reason, passed, key, tokens)
+            following = None if passed or left <= 0 else self.escalate(task, model)
+            if following is None:
+                return result
+            model, reason = following, "escalate"
+
+
+_shared_router = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_router():
+    """교과/담임 엔진이 함께 쓰는 프로세스 단일 라우터"""
+    global _shared_router
+    with _shared_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter()
+        return _shared_router
@@ -0,0 +1,269 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+import numpy as np
+from seteuk_config import (SPREADSHEET_ID, NEAR_DUP_ENABLED, NEAR_DUP_THRESHOLD, NEAR_DUP_SHINGLE, NEAR_DUP_NUM_PERM,
+                           NEAR_DUP_DB)
+from neis_bytes import SECTION_LABELS
+from metrics import get_shared_metrics
+
+AREAS = ("course", "career", "autonomous", "behavior")
+_NON_WORD = re.compile(r'[\s\W_]+')
+# 해시 함수군 h(x) = (a·x + b) mod p 의 소수 (메르센 소수 2^61-1)
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text, k=NEAR_DUP_SHINGLE):
+    """공백/문장부호를 뺀 문자 k-gram 의 32비트 해시 집합 (프로세스가 달라도 같은 값)"""
+    s = _NON_WORD.sub('', text or '')
+    if len(s) < k:
+        return set()
+    return {zlib.crc32(s[i:i + k].encode('utf-8')) for i in range(len(s) - k + 1)}
+
+
+def choose_bands(num_perm, threshold):
+    """LSH 밴드 수/밴드당 행 수 선택
+
+    후보가 되는 유사도 경계 (1/b)^(1/r) 가 threshold 보다 0.1 낮은 범위 안에서 행 수를 최대로 하여,
+    threshold 이상인 쌍은 거의 놓치지 않으면서 확인할 후보 수를 줄입니다.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold - 0.1:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """학생 본문 MinHash 서명 + LSH 버킷 색인 (같은 영역 안에서만 비교)
+
+    항목 키는 (학급, 성명, 영역) 이며 학급은 스프레드시트 ID 입니다.
+    서명은 SQLite 에 본문 해시와 함께 저장되므로 다시 실행하면 바뀐 본문만 서명을 새로 계산하고,
+    버킷은 시작 시 한 번 구성한 뒤 메모리에 유지하며 이후에는 바뀐 서명만 반영합니다.
+    """
+
+    def __init__(self, path=NEAR_DUP_DB, threshold=NEAR_DUP_THRESHOLD, num_perm=NEAR_DUP_NUM_PERM, seed=1):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        rnd = np.random.RandomState(seed)
+        self.a = rnd.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rnd.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.items = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                scope TEXT,
+                name TEXT,
+                area TEXT,
+                digest TEXT,
+                sig BLOB,
+                version INTEGER,
+                PRIMARY KEY (scope, name, area)
+            )
+        """)
+        # version: 변경 순번 (다른 프로세스가 바꾼 행만 골라 읽기 위함, 삭제는 sig 를 비운 행으로 남김)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_version ON signatures (version)")
+        self.conn.commit()
+        self.version = -1
+        self.refresh()
+
+    def refresh(self):
+        """마지막으로 읽은 뒤 바뀐 서명만 읽어 색인에 반영 (다른 학급 프로세스가 갱신한 내용 반영)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT scope, name, area, digest, sig, version FROM signatures "
+                                     "WHERE version > ? ORDER BY version", (self.version,)).fetchall()
+            for scope, name, area, digest, sig, version in rows:
+                key = (scope, name, area)
+                self.version = max(self.version, version)
+                entry = self.items.get(key)
+                if entry is not None and entry[0] == digest:
+                    continue
+                self._remove(key)
+                if sig is not None:
+                    sig = np.frombuffer(sig, dtype=np.uint32)
+                    if len(sig) == self.num_perm:
+                        self._insert(key, digest, sig)
+            return len(rows)
+
+    def signature(self, text):
+        """MinHash 서명 (비교할 n-gram 이 없을 만큼 짧으면 None)"""
+        hashes = shingles(text)
+        if not hashes:
+            return None
+        hv = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        # uint64 곱셈의 자리 넘침은 해시 함수군의 무작위성에 영향이 없어 그대로 둠
+        with np.errstate(over='ignore'):
+            phv = ((hv[:, None] * self.a + self.b) % _PRIME) & _MAX_HASH
+        return phv.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, area, sig):
+        return [(area, i, sig[i * self.rows:(i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+
+    def _insert(self, key, digest, sig):
+        self.items[key] = (digest, sig)
+        for bk in self._band_keys(key[2], sig):
+            self.buckets.setdefault(bk, set()).add(key)
+
+    def _remove(self, key):
+        entry = self.items.pop(key, None)
+        if entry is None:
+            return
+        for bk in self._band_keys(key[2], entry[1]):
+            bucket = self.buckets.get(bk)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[bk]
+
+    def update(self, scope, name, area, text):
+        """본문이 바뀐 항목만 서명을 다시 계산하여 색인 갱신 (바뀌었으면 True, 저장은 sync 에서 일괄 확정)"""
+        key = (scope, name, area)
+        digest = hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+        with self.lock:
+            entry = self.items.get(key)
+            if entry is not None and entry[0] == digest:
+                return False
+        sig = self.signature(text)
+        if sig is None and entry is None:
+            return False
+        with self.lock:
+            self._remove(key)
+            if sig is None:
+                self._write(key, None, None)
+            else:
+                self._insert(key, digest, sig)
+                self._write(key, digest, sig.tobytes())
+        return True
+
+    def _write(self, key, digest, sig):
+        """서명 저장 (sig=None 이면 삭제 표시), 순번은 같은 문장 안에서 매겨 프로세스 간에도 증가 순서 유지"""
+        self.conn.execute("INSERT OR REPLACE INTO signatures (scope, name, area, digest, sig, version) "
+                          "SELECT ?, ?, ?, ?, ?, COALESCE(MAX(version), 0) + 1 FROM signatures", (*key, digest, sig))
+
+    def update_student(self, name, sections, scope=SPREADSHEET_ID):
+        """학생 한 명의 일부 영역만 갱신하고 바로 저장 (앱의 단일 학생 재생성/보정용), 다시 서명한 영역 수 반환"""
+        self.refresh()
+        changed = sum(self.update(scope, name, area, text) for area, text in sections.items() if area in AREAS)
+        with self.lock:
+            self.conn.commit()
+        return changed
+
+    def sync(self, final_integrated_data, scope=SPREADSHEET_ID):
+        """학급 통합 결과로 색인 갱신 (결과에서 빠진 학생/영역은 제거), 다시 서명한 항목 수 반환"""
+        self.refresh()
+        changed = 0
+        seen = set()
+        for name, data in final_integrated_data.items():
+            for area in AREAS:
+                seen.add((scope, name, area))
+                changed += self.update(scope, name, area, data.get(area, ""))
+        with self.lock:
+            for key in [k for k in self.items if k[0] == scope and k not in seen]:
+                self._remove(key)
+                self._write(key, None, None)
+            self.conn.commit()
+        return changed
+
+    def similarity(self, a, b):
+        """두 항목의 추정 자카드 유사도 (서명이 일치하는 비율)"""
+        return float(np.mean(self.items[a][1] == self.items[b][1]))
+
+    def pairs(self, scope=None, threshold=None):
+        """같은 버킷에 든 후보 쌍 중 추정 유사도가 threshold 이상인 쌍 (scope 를 주면 그 학급이 포함된 쌍만)
+
+        반환: [{"area", "a", "b", "similarity"}] (유사도 내림차순, a/b 는 (학급, 성명))
+        """
+        threshold = self.threshold if threshold is None else threshold
+        with self.lock:
+            keys = list(self.items)
+            ids = {k: i for i, k in enumerate(keys)}
+            n = len(keys)
+            # 후보 쌍은 (작은 번호 * n + 큰 번호) 정수로 모아 중복 제거 (튜플 집합/정렬보다 훨씬 빠름)
+            codes = []
+            for bucket in self.buckets.values():
+                if len(bucket) < 2:
+                    continue
+                members = np.array(sorted(ids[k] for k in bucket), dtype=np.int64)
+                ia, ib = np.triu_indices(len(members), 1)
+                codes.append(members[ia] * n + members[ib])
+            if not codes:
+                return []
+            codes = np.unique(np.concatenate(codes))
+            ia, ib = np.divmod(codes, n)
+            if scope is not None:
+                mine = np.array([k[0] == scope for k in keys])
+                keep = mine[ia] | mine[ib]
+                ia, ib = ia[keep], ib[keep]
+            matrix = np.stack([self.items[k][1] for k in keys])
+        # 후보 쌍 서명을 묶음 단위로 한 번에 비교 (메모리 사용량 제한)
+        found = []
+        for i in range(0, len(ia), 50000):
+            a, b = ia[i:i + 50000], ib[i:i + 50000]
+            sims = (matrix[a] == matrix[b]).mean(axis=1)
+            for j in np.nonzero(sims >= threshold)[0]:
+                ka, kb = sorted((keys[a[j]], keys[b[j]]))
+                found.append({"area": ka[2], "a": ka[:2], "b": kb[:2], "similarity": round(float(sims[j]), 3)})
+        found.sort(key=lambda p: (-p["similarity"], p["area"], p["a"], p["b"]))
+        return found
+
+
+def describe(pair, scope=SPREADSHEET_ID):
+    """경고 문구용 한 줄 (다른 학급 학생은 스프레드시트 ID 앞부분 표시)"""
+    def who(item):
+        return item[1] if item[0] == scope else f"{item[1]}(학급 {item[0][:8]})"
+    return f"[{SECTION_LABELS.get(pair['area'], pair['area'])}] {who(pair['a'])} ↔ {who(pair['b'])} (유사도 {pair['similarity']:.2f})"
+
+
+def check_near_duplicates(final_integrated_data, scope=SPREADSHEET_ID, show=20):
+    """시트 업로드 전 학생 간 유사 본문 검출 (색인 증분 갱신 후 이 학급이 포함된 쌍 경고 및 반환)"""
+    if not NEAR_DUP_ENABLED or not final_integrated_data:
+        return []
+    metrics = get_shared_metrics()
+    index = get_shared_index()
+    with metrics.timer("near_dup_seconds"):
+        changed = index.sync(final_integrated_data, scope)
+        found = index.pairs(scope)
+    metrics.inc("near_dup_signed", changed)
+    for p in found:
+        metrics.inc("near_duplicate_pairs", area=p["area"])
+    if not found:
+        print(f"🔍 유사 본문 검사: 경고 없음 (서명 갱신 {changed}건)")
+        return found
+    print(f"⚠️ 유사 본문 {len(found)}쌍 (추정 유사도 {index.threshold} 이상, 서명 갱신 {changed}건):")
+    for p in found[:show]:
+        print(f"   - {describe(p, scope)}")
+    if len(found) > show:
+        print(f"   ... 외 {len(found) - show}쌍")
+    return found
+
+
+def update_near_duplicates(name, sections, scope=SPREADSHEET_ID):
+    """앱에서 학생 한 명의 영역을 다시 생성/보정한 뒤 색인에 바로 반영 (다음 검사가 이전 서명을 쓰지 않도록)"""
+    if not NEAR_DUP_ENABLED or not sections:
+        return 0
+    changed = get_shared_index().update_student(name, sections, scope)
+    get_shared_metrics().inc("near_dup_signed", changed)
+    return changed
+
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_index():
+    """파이프라인/앱이 함께 쓰는 프로세스 단일 유사 본문 색인"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = NearDuplicateIndex()
+        return _shared_index
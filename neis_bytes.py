@@ -0,0 +1,53 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from seteuk_config import NEIS_BYTE_LIMITS
+
+# 영역 표시 이름 (시트/대시보드 공통)
+SECTION_LABELS = {"course": "교과", "career": "진로", "autonomous": "자율", "behavior": "행종"}
+
+
+@lru_cache(maxsize=16384)
+def neis_bytes(text):
+    """나이스(NEIS) 기준 바이트 계산 (한글 등 비ASCII 3바이트, 줄바꿈 2바이트, 나머지 1바이트)
+
+    문자 단위 파이썬 루프 대신 인코딩/카운트(C 구현)로 계산하고 본문별로 캐시합니다.
+    """
+    if not text:
+        return 0
+    ascii_count = len(text.encode('ascii', 'ignore'))
+    return ascii_count + 3 * (len(text) - ascii_count) + text.count('\n')
+
+
+def byte_matrix(final_results, sections=tuple(NEIS_BYTE_LIMITS)):
+    """학생 × 영역 바이트 행렬 (이름 목록, 영역 목록, int 배열)"""
+    names = list(final_results)
+    counts = np.fromiter(
+        (neis_bytes(final_results[name].get(section, "")) for name in names for section in sections),
+        dtype=np.int64, count=len(names) * len(sections)
+    ).reshape(len(names), len(sections))
+    return names, list(sections), counts
+
+
+def byte_report(final_results, limits=NEIS_BYTE_LIMITS):
+    """학급 전체 바이트 현황 표 (영역별 바이트 + 초과 여부)"""
+    names, sections, counts = byte_matrix(final_results, tuple(limits))
+    limit_row = np.array([limits[s] for s in sections])
+    df = pd.DataFrame(counts, index=names, columns=[SECTION_LABELS.get(s, s) for s in sections])
+    df["초과 영역 수"] = (counts > limit_row).sum(axis=1)
+    df.index.name = "성명"
+    return df
+
+
+def over_budget(final_results, limits=NEIS_BYTE_LIMITS):
+    """바이트 한도 초과 목록 [{성명, 영역, 바이트, 한도, 초과}] (초과량 큰 순)"""
+    names, sections, counts = byte_matrix(final_results, tuple(limits))
+    limit_row = np.array([limits[s] for s in sections])
+    excess = counts - limit_row
+    rows, cols = np.nonzero(excess > 0)
+    overflow = [
+        {"성명": names[r], "영역": SECTION_LABELS.get(sections[c], sections[c]),
+         "바이트": int(counts[r, c]), "한도": int(limit_row[c]), "초과": int(excess[r, c])}
+        for r, c in zip(rows, cols)
+    ]
+    return sorted(overflow, key=lambda o: -o["초과"])
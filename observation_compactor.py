@@ -0,0 +1,150 @@
+import re
+from seteuk_config import (COMPACT_DEDUP_THRESHOLD, COMPACT_TOKEN_LIMIT, COMPACT_CHUNK_TOKENS, COMPACT_SUMMARY_TOKENS,
+                           COMPACT_MAP_PROMPT, COMPACT_REDUCE_PROMPT)
+
+_NON_WORD = re.compile(r'[\s\W_]+')
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 (한글 약 1.5자 = 1토큰)"""
+    return round(len(text) / 1.5)
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).strip()
+
+
+def _memo(o):
+    return _text(o.get('교사 메모', o.get('교사 메모(추후 종합용)', '')))
+
+
+def _shingles(text):
+    """공백/문장부호를 뺀 문자 3-gram 집합"""
+    s = _NON_WORD.sub('', text)
+    return {s[i:i + 3] for i in range(max(1, len(s) - 2))}
+
+
+def dedupe(obs_list, threshold=COMPACT_DEDUP_THRESHOLD):
+    """거의 같은 사실(3-gram 자카드 유사도 ≥ threshold)을 처음 기록에 병합
+
+    반환: [{대분류, 핵심 키워드, 사실, 메모 목록, 횟수, 첫/마지막 날짜}] (첫 기록 날짜순)
+    """
+    kept = []
+    for o in sorted(obs_list, key=lambda o: _text(o.get('날짜'))):
+        fact = _text(o.get('구체적 행동(Fact)'))
+        grams = _shingles(fact)
+        memo = _memo(o)
+        for k in kept:
+            # 길이 차이가 크면 유사도 계산 생략
+            if min(len(grams), len(k["grams"])) < threshold * max(len(grams), len(k["grams"])):
+                continue
+            if len(grams & k["grams"]) / len(grams | k["grams"]) >= threshold:
+                k["count"] += 1
+                k["last"] = _text(o.get('날짜'))
+                if memo and memo not in k["memos"]:
+                    k["memos"].append(memo)
+                break
+        else:
+            kept.append({
+                "category": _text(o.get('대분류(상황)')), "keyword": _text(o.get('핵심 키워드')),
+                "fact": fact, "memos": [memo] if memo else [], "count": 1,
+                "first": _text(o.get('날짜')), "last": _text(o.get('날짜')), "grams": grams,
+            })
+    return kept
+
+
+def render(entries):
+    """대분류 → 핵심 키워드 순으로 묶은 관찰 기록 본문"""
+    groups = {}
+    for e in entries:
+        groups.setdefault((e["category"], e["keyword"]), []).append(e)
+    lines = []
+    for (category, keyword), items in groups.items():
+        lines.append(f"■ {category} / 키워드: {keyword}")
+        for e in items:
+            repeat = f" ({e['count']}회 관찰)" if e["count"] > 1 else ""
+            memo = f" (메모: {' / '.join(e['memos'][:3])})" if e["memos"] else ""
+            lines.append(f"- {e['fact']}{repeat}{memo}")
+    return "\n".join(lines)
+
+
+def clip(text, max_tokens):
+    """줄 단위로 max_tokens 이내까지만 남김 (요약 길이 상한 보장)"""
+    out, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        out.append(line)
+        used += cost
+    return "\n".join(out) if out else text[:int(max_tokens * 1.5)]
+
+
+def chunk_records(obs_list, budget=COMPACT_CHUNK_TOKENS):
+    """날짜순 원본 기록을 앞에서부터 budget 토큰 단위로 분할
+
+    앞 조각의 경계는 뒤에 기록이 추가되어도 바뀌지 않으므로, 새 기록이 들어간 마지막 조각만 새로 요약됩니다.
+    """
+    chunks, current, used = [], [], 0
+    for o in sorted(obs_list, key=lambda o: _text(o.get('날짜'))):
+        cost = estimate_tokens(f"{_text(o.get('구체적 행동(Fact)'))} {_memo(o)}") + 10
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(o)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _period(records):
+    dates = [_text(o.get('날짜')) for o in records if _text(o.get('날짜'))]
+    return f"{min(dates)}~{max(dates)}" if dates else "기간 미상"
+
+
+def compact(obs_list, summarize=None, token_limit=COMPACT_TOKEN_LIMIT):
+    """학생 한 명의 관찰 기록을 token_limit 이내 본문으로 압축
+
+    summarize(system_instr, user_input) -> 요약 본문 (엔진의 캐시/실행기 경유 호출).
+    반환: (본문, {"rows", "entries", "tokens", "chunks", "levels"})
+    """
+    entries = dedupe(obs_list)
+    text = render(entries)
+    stats = {"rows": len(obs_list), "entries": len(entries), "tokens": estimate_tokens(text), "chunks": 0, "levels": 0}
+    if stats["tokens"] <= token_limit:
+        return text, stats
+    if summarize is None:
+        text = clip(text, token_limit)
+        stats["tokens"] = estimate_tokens(text)
+        return text, stats
+
+    # map: 날짜순 조각별 요약 (조각 내용이 같으면 응답 캐시 적중)
+    chunks = chunk_records(obs_list)
+    parts = [f"[{_period(c)}]\n" + clip(summarize(COMPACT_MAP_PROMPT, render(dedupe(c))), COMPACT_SUMMARY_TOKENS) for c in chunks]
+    stats["chunks"] = len(chunks)
+    text = "\n".join(parts)
+
+    # reduce: 요약들을 조각 단위로 묶어 재요약 (상한 이내가 될 때까지 계층적으로 반복)
+    while estimate_tokens(text) > token_limit:
+        stats["levels"] += 1
+        groups, current, used = [], [], 0
+        for p in parts:
+            cost = estimate_tokens(p) + 1
+            if current and used + cost > COMPACT_CHUNK_TOKENS:
+                groups.append(current)
+                current, used = [], 0
+            current.append(p)
+            used += cost
+        groups.append(current)
+        if len(groups) == len(parts):
+            # 더 묶을 수 없으면 (요약 하나가 조각 예산을 넘는 경우) 잘라서 종료
+            text = clip(text, token_limit)
+            break
+        parts = [clip(summarize(COMPACT_REDUCE_PROMPT, "\n".join(g)), COMPACT_SUMMARY_TOKENS) for g in groups]
+        text = "\n".join(parts)
+
+    stats["tokens"] = estimate_tokens(text)
+    return text, stats
@@ -0,0 +1,239 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from seteuk_config import OBSERVATION_DB, INPUT_CSV
+
+# CSV 머리글 ↔ 저장소 열 이름 (CSV 가져오기/내보내기 및 레코드 딕셔너리 키는 CSV 머리글 기준)
+FIELDS = [
+    ("날짜", "date"),
+    ("이름", "name"),
+    ("대분류(상황)", "category"),
+    ("소분류(활동)", "subcategory"),
+    ("구체적 행동(Fact)", "fact"),
+    ("핵심 키워드", "keywords"),
+    ("영향/반응", "impact"),
+    ("교사 메모", "memo"),
+]
+HEADERS = [h for h, _ in FIELDS]
+_COLUMN = dict(FIELDS)
+# 예전 CSV 머리글 호환
+_ALIASES = {"교사 메모(추후 종합용)": "교사 메모"}
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).strip()
+
+
+class ObservationStore:
+    """관찰 기록 SQLite 저장소 (이름/날짜/대분류 색인, 행 단위 추가·수정·삭제)
+
+    CSV 전체를 읽고 다시 쓰는 대신 필요한 학생/행만 조회·갱신합니다.
+    observation_logs.csv 는 import_csv()/export_csv() 로 주고받습니다.
+    """
+
+    def __init__(self, path=OBSERVATION_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(f"{col} TEXT" for _, col in FIELDS)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS observations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {columns},
+                updated REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_obs_name_date ON observations(name, date)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_obs_date ON observations(date)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_obs_category ON observations(category)")
+        # 마지막으로 가져온 CSV 정보 (경로/수정 시각/크기/해시/가져온 시각)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    def _row(self, record):
+        record = {_ALIASES.get(k, k): v for k, v in record.items()}
+        return [_clean(record.get(h)) for h in HEADERS]
+
+    @staticmethod
+    def _record(row):
+        """(id, 열 값들...) → {'id', CSV 머리글: 값}"""
+        record = {"id": row[0]}
+        record.update(zip(HEADERS, row[1:]))
+        return record
+
+    def append(self, record):
+        """관찰 기록 1행 추가 (CSV 머리글 키 딕셔너리, 반환: 행 id)"""
+        return self.append_many([record])[0]
+
+    def append_many(self, records):
+        cols = ", ".join(col for _, col in FIELDS)
+        marks = ", ".join("?" * (len(FIELDS) + 1))
+        now = time.time()
+        ids = []
+        with self.lock:
+            for record in records:
+                cur = self.conn.execute(f"INSERT INTO observations ({cols}, updated) VALUES ({marks})", self._row(record) + [now])
+                ids.append(cur.lastrowid)
+            self.conn.commit()
+        return ids
+
+    def update(self, row_id, changes):
+        """행 단위 수정 (changes: {CSV 머리글: 값}, 반환: 수정 여부)"""
+        changes = {_ALIASES.get(k, k): v for k, v in changes.items() if _ALIASES.get(k, k) in _COLUMN}
+        if not changes:
+            return False
+        assignments = ", ".join(f"{_COLUMN[h]} = ?" for h in changes)
+        with self.lock:
+            cur = self.conn.execute(
+                f"UPDATE observations SET {assignments}, updated = ? WHERE id = ?",
+                [_clean(v) for v in changes.values()] + [time.time(), row_id]
+            )
+            self.conn.commit()
+        return cur.rowcount > 0
+
+    def delete(self, row_ids):
+        with self.lock:
+            self.conn.executemany("DELETE FROM observations WHERE id = ?", [(i,) for i in row_ids])
+            self.conn.commit()
+
+    def for_student(self, name):
+        """학생 한 명의 관찰 기록 (날짜순, 이름 색인 사용)"""
+        cols = ", ".join(col for _, col in FIELDS)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT id, {cols} FROM observations WHERE name = ? ORDER BY date, id", (name,)).fetchall()
+        return [self._record(r) for r in rows]
+
+    def query(self, name=None, date_from=None, date_to=None, category=None):
+        """조건 조회 (이름/기간/대분류, 모두 색인 열)"""
+        clauses, params = [], []
+        for cond, value in (("name = ?", name), ("date >= ?", date_from), ("date <= ?", date_to), ("category = ?", category)):
+            if value is not None:
+                clauses.append(cond)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cols = ", ".join(col for _, col in FIELDS)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT id, {cols} FROM observations {where} ORDER BY name, date, id", params).fetchall()
+        return [self._record(r) for r in rows]
+
+    def versions(self):
+        """학생별 (행 수, 마지막 수정 시각) — 전처리에서 바뀐 학생만 다시 읽는 데 사용"""
+        with self.lock:
+            rows = self.conn.execute("SELECT name, COUNT(*), MAX(updated) FROM observations GROUP BY name").fetchall()
+        return {name: [count, updated] for name, count, updated in rows if name}
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def to_dataframe(self):
+        """편집 화면용 전체 표 (id 열 포함)"""
+        return pd.DataFrame(self.query(), columns=["id"] + HEADERS)
+
+    def import_csv(self, path=INPUT_CSV, replace=True):
+        """CSV → 저장소 (replace=True 이면 기존 기록을 모두 교체, 반환: 가져온 행 수)"""
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            records = list(csv.DictReader(f))
+        if replace:
+            with self.lock:
+                self.conn.execute("DELETE FROM observations")
+                self.conn.commit()
+        self.append_many(records)
+        self.mark_csv_source(path)
+        return len(records)
+
+    def mark_csv_source(self, path=INPUT_CSV):
+        """현재 CSV 를 저장소와 같은 내용의 기준으로 기록"""
+        source = dict(csv_signature(path), path=os.path.abspath(path), imported=time.time())
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_source', ?)", (json.dumps(source),))
+            self.conn.commit()
+
+    def csv_source(self):
+        """마지막으로 가져온 CSV 정보 (없으면 None)"""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'csv_source'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def edited_since_import(self):
+        """마지막 CSV 가져오기 이후 저장소에서 직접 추가/수정한 기록이 있는지"""
+        source = self.csv_source()
+        with self.lock:
+            latest = self.conn.execute("SELECT MAX(updated) FROM observations").fetchone()[0]
+        return source is None or (latest or 0) > source["imported"]
+
+    def csv_changed(self, path=INPUT_CSV):
+        """CSV 가 마지막 가져오기 이후 바뀌었는지 (수정 시각/크기가 같으면 해시 계산 생략)"""
+        source = self.csv_source()
+        if source is None or source["path"] != os.path.abspath(path):
+            return True
+        stat = os.stat(path)
+        if stat.st_mtime == source["mtime"] and stat.st_size == source["size"]:
+            return False
+        return csv_signature(path)["sha256"] != source["sha256"]
+
+    def export_csv(self, path=None):
+        """저장소 → CSV (path 를 주지 않으면 CSV 문자열 반환)"""
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\n')
+        writer.writerow(HEADERS)
+        for record in self.query():
+            writer.writerow([record[h] for h in HEADERS])
+        if path is None:
+            return buf.getvalue()
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8-sig', newline='') as f:
+            f.write(buf.getvalue())
+        os.replace(tmp, path)
+        return path
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def csv_signature(path):
+    """CSV 변경 확인용 (수정 시각, 크기, 내용 해시)"""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest}
+
+
+def get_shared_store():
+    """프로세스 단일 관찰 기록 저장소
+
+    비어 있으면 INPUT_CSV 를 가져오고, 마지막 가져오기 이후 CSV 가 바뀌었으면 다시 가져옵니다.
+    단, 저장소에서 직접 추가/수정한 기록이 있으면 (앱 편집) 덮어쓰지 않고 경고만 합니다.
+    학급 실행(SETEUK_INPUT_CSV 지정)은 명단 CSV 가 원본이므로 항상 CSV 를 따릅니다.
+    """
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ObservationStore()
+            if not os.path.exists(INPUT_CSV):
+                return _shared_store
+            shard = "SETEUK_INPUT_CSV" in os.environ
+            if _shared_store.count() == 0 and _shared_store.csv_source() is None:
+                count = _shared_store.import_csv(INPUT_CSV)
+                print(f"📦 관찰 기록 저장소 최초 구성: CSV {count}행 가져옴")
+            elif _shared_store.csv_source() is None and not shard:
+                # 가져오기 기록이 없던 기존 저장소: 현재 CSV 를 기준으로 삼음
+                _shared_store.mark_csv_source(INPUT_CSV)
+            elif _shared_store.csv_changed(INPUT_CSV):
+                if shard or not _shared_store.edited_since_import():
+                    count = _shared_store.import_csv(INPUT_CSV)
+                    print(f"📦 관찰 기록 CSV 변경 감지: {count}행 다시 가져옴")
+                else:
+                    print(f"⚠️ 관찰 기록 CSV 가 바뀌었지만 저장소에 직접 수정한 기록이 있어 가져오지 않았습니다. "
+                          f"(CSV 를 원본으로 쓰려면 python main.py --import-csv {INPUT_CSV})")
+        return _shared_store
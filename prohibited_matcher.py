@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import deque
+from seteuk_config import PROHIBITED_CATEGORIES, LEXICON_DIR
+
+
+def load_lexicons(lexicon_dir=LEXICON_DIR):
+    """확장 금지어 사전 로드 ({분류명: [단어, ...]}, 파일명이 분류명)"""
+    lexicons = {}
+    if not os.path.isdir(lexicon_dir):
+        return lexicons
+    for fname in sorted(os.listdir(lexicon_dir)):
+        if not fname.endswith(".txt"):
+            continue
+        with open(os.path.join(lexicon_dir, fname), 'r', encoding='utf-8') as f:
+            terms = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        lexicons[fname[:-len(".txt")]] = terms
+    return lexicons
+
+
+class Automaton:
+    """Aho-Corasick 다중 패턴 자동자 (본문 1회 순회로 모든 금지어 위치 탐색)"""
+
+    def __init__(self, categories):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.terms = []       # 단어 번호 → (단어, 분류)
+        self.order = {}       # 단어 → 최초 등록 순서 (기존 목록 순서 유지용)
+        for category, terms in categories.items():
+            for term in terms:
+                if term and term not in self.order:
+                    self.order[term] = len(self.terms)
+                    self.terms.append((term, category))
+                    self._insert(term, self.order[term])
+        self._build_fail()
+
+    def _insert(self, term, idx):
+        node = 0
+        for ch in term:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(idx)
+
+    def _build_fail(self):
+        # 깊이 1 노드의 실패 링크는 루트(0), 이후 BFS 로 전파
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        """(시작, 끝, 단어 번호) 순회"""
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                yield i + 1 - len(self.terms[idx][0]), i + 1, idx
+
+
+class ProhibitedMatcher:
+    """기본 금지어(PROHIBITED_CATEGORIES) + 확장 사전(LEXICON_DIR) 공용 검사기
+
+    사전 파일이 바뀌면 reload() 또는 reload_if_changed() 로 재시작 없이 자동자를 교체합니다.
+    """
+
+    RELOAD_CHECK_INTERVAL = 5.0
+
+    def __init__(self, lexicon_dir=LEXICON_DIR):
+        self.lexicon_dir = lexicon_dir
+        self.lock = threading.Lock()
+        self._checked = 0.0
+        self.reload()
+
+    def _lexicon_signature(self):
+        if not os.path.isdir(self.lexicon_dir):
+            return ()
+        return tuple(sorted(
+            (f, os.path.getmtime(os.path.join(self.lexicon_dir, f)))
+            for f in os.listdir(self.lexicon_dir) if f.endswith(".txt")
+        ))
+
+    def reload(self):
+        """기본 금지어 + 사전 파일로 자동자 재구성 (구성 완료 후 원자적으로 교체)"""
+        signature = self._lexicon_signature()
+        categories = {k: list(v) for k, v in PROHIBITED_CATEGORIES.items()}
+        for category, terms in load_lexicons(self.lexicon_dir).items():
+            categories.setdefault(category, []).extend(terms)
+        automaton = Automaton(categories)
+        with self.lock:
+            self.automaton = automaton
+            self.signature = signature
+        return len(automaton.terms)
+
+    def reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked < self.RELOAD_CHECK_INTERVAL:
+            return False
+        self._checked = now
+        if self._lexicon_signature() == self.signature:
+            return False
+        count = self.reload()
+        print(f"🔄 금지어 사전 재적재: {count}개")
+        return True
+
+    def find_all(self, text):
+        """모든 일치 위치 [{start, end, term, category}] (겹치는 일치 포함)"""
+        automaton = self.automaton
+        return [
+            {"start": start, "end": end, "term": automaton.terms[idx][0], "category": automaton.terms[idx][1]}
+            for start, end, idx in automaton.iter_matches(text)
+        ]
+
+    def scan(self, text):
+        """본문에 포함된 금지어 목록 (중복 제거, 등록 순서)"""
+        automaton = self.automaton
+        found = {idx for _, _, idx in automaton.iter_matches(text)}
+        return [automaton.terms[idx][0] for idx in sorted(found)]
+
+
+_shared_matcher = None
+_shared_lock = threading.Lock()
+
+
+def get_matcher():
+    """프로세스 공용 금지어 검사기 (사전 파일 변경 시 자동 재적재)"""
+    global _shared_matcher
+    with _shared_lock:
+        if _shared_matcher is None:
+            _shared_matcher = ProhibitedMatcher()
+    _shared_matcher.reload_if_changed()
+    return _shared_matcher
@@ -0,0 +1,174 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+from seteuk_config import QUICKLOG_DB, QUICKLOG_FLUSH_SECONDS, QUICKLOG_FLUSH_SIZE, INPUT_CSV, SPREADSHEET_ID
+from homeroom_config import HOMEROOM_SHEET_MAP
+from sheet_snapshot import get_shared_snapshot
+
+LOG_TAB = "생기부data"
+
+
+def append_csv_row(row, path=INPUT_CSV):
+    """관찰 로그 CSV 끝에 한 행 추가 (파일 전체를 다시 쓰지 않음, 머리글 순서에 맞춤)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        header = next(csv.reader(f))
+    needs_newline = False
+    with open(path, 'rb') as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        csv.writer(f, lineterminator='\n').writerow([row.get(col, "") for col in header])
+
+
+class QuickLogQueue:
+    """퀵 로그 시트 기록 지연 쓰기(write-behind) 대기열
+
+    저장 버튼은 로컬 SQLite 대기열에 넣고 바로 반환하며, 백그라운드 스레드가 일정 시간
+    (QUICKLOG_FLUSH_SECONDS) 또는 대기 건수(QUICKLOG_FLUSH_SIZE) 기준으로 모아서
+    이름 열/대상 셀 조회 1회 + 일괄 쓰기 1회로 반영합니다. 반영 전 앱이 재시작되어도 대기열에서 이어서 처리합니다.
+    """
+
+    def __init__(self, open_sheet, path=QUICKLOG_DB, flush_seconds=QUICKLOG_FLUSH_SECONDS, flush_size=QUICKLOG_FLUSH_SIZE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.open_sheet = open_sheet
+        self._sh = None
+        self.flush_seconds = flush_seconds
+        self.flush_size = flush_size
+        self.row_index = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                field TEXT,
+                entry TEXT,
+                created REAL,
+                error TEXT
+            )
+        """)
+        self.conn.commit()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def enqueue(self, name, field, entry):
+        """시트 기록 예약 (field: HOMEROOM_SHEET_MAP['생기부data'] 의 필드명)"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO pending (name, field, entry, created) VALUES (?, ?, ?, ?)",
+                (name, field, entry, time.time())
+            )
+            self.conn.commit()
+        if self.pending_count() >= self.flush_size:
+            self.wakeup.set()
+
+    def pending_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pending WHERE error IS NULL").fetchone()[0]
+
+    def failed(self):
+        """반영하지 못한 기록 [(이름, 내용, 사유)]"""
+        with self.lock:
+            return self.conn.execute("SELECT name, entry, error FROM pending WHERE error IS NOT NULL").fetchall()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.flush_seconds)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # 네트워크 오류 등은 대기열에 남겨 두고 다음 주기에 재시도
+                print(f"⚠️ 퀵 로그 시트 반영 실패 (다음 주기 재시도): {e}")
+
+    def _name_range(self):
+        col = HOMEROOM_SHEET_MAP[LOG_TAB]["columns"]["name"]
+        return f"'{LOG_TAB}'!{col}1:{col}"
+
+    def _set_row_index(self, names):
+        self.row_index = {row[0].strip(): i + 1 for i, row in enumerate(names) if row and row[0].strip()}
+        return {i + 1: row[0].strip() for i, row in enumerate(names) if row and row[0].strip()}
+
+    def _load_row_index(self, sh):
+        self._set_row_index(sh.values_get(self._name_range()).get("values", []))
+
+    def flush(self):
+        """대기 중인 기록을 시트에 반영 (이름 열 + 대상 셀 일괄 조회 1회 + 일괄 쓰기 1회)
+
+        조회한 이름 열로 행 번호 색인을 매번 다시 만들고, 행 삽입/삭제/정렬로 대상 행의 이름이
+        바뀐 기록은 쓰지 않고 대기열에 남겨 다음 주기에 새 색인으로 반영합니다.
+        """
+        with self.flush_lock:
+            with self.lock:
+                rows = self.conn.execute("SELECT id, name, field, entry FROM pending WHERE error IS NULL ORDER BY id").fetchall()
+            if not rows:
+                return 0
+
+            if self._sh is None:
+                self._sh = self.open_sheet()
+            sh = self._sh
+            if not self.row_index or any(name not in self.row_index for _, name, _, _ in rows):
+                self._load_row_index(sh)
+
+            columns = HOMEROOM_SHEET_MAP[LOG_TAB]["columns"]
+            cells, missing = {}, []
+            for id_, name, field, entry in rows:
+                if name not in self.row_index:
+                    missing.append(id_)
+                    continue
+                row = self.row_index[name]
+                cell = cells.setdefault(f"{columns[field]}{row}", {"name": name, "row": row, "entries": [], "ids": []})
+                cell["entries"].append(entry)
+                cell["ids"].append(id_)
+
+            ids, data, moved = [], [], 0
+            if cells:
+                ranges = list(cells)
+                response = sh.values_batch_get([self._name_range()] + [f"'{LOG_TAB}'!{a1}" for a1 in ranges])
+                value_ranges = response.get("valueRanges", [])
+                names_by_row = self._set_row_index(value_ranges[0].get("values", []) if value_ranges else [])
+                for a1, vr in zip(ranges, value_ranges[1:]):
+                    cell = cells[a1]
+                    if names_by_row.get(cell["row"]) != cell["name"]:
+                        # 색인을 만든 뒤 시트 행이 바뀜: 다른 학생 칸에 쓰지 않도록 대기열에 남김
+                        moved += len(cell["ids"])
+                        continue
+                    values = vr.get("values", [])
+                    current = values[0][0] if values and values[0] else ""
+                    data.append({"range": f"'{LOG_TAB}'!{a1}", "values": [["\n".join([current] + cell["entries"]).strip()]]})
+                    ids.extend(cell["ids"])
+                if data:
+                    sh.values_batch_update({"valueInputOption": "USER_ENTERED", "data": data})
+                    get_shared_snapshot().invalidate(SPREADSHEET_ID)
+
+            with self.lock:
+                self.conn.executemany("DELETE FROM pending WHERE id = ?", [(i,) for i in ids])
+                self.conn.executemany("UPDATE pending SET error = ? WHERE id = ?", [("시트에 학생 없음", i) for i in missing])
+                self.conn.commit()
+            if missing:
+                print(f"⚠️ 시트에서 학생을 찾지 못한 기록 {len(missing)}건")
+            if moved:
+                print(f"⚠️ 시트 행 위치가 바뀌어 다음 주기로 미룬 기록 {moved}건")
+            print(f"📤 퀵 로그 {len(ids)}건 시트 반영 (셀 {len(data)}개)")
+            return len(ids)
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_quicklog(open_sheet):
+    """프로세스 단일 퀵 로그 대기열 (최초 호출 시 백그라운드 반영 스레드 시작)"""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = QuickLogQueue(open_sheet)
+        return _shared_queue
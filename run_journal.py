@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+from seteuk_config import RUNS_DIR
+
+
+class RunJournal:
+    """생성 실행 단위 추가 전용(JSONL) 기록부
+
+    검증을 마친 결과를 단위(course/<이름>, homeroom/<이름>/<영역>)별로 즉시 한 줄씩 기록하므로,
+    실행이 중간에 중단되어도 같은 run_id 로 이어서 실행하면 완료된 단위는 건너뜁니다.
+    """
+
+    def __init__(self, run_id=None):
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        self.run_id = run_id or time.strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join(RUNS_DIR, f"{self.run_id}.jsonl")
+        self.lock = threading.Lock()
+        self._completed = self._load()
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            self._append({"type": "meta", "run_id": self.run_id, "created": time.time()})
+
+    def _load(self):
+        completed = {}
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return completed
+        self._truncate_partial()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("type") == "unit":
+                    completed[entry["unit"]] = entry["text"]
+        return completed
+
+    def _truncate_partial(self):
+        """중단 시점에 잘린 마지막 줄을 잘라냄 (다음 기록이 잘린 줄에 이어 붙어 함께 깨지지 않도록)"""
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def _append(self, entry):
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def record(self, unit, text):
+        """검증 완료된 단위 결과 기록"""
+        self._append({"type": "unit", "unit": unit, "text": text, "ts": time.time()})
+        self._completed[unit] = text
+
+    def finish(self):
+        self._append({"type": "done", "ts": time.time()})
+
+    def completed(self):
+        return dict(self._completed)
+
+    def get(self, unit):
+        return self._completed.get(unit)
+
+
+def _is_journal(path):
+    """첫 줄이 실행 기록부 메타 정보인 파일만 기록부로 인정"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.loads(f.readline()).get("type") == "meta"
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def latest_run_id():
+    """가장 최근 실행 ID (기록부가 없으면 None)"""
+    if not os.path.isdir(RUNS_DIR):
+        return None
+    runs = sorted(f[:-len(".jsonl")] for f in os.listdir(RUNS_DIR)
+                  if f.endswith(".jsonl") and _is_journal(os.path.join(RUNS_DIR, f)))
+    return runs[-1] if runs else None
@@ -0,0 +1,101 @@
+import re
+import text_rules
+from neis_bytes import neis_bytes
+from prohibited_matcher import get_matcher
+from seteuk_config import REPAIR_PROMPT, COMPRESS_PROMPT, REPAIR_MAX_RETRIES
+
+_NUMBERING = re.compile(r'^\s*\d+\s*[).]\s*')
+
+
+def find_bad_sentences(sentences):
+    """{문장 번호: 문제 설명} (금지어 포함, '~하였음.' 종결 위반)"""
+    problems = {}
+    matcher = get_matcher()
+    for i, sentence in enumerate(sentences):
+        reasons = []
+        terms = matcher.scan(sentence)
+        if terms:
+            reasons.append(f"기재 금지어 {', '.join(terms)} 삭제")
+        if text_rules.validate(sentence)["bad_endings"]:
+            reasons.append("'~하였음.' 형태로 종결")
+        if reasons:
+            problems[i] = " / ".join(reasons)
+    return problems
+
+
+def pick_overflow_sentences(sentences, overflow):
+    """초과 바이트의 약 2배를 덮을 때까지 긴 문장부터 압축 대상으로 선택"""
+    picked, covered = [], 0
+    for i in sorted(range(len(sentences)), key=lambda i: -neis_bytes(sentences[i])):
+        picked.append(i)
+        covered += neis_bytes(sentences[i])
+        if covered >= overflow * 2:
+            break
+    return sorted(picked)
+
+
+def _ask(generate, system_instr, header, targets):
+    user_input = header + "\n".join(f"{n}) {line}" for n, line in enumerate(targets, 1))
+    lines = [_NUMBERING.sub('', l).strip() for l in generate(system_instr, user_input).splitlines()]
+    return [l for l in lines if l]
+
+
+def _rewrite(generate, system_instr, header, targets):
+    """번호 목록 프롬프트로 재요청하여 같은 개수의 문장을 받음
+
+    개수가 맞지 않으면 (같은 요청은 응답 캐시 때문에 다시 보내도 결과가 같으므로) 문장마다 따로 요청합니다.
+    반환: (문장 목록 (빈 응답은 None = 원문 유지), 개수 불일치 여부)
+    """
+    lines = _ask(generate, system_instr, header, targets)
+    if len(lines) == len(targets):
+        return lines, False
+    singles = [_ask(generate, system_instr, header, [line]) for line in targets]
+    return [" ".join(got) if got else None for got in singles], True
+
+
+def repair_section(text, student_name, byte_limit, generate, max_retries=REPAIR_MAX_RETRIES, max_calls=None):
+    """문제 문장만 재요청(또는 초과분만 압축)하여 제자리에 끼워 넣고 재검증 (최대 max_retries 회)
+
+    바뀐 문장만 원문 위치에 바꿔 끼우므로 문장 사이의 줄바꿈/공백은 그대로 유지됩니다.
+    응답 문장 수가 맞지 않아 문장별로 다시 받은 회차는 재시도 횟수에 넣지 않고 mismatches 로 따로 셉니다.
+    max_calls 를 주면 재요청 수(문장별 재요청 포함)가 이를 넘지 않도록 남은 요청은 원문을 유지합니다.
+    generate(system_instr, user_input) -> 응답 본문 (엔진의 캐시/실행기 경유 호출)
+    반환: (보정된 본문, {"attempts", "repaired", "mismatches", "calls", "ok"})
+    """
+    report = {"attempts": 0, "repaired": 0, "mismatches": 0, "calls": 0, "ok": False}
+
+    def limited(system_instr, user_input):
+        if max_calls is not None and report["calls"] >= max_calls:
+            return ""
+        report["calls"] += 1
+        return generate(system_instr, user_input)
+
+    while True:
+        spans = text_rules.sentence_spans(text)
+        sentences = [text[s:e] for s, e in spans]
+        problems = find_bad_sentences(sentences)
+        overflow = neis_bytes(text) - byte_limit
+        if not problems and overflow <= 0:
+            report["ok"] = True
+            break
+        if (report["attempts"] >= max_retries or report["mismatches"] > max_retries
+                or (max_calls is not None and report["calls"] >= max_calls)):
+            break
+
+        if problems:
+            idx = sorted(problems)
+            rewritten, mismatch = _rewrite(limited, REPAIR_PROMPT, "",
+                                           [f"{sentences[i]} (문제: {problems[i]})" for i in idx])
+        else:
+            idx = pick_overflow_sentences(sentences, overflow)
+            rewritten, mismatch = _rewrite(limited, COMPRESS_PROMPT, f"[{overflow}바이트 이상 줄일 것]\n",
+                                           [sentences[i] for i in idx])
+        report["mismatches" if mismatch else "attempts"] += 1
+        # 뒤 문장부터 바꿔 끼워 앞 문장 위치가 어긋나지 않게 함
+        for i, new_sentence in sorted(zip(idx, rewritten), reverse=True):
+            new_sentence = text_rules.normalize(new_sentence or "", student_name)
+            if new_sentence:
+                start, end = spans[i]
+                text = text[:start] + new_sentence + text[end:]
+                report["repaired"] += 1
+    return text, report
@@ -2,39 +2,144 @@ import os
 import json
 
 # [환경 및 인증]
-# Streamlit Cloud 환경 대응: st.secrets가 있으면 이를 사용하여 임시 키 파일 생성
-try:
-    import streamlit as st
-    if "gcp_service_account" in st.secrets:
-        SERVICE_ACCOUNT_FILE = "service_key_cloud.json"
-        if not os.path.exists(SERVICE_ACCOUNT_FILE):
-            with open(SERVICE_ACCOUNT_FILE, "w") as f:
-                json.dump(dict(st.secrets["gcp_service_account"]), f)
-    else:
-        SERVICE_ACCOUNT_FILE = "/home/rjegj/projects/.secrets/service_key.json"
-except:
-    SERVICE_ACCOUNT_FILE = "/home/rjegj/projects/.secrets/service_key.json"
-
-SPREADSHEET_ID = "1mqlzFYHm2ipo3MYvNCeo6zsNT7-bJ7tEGIsXqYRV7DI"
+# SERVICE_ACCOUNT_FILE 은 처음 참조할 때 결정 (import 시점에 streamlit/st.secrets 를 읽지 않도록 지연)
+_LOCAL_SERVICE_ACCOUNT_FILE = "/home/rjegj/projects/.secrets/service_key.json"
+
+
+def _resolve_service_account_file():
+    # Streamlit Cloud 환경 대응: st.secrets가 있으면 이를 사용하여 임시 키 파일 생성
+    try:
+        import streamlit as st
+        if "gcp_service_account" in st.secrets:
+            path = "service_key_cloud.json"
+            if not os.path.exists(path):
+                with open(path, "w") as f:
+                    json.dump(dict(st.secrets["gcp_service_account"]), f)
+            return path
+    except:
+        pass
+    return _LOCAL_SERVICE_ACCOUNT_FILE
+
+
+def __getattr__(name):
+    if name == "SERVICE_ACCOUNT_FILE":
+        globals()[name] = _resolve_service_account_file()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 다중 학급 실행기(main.py --manifest)는 학급마다 SETEUK_* 환경 변수로 시트/CSV/출력 폴더/과목을 덮어씀
+SPREADSHEET_ID = os.environ.get("SETEUK_SPREADSHEET_ID", "1mqlzFYHm2ipo3MYvNCeo6zsNT7-bJ7tEGIsXqYRV7DI")
+SUBJECT = os.environ.get("SETEUK_SUBJECT", "")
+GOOGLE_SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+# 공용 클라이언트 등록부 연결 풀 크기 (동시 생성 요청 수 이상) 및 토큰 사전 갱신 여유(초)
+HTTP_POOL_SIZE = 16
+TOKEN_REFRESH_MARGIN = 300
 
 # [경로 설정]
 # 실행 위치에 관계없이 '세특' 폴더 내의 파일을 가리키도록 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-INPUT_CSV = os.path.join(BASE_DIR, "observation_logs.csv")
-STRUCTURED_JSON = os.path.join(BASE_DIR, "structured_observations.json")
-OUTPUT_DIR = os.path.join(BASE_DIR, "qualitative_seteuk_output")
+INPUT_CSV = os.environ.get("SETEUK_INPUT_CSV", os.path.join(BASE_DIR, "observation_logs.csv"))
+# 학급 공용 출력 폴더 (응답 캐시는 학급 간에도 공유, 벤치마크는 임시 폴더로 덮어씀)
+SHARED_OUTPUT_DIR = os.environ.get("SETEUK_SHARED_OUTPUT_DIR", os.path.join(BASE_DIR, "qualitative_seteuk_output"))
+OUTPUT_DIR = os.environ.get("SETEUK_OUTPUT_DIR", SHARED_OUTPUT_DIR)
+STRUCTURED_JSON = (os.path.join(OUTPUT_DIR, "structured_observations.json") if "SETEUK_OUTPUT_DIR" in os.environ
+                   else os.path.join(BASE_DIR, "structured_observations.json"))
+# 관찰 기록 원본 저장소 (SQLite, 이름/날짜/대분류 색인). False 이면 기존처럼 CSV 를 원본으로 사용
+USE_OBSERVATION_STORE = True
+OBSERVATION_DB = os.path.join(OUTPUT_DIR, "observations.sqlite3")
+# 증분 전처리 상태(처리한 CSV 길이/앞부분 해시/학생별 지문) 및 학생별 마지막 교과 생성 결과
+PREPROCESS_STATE = os.path.join(OUTPUT_DIR, "preprocess_state.json")
+COURSE_RESULTS_JSON = os.path.join(OUTPUT_DIR, "course_results.json")
+# 일괄(batch) 작업 파일 및 진행 중 작업 상태 (재시작 시 이어서 대기)
+BATCH_DIR = os.path.join(OUTPUT_DIR, "batch")
+BATCH_STATE_JSON = os.path.join(BATCH_DIR, "batch_state.json")
+# 생성 실행 기록부 (학생/영역 단위 결과를 즉시 기록, --resume 으로 이어하기)
+RUNS_DIR = os.path.join(OUTPUT_DIR, "runs")
+# 모델 라우팅 결과 기록 (실행 기록부와 섞이지 않도록 RUNS_DIR 밖에 저장)
+ROUTING_LOG = os.path.join(OUTPUT_DIR, "routing.jsonl")
+# 실행별 성능 지표 (runs/<run_id>.metrics.json 에 저장, 경로를 지정하면 Prometheus 텍스트 파일도 갱신)
+METRICS_PROM_FILE = os.environ.get("SETEUK_METRICS_PROM_FILE", "")
+METRICS_SLOWEST = 20
+# 현재 실행 단계 기록 (다중 학급 실행기가 학급별 진행 상황 표시에 사용)
+RUN_STATUS_JSON = os.path.join(OUTPUT_DIR, "run_status.json")
+# 스프레드시트 탭 로컬 스냅샷 (시트 수정 시각이 같으면 재다운로드 없이 사용)
+SNAPSHOT_DB = os.path.join(OUTPUT_DIR, "sheet_snapshot.sqlite3")
+# 퀵 로그 시트 반영 대기열 (앱 재시작 시에도 유지, 주기 또는 건수 기준으로 일괄 반영)
+QUICKLOG_DB = os.path.join(OUTPUT_DIR, "quicklog_queue.sqlite3")
+QUICKLOG_FLUSH_SECONDS = 10
+QUICKLOG_FLUSH_SIZE = 20
+
+# [결과 시트 업로드]
+RESULT_SHEET = "세특최종결과물"
+# True: 현재 시트 내용과 비교해 바뀐 셀만 갱신 / False: 전체 지우고 다시 쓰기
+SYNC_UPSERT = True
+# batch_update 1회 요청당 최대 범위 수
+SYNC_CHUNK_RANGES = 500
+
+# [생성 병렬 처리]
+# 교과/담임 엔진이 공유하는 워커 풀 설정 (동시 요청 수, 분당 요청 한도, 429/5xx 재시도 횟수)
+GEN_MAX_CONCURRENCY = 8
+GEN_RATE_PER_MINUTE = 300
+GEN_MAX_RETRIES = 5
+# 다중 학급 실행 시 동시에 돌릴 학급 수 (위 동시 요청 수/분당 한도는 전체 학급 합계로 적용)
+SHARD_MAX_PARALLEL = 4
+
+# [AI 모델 및 응답 캐시]
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# [모델 라우팅 - 빠른 모델 우선, 검증/바이트 한도 실패 시에만 상위 모델로 승급]
+MODEL_ROUTING_ENABLED = True
+# 빠름 → 강함 순서
+MODEL_LADDER = ["gemini-2.0-flash-lite", "gemini-2.0-flash", "gemini-2.5-flash", "gemini-2.5-pro"]
+# 작업별 시작 모델 / 승급 상한 모델
+MODEL_ROUTES = {
+    "course": {"start": "gemini-2.0-flash", "max": "gemini-2.5-pro"},
+    "career": {"start": "gemini-2.0-flash", "max": "gemini-2.5-flash"},
+    "autonomous": {"start": "gemini-2.0-flash", "max": "gemini-2.5-flash"},
+    "behavior": {"start": "gemini-2.0-flash", "max": "gemini-2.5-pro"},
+    "homeroom_json": {"start": "gemini-2.0-flash", "max": "gemini-2.0-flash"},
+    "summary": {"start": "gemini-2.0-flash-lite", "max": "gemini-2.0-flash-lite"},
+}
+ROUTE_LONG_PROMPT_TOKENS = 3000   # 입력이 이보다 길면 한 단계 위 모델로 시작
+ROUTE_FAILURE_RATE = 0.3          # 시작 모델의 최근 실패율이 이 이상이면 한 단계 위 모델로 시작
+ROUTE_WINDOW = 50                 # 실패율 계산에 쓰는 최근 결과 수 (routing.jsonl 에서 복원)
+ROUTE_MIN_SAMPLES = 10            # 실패율을 반영하기 위한 최소 결과 수
+ROUTE_MAX_CALLS = 5               # 영역 1개당 생성 + 문장 보정 요청 수 상한 (승급 포함)
+# 모델명 + 프롬프트 해시 기반 응답 캐시 (관찰 데이터가 같으면 재실행 시 API 재호출 없음)
+CACHE_DB = os.path.join(SHARED_OUTPUT_DIR, "llm_cache.sqlite3")
+CACHE_MAX_ENTRIES = 20000
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 180
+
+# [학생 간 유사 본문 검출 - MinHash/LSH, 시트 업로드 전 경고]
+NEAR_DUP_ENABLED = True
+NEAR_DUP_THRESHOLD = 0.7      # 추정 자카드 유사도가 이 이상인 같은 영역 본문 쌍을 경고
+NEAR_DUP_SHINGLE = 5          # 공백/문장부호를 뺀 문자 n-gram 길이 (짧으면 공통 어미만으로도 유사해짐)
+NEAR_DUP_NUM_PERM = 128       # MinHash 서명 길이
+# 학급 공용 폴더에 두어 다중 학급 실행 시 학년 전체 본문과 비교
+NEAR_DUP_DB = os.path.join(SHARED_OUTPUT_DIR, "near_duplicates.sqlite3")
+
+# [나이스 영역별 입력 바이트 한도]
+NEIS_BYTE_LIMITS = {"course": 1500, "career": 2100, "autonomous": 1500, "behavior": 1500}
 
 # [나이스 기재 금지 키워드 요목화]
-PROHIBITED_KEYWORDS = [
+PROHIBITED_CATEGORIES = {
     # 1. 교외 활동 및 수상
-    "대학교", "대학원", "교외", "외부", "상장", "수상", "1위", "우승", "금상", "은상", "동상",
+    "교외 활동 및 수상": ["대학교", "대학원", "교외", "외부", "상장", "수상", "1위", "우승", "금상", "은상", "동상"],
     # 2. 공인 시험 및 자격증
-    "토익", "TOEIC", "토플", "TOEFL", "텝스", "TEPS", "HSK", "JLPT", "자격증", "영재원",
+    "공인 시험 및 자격증": ["토익", "TOEIC", "토플", "TOEFL", "텝스", "TEPS", "HSK", "JLPT", "자격증", "영재원"],
     # 3. 사회경제적 지위 암시
-    "아버지", "어머니", "부모", "교수", "의사", "변호사", "회장님", "학원", "과외",
+    "사회경제적 지위 암시": ["아버지", "어머니", "부모", "교수", "의사", "변호사", "회장님", "학원", "과외"],
     # 4. 기타 금지 표현
-    "매우", "너무", "최고의", "천재적인" # 주관적 미사여구 지양
-]
+    "기타 금지 표현": ["매우", "너무", "최고의", "천재적인"] # 주관적 미사여구 지양
+}
+PROHIBITED_KEYWORDS = [kw for keywords in PROHIBITED_CATEGORIES.values() for kw in keywords]
+
+# 문장 종결 규칙 ('~하였음.', '~보였음.' 등 명사형 '~음.' 종결)
+SENTENCE_ENDING_PATTERN = r'음\.$'
+
+# 학교 단위 확장 금지어 사전 폴더 (파일명 = 분류명, 예: lexicons/대학명.txt, 한 줄에 한 단어, # 주석)
+LEXICON_DIR = os.path.join(BASE_DIR, "lexicons")
 
 # [AI 시스템 프롬프트 - 불변의 원칙 적용]
 SYSTEM_PROMPT = """
@@ -50,4 +155,44 @@ SYSTEM_PROMPT = """
 [신규 검증 지침]
 5. 기재 금지어 배제: 대학교, 수상, 부모 직업, 학원 등 나이스 기재 금지 사항을 절대 포함하지 마십시오.
 6. 완벽한 교열: 문장을 완성한 후 스스로 오자, 탈자, 비문, 띄어쓰기를 3회 검수하여 완벽한 표준어 문장만 출력하십시오.
-"""
\ No newline at end of file
+"""
+# [관찰 기록 압축 - 학생별 프롬프트 길이 상한]
+# 거의 같은 사실은 병합하고 대분류/핵심 키워드로 묶은 뒤, 그래도 COMPACT_TOKEN_LIMIT 를 넘으면
+# 날짜순 조각별 요약(응답 캐시 재사용) → 요약들의 재요약 순으로 상한 이내가 될 때까지 줄임
+COMPACT_ENABLED = True
+COMPACT_DEDUP_THRESHOLD = 0.8   # 구체적 행동(Fact) 3-gram 자카드 유사도 이상이면 같은 관찰로 병합
+COMPACT_TOKEN_LIMIT = 2000      # 프롬프트의 관찰 기록 부분 최대 토큰(추정, 한글 약 1.5자 = 1토큰)
+COMPACT_CHUNK_TOKENS = 1500     # 요약 1회 입력 최대 토큰
+COMPACT_SUMMARY_TOKENS = 300    # 조각 요약 1개 최대 토큰 (초과분은 문장 단위로 잘라냄)
+
+COMPACT_MAP_PROMPT = f"""
+당신은 교사의 학생 관찰 기록을 정리하는 조교입니다.
+아래 관찰 기록을 생기부 작성에 필요한 구체적 행동, 변화 과정, 역량 키워드가 드러나도록 요약하십시오.
+- {int(COMPACT_SUMMARY_TOKENS * 1.5)}자 이내, 한 줄에 한 항목씩 '- '로 시작하는 개조식으로 작성하십시오.
+- 기록에 없는 내용을 추측하여 더하지 마십시오. 반복 관찰된 행동은 횟수를 함께 적으십시오.
+- 대학명, 수상, 부모 직업, 학원 등 나이스 기재 금지 사항은 제외하십시오.
+"""
+
+COMPACT_REDUCE_PROMPT = f"""
+당신은 교사의 학생 관찰 기록을 정리하는 조교입니다.
+아래는 기간별로 요약한 관찰 기록입니다. 시간에 따른 성장과 변화가 드러나도록 하나로 통합 요약하십시오.
+- {int(COMPACT_SUMMARY_TOKENS * 1.5)}자 이내, 한 줄에 한 항목씩 '- '로 시작하는 개조식으로 작성하십시오.
+- 요약에 없는 내용을 추측하여 더하지 마십시오.
+"""
+
+# [문장 단위 보정 - 검증 실패 문장만 재요청]
+REPAIR_ENABLED = True
+REPAIR_MAX_RETRIES = 2
+
+REPAIR_PROMPT = SYSTEM_PROMPT + """
+[문장 보정 지침]
+아래 번호가 붙은 각 문장을 괄호 안에 지적된 문제만 고쳐 다시 쓰십시오.
+의미와 사실 관계는 그대로 유지하고, 번호 순서대로 한 줄에 한 문장씩 번호 없이 출력하십시오.
+"""
+
+COMPRESS_PROMPT = SYSTEM_PROMPT + """
+[분량 압축 지침]
+아래 번호가 붙은 문장들을 핵심 활동과 성장 내용은 유지한 채 더 간결하게 다시 쓰십시오.
+지정된 바이트 이상 줄여야 합니다. (한글 1자 = 3바이트, 영문/숫자/공백 1바이트)
+번호 순서대로 한 줄에 한 문장씩 번호 없이 출력하십시오.
+"""
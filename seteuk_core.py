@@ -1,136 +1,332 @@
 import pandas as pd
+import hashlib
+import io
 import json
 import os
-import re
-from google import genai
+import time
 import gspread
-from google.oauth2.service_account import Credentials
 from seteuk_config import *
+from clients import get_shared_clients
+from gen_executor import get_shared_executor
+import text_rules
+from sentence_repair import repair_section
+from llm_cache import get_shared_cache
+from sheet_snapshot import get_shared_snapshot, RESULT_KEY
+from observation_store import get_shared_store
+from metrics import get_shared_metrics, record_usage
+from observation_compactor import compact, estimate_tokens
+from model_router import get_shared_router, section_ok
 
 class SeteukEngine:
     def __init__(self):
-        try:
-            from dotenv import load_dotenv
-            from pathlib import Path
-            # [보안 패치] 중앙 .env 로드 로직
-            current = Path(os.getcwd())
-            env_loaded = False
-            while current != current.parent:
-                target = current / '.secrets' / '.env'
-                if target.exists():
-                    load_dotenv(target)
-                    print(f"🔐 Loaded central .env from {target}")
-                    env_loaded = True
-                    break
-                current = current.parent
-            if not env_loaded: load_dotenv()
-        except:
-            pass
-            
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        # Streamlit Cloud 대응
-        if not self.api_key:
-            try:
-                import streamlit as st
-                self.api_key = st.secrets.get("GEMINI_API_KEY")
-            except:
-                pass
-        
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment or secrets.")
-            
-        self.client_ai = genai.Client(api_key=self.api_key)
-        
-        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-        self.creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-        self.client_sheets = gspread.authorize(self.creds)
+        # 인증/HTTP 연결은 프로세스 공용 등록부에서 재사용
+        self.clients = get_shared_clients()
+        self.client_ai = self.clients.genai()
+        self.client_sheets = self.clients.sheets()
+        self.executor = get_shared_executor()
+        self.cache = get_shared_cache()
+        self.router = get_shared_router()
 
-    def preprocess(self):
-        """질적 연구 기반 교과 데이터 전처리"""
-        if not os.path.exists(INPUT_CSV):
-            raise FileNotFoundError(f"입력 CSV 파일을 찾을 수 없습니다: {INPUT_CSV}")
-            
+    def preprocess(self, incremental=True):
+        """질적 연구 기반 교과 데이터 전처리
+
+        USE_OBSERVATION_STORE 이면 관찰 기록 저장소에서 지난 실행 이후 행 수/수정 시각이 바뀐 학생만
+        학생 단위로 다시 읽고, 아니면 CSV 끝에 추가된 행만 파싱하여 병합합니다.
+        CSV 기존 행이 수정/삭제된 경우(저장된 앞부분 해시 불일치)에는 전체 재구성으로 전환합니다.
+        처리 후 지난 생성 결과와 관찰 기록이 달라진 학생을 self.dirty_students 에 기록합니다.
+        """
         # 출력 디렉토리 생성 보장
         os.makedirs(OUTPUT_DIR, exist_ok=True)
-        
-        df = pd.read_csv(INPUT_CSV, encoding='utf-8-sig')
-        df = df.sort_values(by=['이름', '날짜'])
-        structured = {name: group.to_dict('records') for name, group in df.groupby('이름')}
+        state = self._load_json(PREPROCESS_STATE, {})
+        if USE_OBSERVATION_STORE:
+            structured, new_state = self._preprocess_store(state, incremental)
+        else:
+            structured, new_state = self._preprocess_csv(state, incremental)
+
         with open(STRUCTURED_JSON, 'w', encoding='utf-8') as f:
             json.dump(structured, f, ensure_ascii=False, indent=4)
+
+        # 학생별 관찰 기록 지문 계산 및 변경 학생 집합 산출
+        fingerprints = {name: self.fingerprint(obs_list) for name, obs_list in structured.items()}
+        previous = self._load_json(COURSE_RESULTS_JSON, {})
+        self.dirty_students = {name for name, fp in fingerprints.items() if previous.get(name, {}).get("fingerprint") != fp}
+
+        new_state["fingerprints"] = fingerprints
+        self._save_json(PREPROCESS_STATE, new_state)
         return len(structured)
 
+    def student_observations(self, name):
+        """학생 한 명의 관찰 기록 (저장소 색인 조회, 날짜순)"""
+        return [{k: v for k, v in record.items() if k != "id"} for record in get_shared_store().for_student(name)]
+
+    def _preprocess_store(self, state, incremental):
+        versions = get_shared_store().versions()
+        structured = self._load_json(STRUCTURED_JSON, {}) if incremental else {}
+        known = state.get("store_versions", {}) if structured else {}
+        changed = [name for name, version in versions.items() if known.get(name) != version or name not in structured]
+        for name in set(structured) - set(versions):
+            del structured[name]
+        for name in changed:
+            structured[name] = self.student_observations(name)
+        if known:
+            print(f"📎 증분 전처리: 변경 학생 {len(changed)}명만 재조회")
+        return dict(sorted(structured.items())), {"store_versions": versions}
+
+    def _preprocess_csv(self, state, incremental):
+        if not os.path.exists(INPUT_CSV):
+            raise FileNotFoundError(f"입력 CSV 파일을 찾을 수 없습니다: {INPUT_CSV}")
+
+        with open(INPUT_CSV, 'rb') as f:
+            raw = f.read()
+        offset = state.get("offset", 0)
+        can_append = (
+            incremental and os.path.exists(STRUCTURED_JSON) and 0 < offset <= len(raw)
+            and raw[offset - 1:offset] == b'\n'
+            and hashlib.sha256(raw[:offset]).hexdigest() == state.get("prefix_hash")
+        )
+
+        if can_append:
+            structured = self._load_json(STRUCTURED_JSON, {})
+            tail = raw[offset:]
+            if tail.strip():
+                header = raw[:raw.index(b'\n') + 1]
+                df_new = pd.read_csv(io.BytesIO(header + tail), encoding='utf-8-sig')
+                for name, group in df_new.groupby('이름'):
+                    records = structured.get(name, []) + group.to_dict('records')
+                    structured[name] = sorted(records, key=lambda r: str(r['날짜']))
+                print(f"📎 증분 전처리: 신규 {len(df_new)}행 병합")
+        else:
+            df = pd.read_csv(io.BytesIO(raw), encoding='utf-8-sig')
+            df = df.sort_values(by=['이름', '날짜'])
+            structured = {name: group.to_dict('records') for name, group in df.groupby('이름')}
+
+        return structured, {"offset": len(raw), "prefix_hash": hashlib.sha256(raw).hexdigest()}
+
+    @staticmethod
+    def fingerprint(obs_list):
+        """학생 한 명의 관찰 기록 내용 지문"""
+        payload = json.dumps(obs_list, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _load_json(path, default):
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _save_json(path, obj):
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=4)
+        os.replace(tmp, path)
+
     def clean_and_validate(self, text, student_name):
-        """군소리 제거 및 금지어 2차 검증 로직"""
-        # 1. 마크다운 및 불필요한 패턴 제거
-        text = re.sub(r'^\*\*.*?\*\*.*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^\[.*?\]', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^다음은.*?입니다\.?\s*', '', text, flags=re.IGNORECASE)
-        
-        # 2. 이름 및 호칭 강제 삭제 (이중 안전장치)
-        text = text.replace(f"{student_name}은", "").replace(f"{student_name}는", "").replace(f"{student_name}의", "")
-        text = text.replace(f"{student_name}", "").replace("이 학생은", "").replace("학생은", "").replace("본인은", "")
-        
-        # 3. 앞뒤 따옴표 및 공백 정리
-        text = text.strip().strip('"').strip("'").strip()
-        
-        # 4. 문장 시작 조사 보정
-        text = re.sub(r'^[은는이가]\s*', '', text)
-        
-        # 5. 금지어 스캔
-        found_prohibited = [kw for kw in PROHIBITED_KEYWORDS if kw in text]
-        status = "검증완료"
-        if found_prohibited:
-            status = f"⚠️금지어주의({','.join(found_prohibited)})"
-            
-        return text, status
-
-    def generate_course_seteuk(self):
-        """교과 세특 AI 생성 (제너레이터 방식)"""
+        """군소리 제거 및 금지어/문체 2차 검증 (text_rules 공용 규칙, 상태 문자열 반환)"""
+        with get_shared_metrics().timer("validate_seconds", area="course"):
+            text, diagnostics = text_rules.clean_and_validate(text, student_name)
+        return text, text_rules.format_status(diagnostics)
+
+    def _call_ai(self, system_instr, user_input, model=GEMINI_MODEL):
+        response = self.client_ai.models.generate_content(
+            model=model,
+            contents=[system_instr, user_input]
+        )
+        record_usage(response, "course", model)
+        return response.text.strip()
+
+    def _generate(self, system_instr, user_input, bypass_cache=False, model=GEMINI_MODEL):
+        """응답 캐시 조회 후 미스일 때만 API 호출 (속도 제한/재시도는 공용 실행기 경유)"""
+        text = self.cache.get(model, system_instr, user_input, bypass=bypass_cache)
+        if text is None:
+            text = self.executor.call(self._call_ai, system_instr, user_input, model)
+            self.cache.put(model, system_instr, user_input, text)
+        return text
+
+    def _call_ai_stream(self, system_instr, user_input, model=GEMINI_MODEL):
+        for chunk in self.client_ai.models.generate_content_stream(model=model, contents=[system_instr, user_input]):
+            if chunk.text:
+                yield chunk.text
+
+    def _stream(self, system_instr, user_input, bypass_cache=False, model=GEMINI_MODEL):
+        """스트리밍 생성: 조각이 도착할 때마다 누적 원문 반환 (캐시 적중 시 한 번에 반환, 완료 후 캐시 저장)"""
+        text = self.cache.get(model, system_instr, user_input, bypass=bypass_cache)
+        if text is not None:
+            yield text
+            return
+        parts = []
+        for piece in self.executor.stream(self._call_ai_stream, system_instr, user_input, model):
+            parts.append(piece)
+            yield "".join(parts)
+        self.cache.put(model, system_instr, user_input, "".join(parts).strip())
+
+    def course_observations(self, name):
+        """학생 한 명의 관찰 기록 (저장소 사용 시 색인 조회, 아니면 전처리 결과에서 조회)"""
+        if USE_OBSERVATION_STORE:
+            return self.student_observations(name)
+        return self._load_json(STRUCTURED_JSON, {}).get(name, [])
+
+    def stream_course(self, name, bypass_cache=False):
+        """학생 1명 교과 세특 스트리밍 생성 ((정제된 본문, 진단, 완료 여부) 순회)
+
+        생성 중에는 끝난 문장만 중간 검증하고, 마지막 항목은 전체 본문 정제/검증 결과입니다.
+        """
+        user_input = self.build_course_prompt(name, self.course_observations(name))
+        tokens = estimate_tokens(user_input)
+        model, reason = self.router.choose("course", tokens)
+        raw = ""
+        for raw in self._stream(SYSTEM_PROMPT, user_input, bypass_cache, model):
+            partial = text_rules.normalize(raw, name)
+            yield partial, text_rules.validate_partial(partial), False
+        text, diagnostics = text_rules.clean_and_validate(raw, name)
+        # 스트리밍은 화면에 이미 내보냈으므로 승급 재생성 없이 결과만 기록
+        self.router.record("course", model, reason, section_ok(text, NEIS_BYTE_LIMITS["course"]), name, tokens)
+        yield text, diagnostics, True
+
+    def _generate_course(self, name, user_input, bypass_cache=False, repair=REPAIR_ENABLED):
+        """학생 1명 교과 세특 생성 → 정제 → (검증 실패 시) 문장 단위 보정
+
+        보정 후에도 검증/바이트 한도를 통과하지 못하면 라우터가 (요청 수 상한 이내에서) 상위 모델로 승급하여 다시 생성합니다.
+        """
+        metrics = get_shared_metrics()
+        start = time.perf_counter()
+
+        def attempt(model, calls_left):
+            text, status = self.clean_and_validate(self._generate(SYSTEM_PROMPT, user_input, bypass_cache, model), name)
+            used = 1
+            if repair and calls_left > 1:
+                text, report = self._repair(name, text, model, calls_left - 1)
+                used += report["calls"]
+            return text, used
+
+        text = self.router.run("course", user_input, attempt,
+                               lambda t: section_ok(t, NEIS_BYTE_LIMITS["course"]), key=name)
+        metrics.unit("course", name, time.perf_counter() - start)
+        return text
+
+    def _repair(self, name, text, model, max_calls=None):
+        """검증 실패 문장만 model 로 재요청하여 보정 → (본문, 보정 보고)"""
+        metrics = get_shared_metrics()
+        text, report = repair_section(text, name, NEIS_BYTE_LIMITS["course"],
+                                      lambda s, u: self._generate(s, u, model=model), max_calls=max_calls)
+        metrics.inc("repair_attempts", report["attempts"], area="course")
+        if report["attempts"] and not report["ok"]:
+            metrics.inc("repair_failed", area="course")
+            print(f"⚠️ [{name}] 교과 문장 보정 {report['attempts']}회 후에도 검증 미통과 ({model})")
+        return text, report
+
+    def repair(self, area, name, text):
+        """미리보기/편집 본문의 검증 실패 문장만 보정 (그 학생 교과 세특을 마지막으로 만든 모델 사용) → (본문, 보정 보고)"""
+        model = self.router.model_for(name, area) or self.router.choose(area)[0]
+        return self._repair(name, text, model, ROUTE_MAX_CALLS)
+
+    def _summarize(self, system_instr, user_input):
+        """관찰 기록 조각 요약 (요약 경로의 모델로 캐시/실행기 경유 호출)"""
+        model, reason = self.router.choose("summary", estimate_tokens(user_input))
+        return self._generate(system_instr, user_input, model=model)
+
+    def compact_observations(self, obs_list, summarize=True):
+        """관찰 기록 압축 (중복 병합/분류별 묶음, 상한 초과 시 조각별 요약 → 재요약)
+
+        조각 요약은 응답 캐시를 거치므로 기록이 추가되어도 새 기록이 들어간 조각만 다시 요약합니다.
+        (--no-cache 강제 재생성 시에도 요약은 캐시를 사용)
+        summarize=False 이면 요약 요청 없이 중복 병합 후 상한 길이에서 자릅니다.
+        """
+        metrics = get_shared_metrics()
+        with metrics.timer("compact_seconds"):
+            obs_text, stats = compact(obs_list, self._summarize if summarize else None)
+        metrics.inc("compact_rows", stats["rows"])
+        metrics.inc("compact_entries", stats["entries"])
+        if stats["chunks"]:
+            metrics.inc("compact_summarized_students")
+        return obs_text
+
+    def _compose_course(self, name, obs_list, bypass_cache=False, repair=REPAIR_ENABLED):
+        """작업자 스레드에서 프롬프트 구성(관찰 기록 압축 요약 포함) 후 생성"""
+        return self._generate_course(name, self.build_course_prompt(name, obs_list), bypass_cache, repair)
+
+    def build_course_prompt(self, name, obs_list, summarize=True):
+        """학생 한 명의 관찰 기록을 교과 세특 프롬프트로 변환 (COMPACT_ENABLED 이면 길이 상한 이내로 압축)
+
+        summarize=False 이면 압축 중 요약 요청을 하지 않습니다 (일괄 작업 요청 구성용, API 호출 없음).
+        """
+        def get_memo(o):
+            return o.get('교사 메모', o.get('교사 메모(추후 종합용)', ''))
+
+        if COMPACT_ENABLED:
+            obs_text = self.compact_observations(obs_list, summarize)
+        else:
+            obs_text = "\n".join([f"- {o['대분류(상황)']}: {o['구체적 행동(Fact)']} (키워드: {o['핵심 키워드']}, 메모: {get_memo(o)})" for o in obs_list])
+        subject = f"과목: {SUBJECT}\n" if SUBJECT else ""
+        return f"{subject}학생 성명: {name}\n관찰 기록:\n{obs_text}\n\n위 지침에 따라 주어 없이 '~하였음.'으로 끝나는 완벽한 문장만 출력하라."
+
+    def generate_course_seteuk(self, bypass_cache=False, only=None, journal=None, repair=REPAIR_ENABLED):
+        """교과 세특 AI 생성 (제너레이터 방식, 공용 워커 풀로 병렬 호출 후 완료 순서대로 반환)
+
+        bypass_cache=True 이면 응답 캐시를 무시하고 전원 강제 재생성합니다.
+        only 에 학생 이름 집합(예: preprocess 의 dirty_students)을 주면 그 외 학생은
+        지난 생성 결과를 그대로 재사용하고 API 를 호출하지 않습니다.
+        journal(RunJournal)을 주면 검증된 결과를 즉시 기록하고, 이미 기록된 학생은 건너뜁니다.
+        repair=True 이면 검증에 실패한 문장만 재요청하여 보정합니다.
+        """
         with open(STRUCTURED_JSON, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
+        previous = self._load_json(COURSE_RESULTS_JSON, {}) if only is not None else {}
+        saved = {}
         results = {}
         total = len(data)
-        for i, (name, obs_list) in enumerate(data.items()):
-            def get_memo(o):
-                return o.get('교사 메모', o.get('교사 메모(추후 종합용)', ''))
+        done = 0
 
-            obs_text = "\n".join([f"- {o['대분류(상황)']}: {o['구체적 행동(Fact)']} (키워드: {o['핵심 키워드']}, 메모: {get_memo(o)})" for o in obs_list])
-            prompt = f"학생 성명: {name}\n관찰 기록:\n{obs_text}\n\n위 지침에 따라 주어 없이 '~하였음.'으로 끝나는 완벽한 문장만 출력하라."
-            
-            response = self.client_ai.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=[SYSTEM_PROMPT, prompt]
-            )
-            content, status = self.clean_and_validate(response.text.strip(), name)
+        # 1. 이어하기로 복원된 학생 및 변경 없는 학생은 즉시 완료 처리
+        tasks = []
+        for name, obs_list in data.items():
+            fp = self.fingerprint(obs_list)
+            prev = previous.get(name)
+            journaled = journal.get(f"course/{name}") if journal else None
+            if journaled is not None:
+                saved[name] = {"fingerprint": fp, "text": journaled}
+                results[name] = journaled
+                done += 1
+                yield done / total, name, results
+            elif only is not None and name not in only and prev and prev.get("fingerprint") == fp:
+                saved[name] = prev
+                results[name] = prev["text"]
+                done += 1
+                yield done / total, name, results
+            else:
+                tasks.append((name, self._compose_course, (name, obs_list, bypass_cache, repair)))
+
+        # 2. 변경 학생만 생성
+        for name, content in self.executor.run(tasks, managed=False):
             results[name] = content
+            saved[name] = {"fingerprint": self.fingerprint(data[name]), "text": content}
+            if journal:
+                journal.record(f"course/{name}", content)
+            done += 1
             # 진행률, 현재 학생 이름, 결과 데이터 반환
-            yield (i + 1) / total, name, results
+            yield done / total, name, results
 
-    def sync_all(self, final_integrated_data):
-        """통합 시트 업로드 (검증 상태 포함)"""
-        sh = self.client_sheets.open_by_key(SPREADSHEET_ID)
-        try:
-            sheet = sh.worksheet("세특최종결과물")
-            sheet.clear()
-        except:
-            sheet = sh.add_worksheet(title="세특최종결과물", rows="100", cols="6")
-        
-        headers = [["성명", "1) 교과 세부능력(질적분석)", "2) 진로활동", "3) 자율활동", "4) 행동특성/종합", "최종 검증 상태"]]
-        sheet.update(values=headers, range_name='A1:F1')
-        
-        all_rows = []
+        self._save_json(COURSE_RESULTS_JSON, saved)
+
+    @staticmethod
+    def build_result_rows(final_integrated_data):
+        """결과 시트 전체 값 (머리글 포함, 영역별 검증 상태 취합)"""
+        rows = [["성명", "1) 교과 세부능력(질적분석)", "2) 진로활동", "3) 자율활동", "4) 행동특성/종합", "최종 검증 상태"]]
         for name, data in final_integrated_data.items():
-            # 각 영역별 금지어 검증 결과 취합
+            # 각 영역별 검증 결과 취합 (생성 단계에서 검증한 본문은 메모이즈된 결과 재사용)
             status_list = []
             for area in ['course', 'career', 'autonomous', 'behavior']:
-                _, status = self.clean_and_validate(data.get(area, ""), name)
-                if "⚠️" in status: status_list.append(status)
-            
+                diagnostics = text_rules.validate(data.get(area, ""))
+                if not diagnostics["ok"]: status_list.append(text_rules.format_status(diagnostics))
+
             final_status = "✅ 모든 검사 통과" if not status_list else " | ".join(set(status_list))
-            
-            all_rows.append([
+
+            rows.append([
                 name,
                 data.get("course", ""),
                 data.get("career", ""),
@@ -138,11 +334,77 @@ class SeteukEngine:
                 data.get("behavior", ""),
                 final_status
             ])
-        
-        if all_rows:
-            sheet.update(values=all_rows, range_name=f'A2:F{len(all_rows)+1}')
-            sh.batch_update({"requests": [
-                {"updateDimensionProperties": {"range": {"sheetId": sheet.id, "dimension": "COLUMNS", "startIndex": 1, "endIndex": 5}, "properties": {"pixelSize": 450}, "fields": "pixelSize"}},
-                {"repeatCell": {"range": {"sheetId": sheet.id, "startRowIndex": 1}, "cell": {"userEnteredFormat": {"wrapStrategy": "WRAP", "verticalAlignment": "TOP"}}, "fields": "userEnteredFormat(wrapStrategy,verticalAlignment)"}}
-            ]})
-        print(f"✅ 총 {len(all_rows)}명의 데이터 검사 및 시트 업로드 완료")
\ No newline at end of file
+        return rows
+
+    @staticmethod
+    def diff_ranges(current, desired):
+        """바뀐 셀만 행 단위 연속 구간으로 묶은 [{range, values}] (남는 기존 행은 빈 값으로 지움)"""
+        width = max([len(r) for r in desired] + [len(r) for r in current] + [1])
+        updates = []
+        for r in range(max(len(current), len(desired))):
+            old = current[r] if r < len(current) else []
+            new = desired[r] if r < len(desired) else []
+            old = [str(v) for v in old] + [""] * (width - len(old))
+            new = [str(v) for v in new] + [""] * (width - len(new))
+            changed = [c for c in range(width) if old[c] != new[c]]
+            if not changed:
+                continue
+            first, last = changed[0], changed[-1]
+            updates.append({
+                "range": f"{gspread.utils.rowcol_to_a1(r + 1, first + 1)}:{gspread.utils.rowcol_to_a1(r + 1, last + 1)}",
+                "values": [new[first:last + 1]]
+            })
+        return updates
+
+    def _apply_format(self, sh, sheet):
+        sh.batch_update({"requests": [
+            {"updateDimensionProperties": {"range": {"sheetId": sheet.id, "dimension": "COLUMNS", "startIndex": 1, "endIndex": 5}, "properties": {"pixelSize": 450}, "fields": "pixelSize"}},
+            {"repeatCell": {"range": {"sheetId": sheet.id, "startRowIndex": 1}, "cell": {"userEnteredFormat": {"wrapStrategy": "WRAP", "verticalAlignment": "TOP"}}, "fields": "userEnteredFormat(wrapStrategy,verticalAlignment)"}}
+        ]})
+
+    def sync_all(self, final_integrated_data, upsert=SYNC_UPSERT):
+        """통합 시트 업로드 (검증 상태 포함)
+
+        upsert=True 이면 현재 결과 탭(스냅샷이 최신이면 로컬 스냅샷)과 비교해 바뀐 셀만
+        batch_update 로 보내므로, 요청량이 학급 규모가 아니라 수정량에 비례합니다.
+        """
+        snapshot = get_shared_snapshot()
+        metrics = get_shared_metrics()
+        rows = self.build_result_rows(final_integrated_data)
+        sh = self.clients.spreadsheet(SPREADSHEET_ID)
+        try:
+            sheet = sh.worksheet(RESULT_SHEET)
+            created = False
+        except gspread.exceptions.WorksheetNotFound:
+            sheet = sh.add_worksheet(title=RESULT_SHEET, rows=len(rows), cols=len(rows[0]))
+            created = True
+
+        if upsert and not created:
+            with metrics.timer("sheets_call_seconds", op="read_result"):
+                current, _ = snapshot.load(self.client_sheets, SPREADSHEET_ID, RESULT_KEY, sheet.get_all_values, offline_fallback=False)
+        else:
+            if not created:
+                sheet.clear()
+            current = []
+
+        # 학급 규모에 맞게 격자 확장 (고정 100행 제한 제거)
+        if sheet.row_count < len(rows) or sheet.col_count < len(rows[0]):
+            sheet.resize(rows=max(sheet.row_count, len(rows)), cols=max(sheet.col_count, len(rows[0])))
+
+        updates = self.diff_ranges(current, rows)
+        for i in range(0, len(updates), SYNC_CHUNK_RANGES):
+            with metrics.timer("sheets_call_seconds", op="batch_update"):
+                sheet.batch_update(updates[i:i + SYNC_CHUNK_RANGES])
+
+        # 서식은 탭이 새로 만들어졌거나 서식 적용 이후 행이 늘어난 경우에만 다시 적용
+        formatted = snapshot.load_offline(SPREADSHEET_ID, f"format:{RESULT_SHEET}") or {}
+        if created or not upsert or formatted.get("sheet_id") != sheet.id or formatted.get("rows", 0) < sheet.row_count:
+            self._apply_format(sh, sheet)
+            snapshot.put(SPREADSHEET_ID, f"format:{RESULT_SHEET}", None, {"sheet_id": sheet.id, "rows": sheet.row_count})
+
+        # 업로드한 값을 쓰기 직후 수정 시각과 함께 저장 (다음 업로드/NEIS 도우미가 재조회 없이 사용)
+        snapshot.put(SPREADSHEET_ID, RESULT_KEY, snapshot.revision(self.client_sheets, SPREADSHEET_ID), rows)
+        changed_cells = sum(len(u["values"][0]) for u in updates)
+        metrics.inc("sheets_cells_written", changed_cells)
+        metrics.inc("sheets_ranges_written", len(updates))
+        print(f"✅ 총 {len(rows) - 1}명의 데이터 검사 및 시트 업로드 완료 (변경 범위 {len(updates)}개, 셀 {changed_cells}개)")
@@ -0,0 +1,159 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from seteuk_config import BASE_DIR, SHARED_OUTPUT_DIR, RUN_STATUS_JSON, SHARD_MAX_PARALLEL, GEN_MAX_CONCURRENCY, GEN_RATE_PER_MINUTE
+from gen_executor import serve_budget
+
+MANIFEST_STATUS = "manifest_status.json"
+
+
+def write_status(stage, path=RUN_STATUS_JSON, **info):
+    """현재 실행 단계를 상태 파일에 원자적으로 기록 (다중 학급 실행기가 읽어 진행 상황 표시)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"stage": stage, "updated": time.time(), **info}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_status(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def format_stage(status):
+    stage = status.get("stage", "pending")
+    if "total" in status:
+        return f"{stage} {status.get('done', 0)}/{status['total']}"
+    return stage
+
+
+def load_manifest(path):
+    """학급 목록 JSON 로드
+
+    [{"name": "2-3", "spreadsheet_id": "...", "input_csv": "logs/2-3.csv", "subject": "통합과학"}, ...]
+    input_csv 상대 경로는 목록 파일 위치 기준으로 해석합니다. subject 는 생략 가능.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    names = set()
+    for shard in manifest:
+        for key in ("name", "spreadsheet_id", "input_csv"):
+            if not shard.get(key):
+                raise ValueError(f"학급 목록 항목에 '{key}' 가 없습니다: {shard}")
+        if shard["name"] in names:
+            raise ValueError(f"학급 이름이 중복되었습니다: {shard['name']}")
+        names.add(shard["name"])
+        shard["input_csv"] = os.path.join(base, shard["input_csv"])
+    return manifest
+
+
+class Shard:
+    """학급 하나를 main.py 하위 프로세스로 실행 (학급별 출력 폴더/로그/상태 파일)"""
+
+    def __init__(self, spec, out_root, budget_env, passthrough):
+        self.spec = spec
+        self.name = spec["name"]
+        self.out_dir = os.path.join(out_root, self.name)
+        self.log_path = os.path.join(self.out_dir, "run.log")
+        self.status_path = os.path.join(self.out_dir, os.path.basename(RUN_STATUS_JSON))
+        self.budget_env = budget_env
+        self.passthrough = passthrough
+        self.proc = None
+        self.log = None
+        self.started = None
+        self.duration = None
+
+    def start(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        env = dict(os.environ, **self.budget_env)
+        env.update({
+            "SETEUK_SPREADSHEET_ID": self.spec["spreadsheet_id"],
+            "SETEUK_INPUT_CSV": self.spec["input_csv"],
+            "SETEUK_OUTPUT_DIR": self.out_dir,
+            "SETEUK_SUBJECT": self.spec.get("subject", ""),
+            "PYTHONUNBUFFERED": "1",
+        })
+        write_status("queued", self.status_path)
+        self.log = open(self.log_path, 'w', encoding='utf-8')
+        self.started = time.time()
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.join(BASE_DIR, "main.py"), *self.passthrough],
+            cwd=BASE_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+
+    def poll(self):
+        """종료되었으면 returncode, 실행 중이면 None"""
+        code = self.proc.poll()
+        if code is not None and self.duration is None:
+            self.duration = time.time() - self.started
+            self.log.close()
+        return code
+
+    def report(self):
+        status = read_status(self.status_path)
+        return {
+            "name": self.name,
+            "spreadsheet_id": self.spec["spreadsheet_id"],
+            "subject": self.spec.get("subject", ""),
+            "stage": status.get("stage", "pending"),
+            "status": status,
+            "returncode": self.proc.returncode if self.proc else None,
+            "duration": round(self.duration, 1) if self.duration is not None else None,
+            "log": self.log_path,
+        }
+
+
+def run_manifest(manifest, jobs=SHARD_MAX_PARALLEL, out_root=SHARED_OUTPUT_DIR, passthrough=(), poll_interval=2.0):
+    """학급 목록 전체를 최대 jobs 개씩 병렬 실행 (API 동시 요청/분당 한도는 전체 학급이 공유)
+
+    진행 상황은 각 학급의 run_status.json 을 읽어 출력하고, 종료 후 manifest_status.json 에 학급별 결과를 남깁니다.
+    반환값: 실패한 학급 수
+    """
+    budget_env = serve_budget(GEN_MAX_CONCURRENCY, GEN_RATE_PER_MINUTE)
+    print(f"🏫 {len(manifest)}개 학급 실행 (동시 {jobs}개, 전체 동시 요청 {GEN_MAX_CONCURRENCY} / 분당 {GEN_RATE_PER_MINUTE}회 공유)")
+    pending = [Shard(spec, out_root, budget_env, list(passthrough)) for spec in manifest]
+    shards = list(pending)
+    running = []
+    last_line = {}
+    status_path = os.path.join(out_root, MANIFEST_STATUS)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            shard = pending.pop(0)
+            shard.start()
+            running.append(shard)
+            print(f"▶️ [{shard.name}] 시작 (로그: {shard.log_path})")
+
+        for shard in list(running):
+            code = shard.poll()
+            report = shard.report()
+            if code is None:
+                line = format_stage(report["status"])
+                if last_line.get(shard.name) != line:
+                    last_line[shard.name] = line
+                    print(f"   ⏳ [{shard.name}] {line}")
+                continue
+            running.remove(shard)
+            mark = "✅" if code == 0 else "❌"
+            print(f"{mark} [{shard.name}] 종료 (코드 {code}, {shard.duration:.1f}초)")
+
+        write_status("running" if pending or running else "done", status_path,
+                     shards=[s.report() for s in shards])
+        if pending or running:
+            time.sleep(poll_interval)
+
+    failed = [s for s in shards if s.proc.returncode != 0]
+    print("\n📋 학급별 결과")
+    for s in shards:
+        r = s.report()
+        mark = "✅" if r["returncode"] == 0 else "❌"
+        print(f"   {mark} {r['name']:<10} {r['stage']:<10} {r['duration']:>7.1f}초  {r['log']}")
+    print(f"\n🏁 완료 {len(shards) - len(failed)}개 / 실패 {len(failed)}개 (상태: {status_path})")
+    return len(failed)
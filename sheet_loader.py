@@ -0,0 +1,77 @@
+import json
+import time
+from metrics import get_shared_metrics
+
+
+def _quote(tab):
+    return "'" + tab.replace("'", "''") + "'"
+
+
+def build_ranges(sheet_map):
+    """열 지도 → [(탭, 필드명 또는 None, A1 범위)]"""
+    ranges = []
+    for tab, spec in sheet_map.items():
+        start = spec.get("start_row", 1)
+        if spec.get("columns") is None:
+            ranges.append((tab, None, f"{_quote(tab)}!A{start}:ZZ"))
+            continue
+        for field, col in spec["columns"].items():
+            ranges.append((tab, field, f"{_quote(tab)}!{col}{start}:{col}"))
+    return ranges
+
+
+def _transpose(columns):
+    """열 우선 값 목록 → 행 목록 (짧은 열은 빈 문자열로 채움)"""
+    height = max((len(c) for c in columns), default=0)
+    return [[c[i] if i < len(c) else "" for c in columns] for i in range(height)]
+
+
+def fetch_tabs(sh, sheet_map):
+    """여러 탭의 필요한 열만 values_batch_get 1회 요청으로 조회
+
+    반환: ({탭: [ {필드: 값} ] 또는 [[행 값]] (columns=None)}, 조회 통계)
+    존재하지 않는 선택 탭이 있으면 탭 목록을 확인한 뒤 제외하고 한 번 더 요청합니다.
+    """
+    from gspread.exceptions import APIError
+
+    ranges = build_ranges(sheet_map)
+    start = time.perf_counter()
+    try:
+        response = sh.values_batch_get([r[2] for r in ranges], params={"majorDimension": "COLUMNS"})
+    except APIError:
+        titles = {ws.title for ws in sh.worksheets()}
+        missing = [tab for tab in sheet_map if tab not in titles]
+        for tab in missing:
+            if sheet_map[tab].get("required"):
+                raise
+        print(f"⚠️ 시트 탭 없음(건너뜀): {', '.join(missing)}")
+        ranges = [r for r in ranges if r[0] in titles]
+        response = sh.values_batch_get([r[2] for r in ranges], params={"majorDimension": "COLUMNS"})
+    elapsed = time.perf_counter() - start
+    get_shared_metrics().observe("sheets_call_seconds", elapsed, op="values_batch_get")
+
+    value_ranges = response.get("valueRanges", [])
+    stats = {"ranges": len(ranges), "latency_ms": round(elapsed * 1000, 1),
+             "bytes": len(json.dumps(response, ensure_ascii=False).encode("utf-8")), "tabs": {}}
+
+    columns_by_tab = {}
+    for (tab, field, _), vr in zip(ranges, value_ranges):
+        values = vr.get("values", [])
+        columns_by_tab.setdefault(tab, []).append((field, values))
+        tab_stats = stats["tabs"].setdefault(tab, {"bytes": 0, "cells": 0})
+        tab_stats["bytes"] += len(json.dumps(values, ensure_ascii=False).encode("utf-8"))
+        tab_stats["cells"] += sum(len(col) for col in values)
+
+    tabs = {}
+    for tab, fields in columns_by_tab.items():
+        if sheet_map[tab].get("columns") is None:
+            tabs[tab] = _transpose(fields[0][1])
+        else:
+            names = [f for f, _ in fields]
+            rows = _transpose([values[0] if values else [] for _, values in fields])
+            tabs[tab] = [dict(zip(names, row)) for row in rows]
+
+    get_shared_metrics().inc("sheets_bytes_read", stats["bytes"])
+    detail = ", ".join(f"{tab} {s['bytes'] / 1024:.1f}KB" for tab, s in stats["tabs"].items())
+    print(f"📥 시트 일괄 조회: 범위 {stats['ranges']}개, {stats['bytes'] / 1024:.1f}KB, {stats['latency_ms']}ms ({detail})")
+    return tabs, stats
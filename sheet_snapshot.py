@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from seteuk_config import SNAPSHOT_DB, RESULT_SHEET
+from sheet_loader import fetch_tabs
+from metrics import get_shared_metrics
+
+# 결과 탭 전체 값 (업로드 비교와 NEIS 도우미가 공유)
+RESULT_KEY = f"values:{RESULT_SHEET}"
+
+
+class SheetSnapshot:
+    """스프레드시트 탭 내용 로컬 스냅샷 (SQLite + zlib 압축 JSON, 수정 시각 기준 유효성 확인)
+
+    웜 스타트 시에는 Drive 메타데이터 1회(modifiedTime)만 조회하고, 수정 시각이 같으면
+    탭을 다시 내려받지 않습니다. 우리 쪽에서 시트에 쓴 직후에는 invalidate() 로 명시적으로 무효화합니다.
+    """
+
+    def __init__(self, path=SNAPSHOT_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                spreadsheet_id TEXT,
+                key TEXT,
+                revision TEXT,
+                data BLOB,
+                saved REAL,
+                PRIMARY KEY (spreadsheet_id, key)
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def revision(client, spreadsheet_id):
+        """스프레드시트 수정 시각 (Drive 메타데이터 1회 조회)"""
+        with get_shared_metrics().timer("sheets_call_seconds", op="drive_metadata"):
+            return client.get_file_drive_metadata(spreadsheet_id)["modifiedTime"]
+
+    def get(self, spreadsheet_id, key):
+        """(revision, 데이터, 저장 시각) 또는 None (네트워크 호출 없음)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT revision, data, saved FROM snapshots WHERE spreadsheet_id = ? AND key = ?",
+                (spreadsheet_id, key)
+            ).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]).decode("utf-8")), row[2]
+
+    def put(self, spreadsheet_id, key, revision, data):
+        blob = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (spreadsheet_id, key, revision, data, saved) VALUES (?, ?, ?, ?, ?)",
+                (spreadsheet_id, key, revision, blob, time.time())
+            )
+            self.conn.commit()
+
+    def invalidate(self, spreadsheet_id, key=None):
+        """스냅샷 무효화 (key 생략 시 해당 스프레드시트 전체). 데이터는 오프라인 시작용으로 남겨 둠"""
+        with self.lock:
+            if key is None:
+                self.conn.execute("UPDATE snapshots SET revision = NULL WHERE spreadsheet_id = ?", (spreadsheet_id,))
+            else:
+                self.conn.execute("UPDATE snapshots SET revision = NULL WHERE spreadsheet_id = ? AND key = ?", (spreadsheet_id, key))
+            self.conn.commit()
+
+    def load(self, client, spreadsheet_id, key, fetch_fn, offline_fallback=True):
+        """수정 시각이 스냅샷과 같으면 로컬 데이터, 다르면 fetch_fn() 결과를 저장 후 반환
+
+        반환: (데이터, 스냅샷 사용 여부). 시트 API 오류 시 offline_fallback 이면 마지막 스냅샷으로 대체합니다.
+        """
+        metrics = get_shared_metrics()
+        cached = self.get(spreadsheet_id, key)
+        try:
+            revision = self.revision(client, spreadsheet_id)
+            if cached is not None and cached[0] == revision:
+                metrics.inc("snapshot_lookups", result="hit")
+                return cached[1], True
+            data = fetch_fn()
+        except Exception as e:
+            if not offline_fallback or cached is None:
+                raise
+            saved = time.strftime('%Y-%m-%d %H:%M', time.localtime(cached[2]))
+            print(f"⚠️ 시트 조회 실패({e}), {saved} 스냅샷으로 대체합니다.")
+            metrics.inc("snapshot_lookups", result="offline")
+            return cached[1], True
+        metrics.inc("snapshot_lookups", result="miss")
+        self.put(spreadsheet_id, key, revision, data)
+        return data, False
+
+    def load_offline(self, spreadsheet_id, key):
+        """API 호출 없이 마지막 스냅샷 데이터 반환 (없으면 None)"""
+        cached = self.get(spreadsheet_id, key)
+        return cached[1] if cached else None
+
+
+def map_key(prefix, sheet_map):
+    """열 지도가 바뀌면 다른 스냅샷을 쓰도록 지도 내용을 키에 포함"""
+    digest = hashlib.sha256(json.dumps(sheet_map, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{prefix}:{digest[:16]}"
+
+
+def load_tabs(client, spreadsheet_id, sheet_map, open_sheet, prefix="tabs"):
+    """fetch_tabs 결과를 스냅샷으로 감싼 조회 (반환: 탭 데이터, 조회 통계)
+
+    open_sheet() 은 스냅샷이 오래된 경우에만 호출되므로 웜 스타트에는 스프레드시트를 열지 않습니다.
+    """
+    start = time.perf_counter()
+    tabs_stats = {}
+
+    def fetch():
+        tabs, stats = fetch_tabs(open_sheet(), sheet_map)
+        tabs_stats.update(stats)
+        return tabs
+
+    tabs, from_snapshot = get_shared_snapshot().load(client, spreadsheet_id, map_key(prefix, sheet_map), fetch)
+    if from_snapshot:
+        tabs_stats = {"snapshot": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+        print(f"💾 시트 스냅샷 사용 (변경 없음): 탭 {len(tabs)}개, {tabs_stats['latency_ms']}ms")
+    return tabs, tabs_stats
+
+
+_shared_snapshot = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_snapshot():
+    """교과/담임 엔진, 대시보드, NEIS 도우미가 함께 쓰는 프로세스 단일 스냅샷 저장소"""
+    global _shared_snapshot
+    with _shared_lock:
+        if _shared_snapshot is None:
+            _shared_snapshot = SheetSnapshot()
+        return _shared_snapshot
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import batch_runner
+from batch_runner import build_batch_requests, run_batch, LocalBatchBackend
+from seteuk_core import SeteukEngine
+
+
+class NoCache:
+    def get(self, *args, **kwargs):
+        return None
+
+    def put(self, *args, **kwargs):
+        raise AssertionError("가짜 응답을 캐시에 저장함")
+
+
+class FakeHome:
+    def collect_all_data(self):
+        return {}
+
+    def build_section_prompts(self, name, data):
+        return []
+
+
+def make_engine():
+    engine = SeteukEngine.__new__(SeteukEngine)
+    engine.cache = NoCache()
+
+    def no_network(system_instr, user_input):
+        raise AssertionError("일괄 작업 구성 중 요약 요청")
+    engine._summarize = no_network
+    engine.clean_and_validate = lambda text, name: (text, {})
+    return engine
+
+
+def long_history(n=400):
+    return [{"날짜": f"2026-03-{i % 28 + 1:02d}", "대분류(상황)": "탐구", "핵심 키워드": f"키워드{i % 7}",
+             "구체적 행동(Fact)": f"{i}번째 실험에서 변인 {i * 7}개를 새로 통제하고 결과 {i * 13}건을 분석함", "교사 메모": ""}
+            for i in range(n)]
+
+
+def test_batch_prompts_do_not_summarize(tmp_path, monkeypatch):
+    path = tmp_path / "structured.json"
+    path.write_text(json.dumps({"김/철수": long_history()}, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(batch_runner, "STRUCTURED_JSON", str(path))
+    requests, cached, targets = build_batch_requests(make_engine(), FakeHome(), {})
+    assert len(requests) == 1 and targets == {"c00001": ["course", "김/철수"]}
+
+
+def test_state_without_targets_is_resubmitted(tmp_path, monkeypatch):
+    path = tmp_path / "structured.json"
+    path.write_text(json.dumps({"김철수": long_history(3)}, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(batch_runner, "STRUCTURED_JSON", str(path))
+    monkeypatch.setattr(batch_runner, "BATCH_DIR", str(tmp_path))
+    monkeypatch.setattr(batch_runner, "BATCH_STATE_JSON", str(tmp_path / "state.json"))
+    backend = LocalBatchBackend(root=str(tmp_path / "local"))
+    # 키 대응표가 없는 지난 형식의 진행 중 작업
+    batch_runner.save_batch_state({"job_id": "local-old", "backend": "local", "job_file": "", "status": "pending",
+                                   "cached": {}})
+    course, home = run_batch(make_engine(), FakeHome(), backend, poll_interval=0)
+    assert list(course) == ["김철수"]
+    assert batch_runner.load_batch_state()["job_id"] != "local-old"
@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gen_executor
+from gen_executor import GenerationExecutor
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+def _executor(monkeypatch, slots, during_sleep):
+    monkeypatch.setattr(gen_executor.time, "sleep", lambda s: during_sleep.append(slots.acquire(blocking=False)) or
+                        (during_sleep[-1] and slots.release()))
+    monkeypatch.setattr(gen_executor.random, "uniform", lambda a, b: 0)
+    return GenerationExecutor(max_workers=1, rate_per_minute=60000, slots=slots)
+
+
+def test_call_releases_shared_slot_before_backoff(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    during_sleep = []
+    executor = _executor(monkeypatch, slots, during_sleep)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited()
+        return "ok"
+
+    assert executor.call(flaky) == "ok"
+    # 백오프 대기 중에는 다른 학급이 슬롯을 가져갈 수 있어야 함
+    assert during_sleep == [True]
+
+
+def test_stream_releases_shared_slot_before_backoff(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    during_sleep = []
+    executor = _executor(monkeypatch, slots, during_sleep)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited()
+        yield "a"
+        yield "b"
+
+    assert list(executor.stream(flaky)) == ["a", "b"]
+    assert during_sleep == [True]
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from homeroom_engine import HomeroomEngine
+
+
+class FakeJournal:
+    def __init__(self):
+        self.units = {}
+
+    def get(self, unit):
+        return self.units.get(unit)
+
+    def record(self, unit, text):
+        self.units[unit] = text
+
+
+class SerialExecutor:
+    def run(self, tasks, managed=True):
+        for key, fn, args in tasks:
+            yield key, fn(*args)
+
+
+def make_engine(fail_area):
+    engine = HomeroomEngine.__new__(HomeroomEngine)
+    engine.executor = SerialExecutor()
+    engine.build_section_prompts = lambda name, data: [(a, "", "") for a in ("career", "autonomous", "behavior")]
+
+    def generate(name, area, system_instr, user_input, bypass_cache, repair):
+        if area == fail_area:
+            raise KeyboardInterrupt
+        return f"{name} {area} 본문."
+    engine._generate_section = generate
+    return engine
+
+
+def test_areas_are_journaled_before_student_completes():
+    journal = FakeJournal()
+    engine = make_engine("behavior")
+    try:
+        list(engine.generate_homeroom_sections({"김철수": {}}, json_mode=False, journal=journal))
+    except KeyboardInterrupt:
+        pass
+    # 중단 전에 끝난 영역은 학생의 나머지 영역과 관계없이 기록되어 있어야 함
+    assert journal.get("homeroom/김철수/career") == "김철수 career 본문."
+    assert journal.get("homeroom/김철수/autonomous") == "김철수 autonomous 본문."
+    assert journal.get("homeroom/김철수/behavior") is None
+
+    # 이어서 실행하면 남은 영역만 요청
+    engine = make_engine("career")
+    *_, (progress, name, results) = engine.generate_homeroom_sections({"김철수": {}}, json_mode=False, journal=journal)
+    assert progress == 1 and results["김철수"]["behavior"] == "김철수 behavior 본문."
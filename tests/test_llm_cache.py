@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import llm_cache
+from llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def make_cache(tmp_path, monkeypatch, **limits):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), **{"max_entries": 100, "max_bytes": 10 ** 6,
+                                                                "max_age_days": 30, **limits})
+    return cache, clock
+
+
+def put(cache, clock, key, text="응답"):
+    clock.now += 1
+    cache.put("m", "s", key, text)
+
+
+def keys(cache):
+    return {k for k in ("a", "b", "c", "d") if cache.get("m", "s", k) is not None}
+
+
+def test_expired_entries_are_misses_and_evicted_first(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, max_age_days=1)
+    put(cache, clock, "a")
+    clock.now += 86400 - 10
+    put(cache, clock, "b")
+    clock.now += 20
+    # a 는 보관 기간 초과 (조회해도 갱신되지 않음), b 는 유효
+    assert cache.get("m", "s", "a") is None
+    assert cache.get("m", "s", "b") == "응답"
+    cache.evict()
+    assert cache.stats()["entries"] == 1
+
+
+def test_lru_order_by_last_access(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, max_entries=3)
+    for k in ("a", "b", "c"):
+        put(cache, clock, k)
+    # a 를 최근에 사용하면 가장 오래 안 쓴 b 가 먼저 삭제됨
+    clock.now += 1
+    assert cache.get("m", "s", "a") == "응답"
+    put(cache, clock, "d")
+    cache.evict()
+    assert cache.stats()["entries"] == 3
+    assert keys(cache) == {"a", "c", "d"}
+
+
+def test_byte_cap_evicts_until_under_limit(tmp_path, monkeypatch):
+    text = "가" * 100  # 300 bytes
+    cache, clock = make_cache(tmp_path, monkeypatch, max_bytes=700)
+    for k in ("a", "b", "c"):
+        put(cache, clock, k, text)
+    cache.evict()
+    stats = cache.stats()
+    assert stats["bytes"] <= 700 and stats["entries"] == 2
+    assert keys(cache) == {"b", "c"}
+
+
+def test_evict_runs_every_n_puts(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, max_entries=5)
+    monkeypatch.setattr(LLMCache, "EVICT_EVERY", 4)
+    for i in range(4):
+        put(cache, clock, f"k{i}")
+    assert cache.stats()["entries"] == 4
+    for i in range(4, 8):
+        put(cache, clock, f"k{i}")
+    # 8번째 저장에서 정리되어 한도 이내
+    assert cache.stats()["entries"] == 5
+
+
+def test_locked_database_skips_write_instead_of_raising(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch)
+    put(cache, clock, "a")
+    other = LLMCache(path=str(tmp_path / "cache.sqlite3"), timeout=0.1)
+    # 다른 학급 프로세스가 쓰기 잠금을 잡고 있는 상태
+    blocker = sqlite3.connect(str(tmp_path / "cache.sqlite3"))
+    blocker.execute("BEGIN IMMEDIATE")
+    other.put("m", "s", "b", "응답")
+    assert other.get("m", "s", "a") == "응답"
+    other.evict()
+    blocker.rollback()
+    other.put("m", "s", "b", "응답")
+    assert other.get("m", "s", "b") == "응답"
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from model_router import ModelRouter
+from homeroom_engine import HomeroomEngine
+
+
+def test_model_for_follows_latest_record_and_log(tmp_path):
+    log = str(tmp_path / "routing.jsonl")
+    router = ModelRouter(log_path=log, enabled=True)
+    assert router.model_for("김철수", "career") is None
+    router.record("homeroom_json", "gemini-2.0-flash", "start", True, "김철수")
+    router.record("career", "gemini-2.5-flash", "escalate", True, "김철수")
+    assert router.model_for("김철수", "career", "homeroom_json") == "gemini-2.5-flash"
+    assert router.model_for("김철수", "behavior", "homeroom_json") == "gemini-2.0-flash"
+    # 다음 실행에서도 기록에서 복원
+    assert ModelRouter(log_path=log, enabled=True).model_for("김철수", "career", "homeroom_json") == "gemini-2.5-flash"
+
+
+def test_homeroom_repair_uses_producing_model(tmp_path):
+    engine = HomeroomEngine.__new__(HomeroomEngine)
+    engine.router = ModelRouter(log_path=str(tmp_path / "routing.jsonl"), enabled=True)
+    engine.router.record("behavior", "gemini-2.5-pro", "escalate", False, "김철수")
+    models = []
+
+    def generate(system_instr, user_input, bypass_cache=False, model=None):
+        models.append(model)
+        return "1) 성실하게 참여하였음."
+    engine._generate = generate
+    text, report = engine.repair("behavior", "김철수", "성실하게 참여함.")
+    assert text == "성실하게 참여하였음." and report["ok"]
+    assert models == ["gemini-2.5-pro"]
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from near_duplicates import NearDuplicateIndex
+
+BASE = "탐구 활동에서 자료를 분석하고 결과를 발표하였음. 토론 과정에서 근거를 들어 의견을 제시하였음."
+
+
+def test_sync_only_reads_changed_rows(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "nd.sqlite3"))
+    assert index.sync({"가": {"course": BASE}, "나": {"course": BASE + " 추가함."}}, scope="s") == 2
+    buckets = index.buckets
+    assert index.sync({"가": {"course": BASE}, "나": {"course": BASE + " 추가함."}}, scope="s") == 0
+    # 버킷을 다시 만들지 않고 그대로 유지
+    assert index.buckets is buckets
+    assert index.refresh() == 0
+    assert [(p["a"][1], p["b"][1]) for p in index.pairs("s")] == [("가", "나")]
+
+
+def test_other_process_changes_are_applied(tmp_path):
+    path = str(tmp_path / "nd.sqlite3")
+    mine, other = NearDuplicateIndex(path), NearDuplicateIndex(path)
+    mine.sync({"가": {"course": BASE}}, scope="a")
+    other.sync({"나": {"course": BASE}}, scope="b")
+    mine.refresh()
+    assert len(mine.pairs("a")) == 1
+    # 다른 프로세스에서 빠진 학생은 삭제 표시로 전달
+    other.sync({}, scope="b")
+    assert mine.refresh() == 1
+    assert mine.pairs("a") == []
+
+
+def test_update_student_saves_single_area(tmp_path):
+    path = str(tmp_path / "nd.sqlite3")
+    index = NearDuplicateIndex(path)
+    index.sync({"가": {"course": BASE}, "나": {"course": "전혀 다른 본문으로 작성한 세특 내용임."}}, scope="s")
+    assert index.pairs("s") == []
+    assert index.update_student("나", {"course": BASE + " 추가함."}, scope="s") == 1
+    assert len(index.pairs("s")) == 1
+    assert len(NearDuplicateIndex(path).pairs("s")) == 1
@@ -0,0 +1,76 @@
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from observation_compactor import compact, chunk_records, dedupe, estimate_tokens
+from seteuk_config import COMPACT_TOKEN_LIMIT, COMPACT_MAP_PROMPT, COMPACT_REDUCE_PROMPT
+
+SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초"
+
+
+def record(i):
+    rnd = random.Random(i)
+    fact = "".join(rnd.choice(SYLLABLES) for _ in range(40))
+    day = datetime.date(2025, 3, 1) + datetime.timedelta(days=i)
+    return {"날짜": day.isoformat(), "대분류(상황)": "수업시간",
+            "핵심 키워드": f"키워드{i % 5}", "구체적 행동(Fact)": fact, "교사 메모": ""}
+
+
+class CachedSummarizer:
+    """입력이 같으면 같은 요약을 돌려주는 응답 캐시 흉내 (실제 요청 입력만 기록)"""
+
+    def __init__(self):
+        self.seen = {}
+        self.requests = []
+
+    def __call__(self, system_instr, user_input):
+        key = (system_instr, user_input)
+        if key not in self.seen:
+            self.requests.append(key)
+            self.seen[key] = "\n".join(f"- 요약 {len(self.seen)}-{j} " + "가" * 40 for j in range(20))
+        return self.seen[key]
+
+
+def test_short_history_is_not_summarized():
+    summarize = CachedSummarizer()
+    rows = [record(i) for i in range(5)] + [dict(record(0), 날짜="2026-12-01")]
+    text, stats = compact(rows, summarize)
+    assert summarize.requests == []
+    assert stats["entries"] == 5 and stats["chunks"] == 0
+    assert "(2회 관찰)" in text
+
+
+def test_append_only_resummarizes_tail_chunk():
+    rows = [record(i) for i in range(400)]
+    summarize = CachedSummarizer()
+    _, stats = compact(rows, summarize)
+    before = chunk_records(rows)
+    assert stats["chunks"] == len(before) > 3
+
+    summarize.requests.clear()
+    appended = rows + [record(400), record(401)]
+    after = chunk_records(appended)
+    # 앞 조각 경계는 그대로이고 새 기록은 마지막 조각(들)에만 들어감
+    assert after[:len(before) - 1] == before[:-1]
+    compact(appended, summarize)
+    mapped = [u for s, u in summarize.requests if s == COMPACT_MAP_PROMPT]
+    assert 1 <= len(mapped) <= len(after) - len(before) + 1
+
+
+def test_reduce_loop_ends_under_limit():
+    rows = [record(i) for i in range(400)]
+    summarize = CachedSummarizer()
+    text, stats = compact(rows, summarize)
+    assert stats["levels"] >= 1
+    assert any(s == COMPACT_REDUCE_PROMPT for s, _ in summarize.requests)
+    assert estimate_tokens(text) <= COMPACT_TOKEN_LIMIT
+    assert stats["tokens"] == estimate_tokens(text)
+
+
+def test_without_summarizer_clips_to_limit():
+    rows = [record(i) for i in range(400)]
+    text, stats = compact(rows)
+    assert stats["chunks"] == 0 and stats["entries"] == len(dedupe(rows))
+    assert estimate_tokens(text) <= COMPACT_TOKEN_LIMIT
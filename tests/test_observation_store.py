@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from observation_store import ObservationStore
+
+HEADER = "날짜,이름,대분류(상황),소분류(활동),구체적 행동(Fact),핵심 키워드,영향/반응,교사 메모\n"
+
+
+def test_detects_csv_change_after_import(tmp_path):
+    path = tmp_path / "obs.csv"
+    path.write_text(HEADER + "2026-03-02,김하나,수업,실험,가설을 세웠음,탐구,,\n", encoding="utf-8")
+    store = ObservationStore(str(tmp_path / "obs.sqlite3"))
+    store.import_csv(str(path))
+    assert not store.csv_changed(str(path))
+    assert not store.edited_since_import()
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2026-03-03,김하나,수업,발표,결과를 발표했음,소통,,\n")
+    assert store.csv_changed(str(path))
+    assert store.import_csv(str(path)) == 2
+    assert not store.csv_changed(str(path))
+
+
+def test_local_edit_is_tracked(tmp_path):
+    path = tmp_path / "obs.csv"
+    path.write_text(HEADER, encoding="utf-8")
+    store = ObservationStore(str(tmp_path / "obs.sqlite3"))
+    store.import_csv(str(path))
+    store.append({"이름": "박둘", "날짜": "2026-03-04"})
+    assert store.edited_since_import()
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import seteuk_core
+from seteuk_core import SeteukEngine
+
+HEADER = "날짜,이름,대분류(상황),소분류(활동),구체적 행동(Fact),핵심 키워드,영향/반응,교사 메모\n"
+ROWS = [
+    "2026-03-10,김민재,수업시간,실험,전압계 수치로 직렬과 병렬을 비교함,논리적 사고,긍정,설명이 명확함\n",
+    "2026-03-11,이서연,수업시간,토론,반론의 근거를 자료로 제시함,비판적 사고,긍정,\n",
+    "2026-03-15,김민재,수업시간,발표,온도를 변인으로 지목하여 재측정함,변인 통제,긍정,\n",
+]
+
+
+def setup(tmp_path, monkeypatch):
+    for attr, name in [("INPUT_CSV", "logs.csv"), ("STRUCTURED_JSON", "structured.json"),
+                       ("PREPROCESS_STATE", "state.json"), ("COURSE_RESULTS_JSON", "results.json")]:
+        monkeypatch.setattr(seteuk_core, attr, str(tmp_path / name))
+    monkeypatch.setattr(seteuk_core, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(seteuk_core, "USE_OBSERVATION_STORE", False)
+    return SeteukEngine.__new__(SeteukEngine)
+
+
+def write_csv(tmp_path, rows):
+    (tmp_path / "logs.csv").write_text(HEADER + "".join(rows), encoding="utf-8")
+
+
+def mark_generated(tmp_path):
+    """생성이 끝난 것처럼 현재 지문을 결과 파일에 기록"""
+    fps = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))["fingerprints"]
+    (tmp_path / "results.json").write_text(json.dumps({n: {"fingerprint": fp, "text": ""} for n, fp in fps.items()}),
+                                           encoding="utf-8")
+    return fps
+
+
+def rebuilt(engine, tmp_path):
+    """같은 CSV 를 처음부터 전처리한 지문 (증분 결과와 비교용)"""
+    engine.preprocess(incremental=False)
+    return json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))["fingerprints"]
+
+
+def test_fresh_then_append_only_dirties_new_rows(tmp_path, monkeypatch, capsys):
+    engine = setup(tmp_path, monkeypatch)
+    write_csv(tmp_path, ROWS[:2])
+    assert engine.preprocess() == 2
+    assert engine.dirty_students == {"김민재", "이서연"}
+    before = mark_generated(tmp_path)
+
+    # 변경 없이 다시 실행하면 새로 생성할 학생 없음
+    engine.preprocess()
+    assert engine.dirty_students == set()
+
+    write_csv(tmp_path, ROWS)
+    capsys.readouterr()
+    engine.preprocess()
+    assert "신규 1행 병합" in capsys.readouterr().out
+    assert engine.dirty_students == {"김민재"}
+    appended = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))["fingerprints"]
+    assert appended["이서연"] == before["이서연"]
+    # 뒤에 붙인 행만 파싱한 결과가 전체 재구성과 같은 지문이어야 함
+    assert appended == rebuilt(engine, tmp_path)
+
+
+def test_edited_prefix_falls_back_to_rebuild(tmp_path, monkeypatch, capsys):
+    engine = setup(tmp_path, monkeypatch)
+    write_csv(tmp_path, ROWS)
+    engine.preprocess()
+    mark_generated(tmp_path)
+
+    # 기존 행 수정 + 행 추가: 앞부분 해시가 달라 전체 재구성
+    edited = [ROWS[0], ROWS[1].replace("자료로", "통계 자료로"), ROWS[2],
+              "2026-03-20,박지훈,수업시간,실험,측정값의 오차 원인을 분석함,탐구력,긍정,\n"]
+    write_csv(tmp_path, edited)
+    capsys.readouterr()
+    engine.preprocess()
+    assert "신규" not in capsys.readouterr().out
+    assert engine.dirty_students == {"이서연", "박지훈"}
+    structured = json.loads((tmp_path / "structured.json").read_text(encoding="utf-8"))
+    assert "통계 자료로" in structured["이서연"][0]["구체적 행동(Fact)"]
+
+    # 행 삭제도 재구성으로 처리되어 빠진 학생이 결과에서 사라짐
+    write_csv(tmp_path, [ROWS[0], ROWS[2]])
+    engine.preprocess()
+    structured = json.loads((tmp_path / "structured.json").read_text(encoding="utf-8"))
+    assert set(structured) == {"김민재"}
+
+
+def test_missing_structured_json_forces_rebuild(tmp_path, monkeypatch, capsys):
+    engine = setup(tmp_path, monkeypatch)
+    write_csv(tmp_path, ROWS[:2])
+    engine.preprocess()
+    os.remove(tmp_path / "structured.json")
+    write_csv(tmp_path, ROWS)
+    capsys.readouterr()
+    assert engine.preprocess() == 2
+    assert "신규" not in capsys.readouterr().out
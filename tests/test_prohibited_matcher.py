@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import prohibited_matcher
+from prohibited_matcher import Automaton, ProhibitedMatcher
+
+
+def naive(categories, text):
+    """모든 위치에서 모든 단어를 비교하는 기준 구현"""
+    found = set()
+    for category, terms in categories.items():
+        for term in terms:
+            start = text.find(term)
+            while start != -1:
+                found.add((start, start + len(term), term))
+                start = text.find(term, start + 1)
+    return found
+
+
+def test_overlapping_terms_match_naive_scan():
+    categories = {"a": ["가나", "나다"], "b": ["가나다", "다"], "c": ["나나"]}
+    automaton = Automaton(categories)
+    for text in ["가나다", "가나나다가나다", "다다다", "가가나", "", "라마바"]:
+        got = {(s, e, automaton.terms[i][0]) for s, e, i in automaton.iter_matches(text)}
+        assert got == naive(categories, text), text
+
+
+def test_find_all_and_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(prohibited_matcher, "PROHIBITED_CATEGORIES", {"기본": ["가나", "나다", "가나다"]})
+    matcher = ProhibitedMatcher(lexicon_dir=str(tmp_path))
+    found = matcher.find_all("가나다")
+    assert sorted((m["start"], m["end"], m["term"]) for m in found) == [(0, 2, "가나"), (0, 3, "가나다"), (1, 3, "나다")]
+    assert all(m["category"] == "기본" for m in found)
+    # 중복 제거 + 등록 순서
+    assert matcher.scan("나다 가나다 가나") == ["가나", "나다", "가나다"]
+
+
+def test_lexicon_hot_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr(prohibited_matcher, "PROHIBITED_CATEGORIES", {"기본": ["가나"]})
+    matcher = ProhibitedMatcher(lexicon_dir=str(tmp_path))
+    assert matcher.scan("사교육 가나") == ["가나"]
+
+    (tmp_path / "사교육.txt").write_text("# 주석\n사교육\n\n", encoding="utf-8")
+    # 확인 간격 안에서는 다시 읽지 않음
+    matcher._checked = prohibited_matcher.time.monotonic()
+    assert not matcher.reload_if_changed()
+    matcher._checked = 0.0
+    assert matcher.reload_if_changed()
+    assert matcher.scan("사교육 가나") == ["가나", "사교육"]
+    assert matcher.find_all("사교육")[0]["category"] == "사교육"
+
+    # 파일이 그대로면 재구성하지 않음
+    automaton = matcher.automaton
+    matcher._checked = 0.0
+    assert not matcher.reload_if_changed()
+    assert matcher.automaton is automaton
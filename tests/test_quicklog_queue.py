@@ -0,0 +1,73 @@
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import quicklog_queue
+from quicklog_queue import QuickLogQueue
+
+
+class FakeSheet:
+    """생기부data 탭 B(이름)/AP(행동 관찰) 열만 흉내 낸 시트"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.notes = {}
+        self.reads = 0
+
+    def _get(self, a1):
+        col, start, end = re.match(r"'[^']+'!([A-Z]+)(\d+)(?::[A-Z]+(\d*))?", a1).groups()
+        if col == "B" and end is not None:
+            return {"values": [[n] for n in self.names]}
+        row = int(start)
+        value = self.names[row - 1] if col == "B" else self.notes.get((col, row), "")
+        return {"values": [[value]] if value else []}
+
+    def values_get(self, a1):
+        self.reads += 1
+        return self._get(a1)
+
+    def values_batch_get(self, ranges):
+        self.reads += 1
+        return {"valueRanges": [self._get(a1) for a1 in ranges]}
+
+    def values_batch_update(self, body):
+        for d in body["data"]:
+            col, row = re.match(r"'[^']+'!([A-Z]+)(\d+)", d["range"]).groups()
+            self.notes[(col, int(row))] = d["values"][0][0]
+
+
+def make_queue(tmp_path, sheet, monkeypatch):
+    monkeypatch.setattr(quicklog_queue, "get_shared_snapshot", lambda: type("S", (), {"invalidate": lambda self, sid: None})())
+    return QuickLogQueue(lambda: sheet, path=str(tmp_path / "q.sqlite3"), flush_seconds=3600)
+
+
+def test_shifted_rows_are_requeued_not_written(tmp_path, monkeypatch):
+    sheet = FakeSheet(["이름", "김철수", "이영희"])
+    queue = make_queue(tmp_path, sheet, monkeypatch)
+    queue.enqueue("이영희", "behavior_raw", "첫 기록")
+    assert queue.flush() == 1
+    assert sheet.notes[("AP", 3)] == "첫 기록"
+
+    # 위에 학생 행이 삽입되어 이영희가 4행으로 밀림 (캐시된 색인은 3행)
+    sheet.names.insert(2, "박민수")
+    queue.enqueue("이영희", "behavior_raw", "둘째 기록")
+    assert queue.flush() == 0
+    assert sheet.notes[("AP", 3)] == "첫 기록"
+    assert queue.pending_count() == 1
+
+    # 같은 조회로 다시 만든 색인으로 다음 반영 시 올바른 행에 기록
+    assert queue.flush() == 1
+    assert sheet.notes[("AP", 4)] == "둘째 기록"
+    assert queue.pending_count() == 0
+
+
+def test_flush_reads_names_and_cells_in_one_request(tmp_path, monkeypatch):
+    sheet = FakeSheet(["이름", "김철수"])
+    queue = make_queue(tmp_path, sheet, monkeypatch)
+    queue.enqueue("김철수", "behavior_raw", "기록")
+    queue.flush()
+    reads = sheet.reads
+    queue.enqueue("김철수", "career_raw", "기록")
+    queue.flush()
+    assert sheet.reads == reads + 1
@@ -0,0 +1,123 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gspread
+import seteuk_core
+from seteuk_core import SeteukEngine
+
+
+def apply(current, updates):
+    """A1 범위 갱신을 격자에 적용한 결과 (시트에 쓴 결과 흉내)"""
+    grid = [list(r) for r in current]
+    for u in updates:
+        start, end = u["range"].split(":")
+        r, c1 = gspread.utils.a1_to_rowcol(start)
+        _, c2 = gspread.utils.a1_to_rowcol(end)
+        assert c2 - c1 + 1 == len(u["values"][0])
+        while len(grid) < r:
+            grid.append([])
+        row = grid[r - 1]
+        row += [""] * (c2 - len(row))
+        row[c1 - 1:c2] = u["values"][0]
+    width = max(len(r) for r in grid)
+    return [[str(v) for v in r] + [""] * (width - len(r)) for r in grid]
+
+
+def padded(rows, width, height):
+    return [list(r) + [""] * (width - len(r)) for r in rows] + [[""] * width] * (height - len(rows))
+
+
+def test_diff_ranges_only_changed_cells():
+    current = [["성명", "교과"], ["김", "A"], ["이", "B"]]
+    desired = [["성명", "교과"], ["김", "A"], ["이", "C"]]
+    assert SeteukEngine.diff_ranges(current, desired) == [{"range": "B3:B3", "values": [["C"]]}]
+    assert SeteukEngine.diff_ranges(desired, desired) == []
+
+
+def test_diff_ranges_clears_removed_rows():
+    current = [["성명", "교과", "상태"], ["김", "A", "ok"], ["이", "B", "ok"], ["박", "C", "ok"]]
+    desired = [["성명", "교과", "상태"], ["김", "A", "ok"]]
+    updates = SeteukEngine.diff_ranges(current, desired)
+    assert updates == [{"range": "A3:C3", "values": [["", "", ""]]}, {"range": "A4:C4", "values": [["", "", ""]]}]
+    assert apply(current, updates) == padded(desired, 3, 4)
+
+
+def test_diff_ranges_class_grows_and_widens():
+    current = [["성명", "교과"], ["김", "A"]]
+    desired = [["성명", "교과", "상태"], ["김", "A", "ok"], ["이", "B", "ok"], ["박", 3, "ok"]]
+    updates = SeteukEngine.diff_ranges(current, desired)
+    assert updates[0] == {"range": "C1:C1", "values": [["상태"]]}
+    assert updates[-1] == {"range": "A4:C4", "values": [["박", "3", "ok"]]}
+    assert apply(current, updates) == [[str(v) for v in r] for r in desired]
+
+
+class FakeSheet:
+    def __init__(self, values):
+        self.values = [list(r) for r in values]
+        self.id = 1
+        self.row_count = len(values)
+        self.col_count = max(len(r) for r in values)
+        self.calls = []
+
+    def get_all_values(self):
+        return self.values
+
+    def resize(self, rows, cols):
+        self.row_count, self.col_count = rows, cols
+
+    def batch_update(self, updates):
+        self.calls.append(updates)
+        self.values = apply(self.values, updates)
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheet):
+        self.sheet = sheet
+
+    def worksheet(self, title):
+        return self.sheet
+
+    def batch_update(self, body):
+        pass
+
+
+class FakeSnapshot:
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.stored = {}
+
+    def load(self, client, sid, key, fetch, offline_fallback=True):
+        return fetch(), None
+
+    def load_offline(self, sid, key):
+        return self.stored.get(key)
+
+    def put(self, sid, key, revision, value):
+        self.stored[key] = value
+
+    def revision(self, client, sid):
+        return "r1"
+
+
+def test_sync_all_chunks_preserve_every_changed_run(monkeypatch):
+    engine = SeteukEngine.__new__(SeteukEngine)
+    data = {f"학생{i:02d}": {"course": f"교과 {i}하였음.", "career": "", "autonomous": "", "behavior": ""} for i in range(7)}
+    desired = engine.build_result_rows(data)
+    # 기존 시트: 일부 학생 본문이 다르고, 학급에서 빠진 학생 2명 행이 남아 있음
+    current = [list(r) for r in desired]
+    for r in (2, 3, 5):
+        current[r][1] = "이전 본문"
+    current += [["전학생1", "x", "", "", "", ""], ["전학생2", "y", "", "", "", ""]]
+    sheet = FakeSheet(current)
+    engine.clients = type("C", (), {"spreadsheet": lambda self, sid: FakeSpreadsheet(sheet)})()
+    engine.client_sheets = None
+    monkeypatch.setattr(seteuk_core, "get_shared_snapshot", lambda: FakeSnapshot(sheet))
+    monkeypatch.setattr(seteuk_core, "SYNC_CHUNK_RANGES", 2)
+
+    engine.sync_all(data, upsert=True)
+    # 변경 범위 5개가 2개씩 3번에 나뉘어 전송되고, 적용 결과는 원하는 값 + 빈 행
+    assert [len(c) for c in sheet.calls] == [2, 2, 1]
+    ranges = [u["range"] for c in sheet.calls for u in c]
+    assert len(ranges) == len(set(ranges)) == 5
+    assert sheet.values == padded(desired, 6, len(current))
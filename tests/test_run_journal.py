@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import run_journal
+from run_journal import RunJournal, latest_run_id
+
+
+def test_latest_run_id_ignores_other_jsonl(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_journal, "RUNS_DIR", str(tmp_path))
+    assert latest_run_id() is None
+    RunJournal("20260101_000000")
+    # 다른 기록(예: 라우팅 기록)이 같은 폴더에 있어도 실행 기록부로 취급하지 않음
+    (tmp_path / "routing.jsonl").write_text('{"task": "course", "model": "m"}\n', encoding="utf-8")
+    (tmp_path / "zz_empty.jsonl").write_text("", encoding="utf-8")
+    assert latest_run_id() == "20260101_000000"
+
+
+def test_truncated_last_line_does_not_swallow_next_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_journal, "RUNS_DIR", str(tmp_path))
+    journal = RunJournal("run")
+    journal.record("course/김철수", "본문.")
+    # 기록 도중 중단되어 마지막 줄이 잘림
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "unit", "unit": "course/이영')
+
+    resumed = RunJournal("run")
+    assert resumed.completed() == {"course/김철수": "본문."}
+    resumed.record("course/이영희", "다른 본문.")
+    assert RunJournal("run").completed() == {"course/김철수": "본문.", "course/이영희": "다른 본문."}
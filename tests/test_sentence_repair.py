@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentence_repair import repair_section
+
+
+def test_splices_in_place_and_keeps_separators():
+    text = "평균 3.5점을 받았음.\n\n실험을 설계함.\n마무리하였음."
+    out, report = repair_section(text, "", 1500, lambda s, u: "1) 실험을 설계하였음.")
+    assert out == "평균 3.5점을 받았음.\n\n실험을 설계하였음.\n마무리하였음."
+    assert report == {"attempts": 1, "repaired": 1, "mismatches": 0, "calls": 1, "ok": True}
+
+
+def test_count_mismatch_is_not_a_retry():
+    def generate(system_instr, user_input):
+        # 여러 문장 요청에는 개수가 맞지 않는 응답, 문장별 요청에는 정상 응답
+        return "하나만" if "\n" in user_input else "1) 고쳐 썼음."
+
+    out, report = repair_section("설계함.\n정리함.", "", 1500, generate)
+    assert out == "고쳐 썼음.\n고쳐 썼음."
+    assert report["attempts"] == 0 and report["mismatches"] == 1 and report["ok"]
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import text_rules
+
+
+def test_decimal_point_is_not_sentence_end():
+    text = "평균 3.5점을 받았음. 탐구하였음."
+    assert text_rules.split_sentences(text) == ["평균 3.5점을 받았음.", "탐구하였음."]
+    assert text_rules.validate(text)["ok"]
+
+
+def test_version_numbers_stay_in_one_sentence():
+    text = "파이썬 3.11.7 과 라이브러리 1.2.3 버전을 비교하였음.\n보고서를 작성하였음."
+    assert text_rules.split_sentences(text) == ["파이썬 3.11.7 과 라이브러리 1.2.3 버전을 비교하였음.", "보고서를 작성하였음."]
+    assert text_rules.validate(text)["ok"]
+
+
+def test_bad_ending_still_detected():
+    diagnostics = text_rules.validate("실험을 설계함. 결과를 분석하였음.")
+    assert [b["sentence"] for b in diagnostics["bad_endings"]] == ["실험을 설계함."]
+
+
+def test_spans_keep_separators():
+    text = "첫 문장 3.5배 증가하였음.\n\n둘째 문장이었음.  셋째였음."
+    spans = text_rules.sentence_spans(text)
+    assert [text[s:e] for s, e in spans] == ["첫 문장 3.5배 증가하였음.", "둘째 문장이었음.", "셋째였음."]
+
+
+def test_partial_waits_for_decimal_digits():
+    assert text_rules.validate_partial("탐구하였음. 평균 3.")["ok"]
+
+
+def test_preamble_removed_only_at_start():
+    text = "다음은 작성한 세특입니다.\n실험을 설계하였음.\n다음은 보고서를 정리하였음."
+    assert text_rules.normalize(text) == "실험을 설계하였음.\n다음은 보고서를 정리하였음."
+
+
+def test_name_particle_needs_boundary():
+    assert text_rules.normalize("민수가장 적극적으로 참여하였음.", "민수") == "가장 적극적으로 참여하였음."
+    assert text_rules.normalize("민수의견을 존중하였음.", "민수") == "의견을 존중하였음."
+    assert text_rules.normalize("민수는 실험을 설계하였음. 민수의 보고서가 돋보였음.", "민수") == "실험을 설계하였음. 보고서가 돋보였음."
+    assert text_rules.normalize("민수가 발표하였음.", "민수") == "발표하였음."
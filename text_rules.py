@@ -0,0 +1,134 @@
+import re
+from functools import lru_cache
+from prohibited_matcher import get_matcher
+from seteuk_config import SENTENCE_ENDING_PATTERN
+
+# 이름 뒤에 붙는 조사 (받침 유무 변형 포함)
+NAME_PARTICLES = ("은", "는", "이", "가", "의", "이는", "이가", "이의")
+
+# 이름과 무관한 정제 패턴 (한 번의 순회에서 모두 제거되도록 하나의 정규식으로 결합)
+_BASE_PATTERNS = [
+    r'^\*\*.*?\*\*.*$',           # **볼드 제목** 줄 전체
+    r'^\[.*?\]',                  # 줄 시작 [대괄호태그]
+    r'\A\s*다음은.*?입니다\.?\s*',   # 서두 군소리 (본문 맨 앞만, 본문 중 '다음은' 으로 시작하는 줄은 유지)
+    r'이 학생은', r'학생은', r'본인은',  # 호칭
+]
+_LEADING_PARTICLE = re.compile(r'^[은는이가](?:\s+|$)')
+_EXTRA_SPACES = re.compile(r'[ \t]{2,}')
+# 문장 끝: 숫자 사이가 아닌 마침표(소수점/버전 번호 '3.5', '1.2.3' 제외), 공백·본문 끝 앞의 마침표, 줄바꿈
+_SENTENCE_END = re.compile(r'(?<!\d)\.(?!\d)|\.(?=\s|$)|\n')
+_ENDING = re.compile(SENTENCE_ENDING_PATTERN)
+
+
+@lru_cache(maxsize=1024)
+def _cleanup_pattern(student_name):
+    """학생별 정제 정규식 (이름+조사 포함, 학생당 1회 컴파일)"""
+    patterns = list(_BASE_PATTERNS)
+    if student_name:
+        particles = "|".join(sorted(NAME_PARTICLES, key=len, reverse=True))
+        # 조사는 뒤에 글자가 이어지지 않을 때만 함께 제거 ('민수가장' 의 '가장' 은 유지)
+        patterns.insert(3, f"{re.escape(student_name)}(?:(?:{particles})(?!\\w))?")
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags=re.MULTILINE)
+
+
+def normalize(text, student_name=""):
+    """군소리/마크다운/이름·호칭 제거 및 앞뒤 따옴표·조사 정리"""
+    text = _cleanup_pattern(student_name).sub('', text or "")
+    text = _EXTRA_SPACES.sub(' ', text).strip().strip('"').strip("'").strip()
+    return _LEADING_PARTICLE.sub('', text)
+
+
+def sentence_spans(text):
+    """문장별 (시작, 끝) 위치 (앞뒤 공백 제외, 마침표만 있는 조각은 건너뜀)
+
+    문장 사이의 공백/줄바꿈은 위치 밖에 남으므로, 문장만 바꿔 끼워도 나머지 본문은 그대로 유지됩니다.
+    """
+    spans, start = [], 0
+    for m in _SENTENCE_END.finditer(text):
+        _add_span(spans, text, start, m.end() if m.group() == "." else m.start())
+        start = m.end()
+    _add_span(spans, text, start, len(text))
+    return spans
+
+
+def _add_span(spans, text, start, end):
+    piece = text[start:end]
+    if not piece.strip(". \t\r\n"):
+        return
+    start += len(piece) - len(piece.lstrip())
+    end -= len(piece) - len(piece.rstrip())
+    spans.append((start, end))
+
+
+def split_sentences(text):
+    """본문을 문장 단위로 분리 (마침표/줄바꿈 기준, 소수점은 문장 끝으로 보지 않음)"""
+    return [text[s:e] for s, e in sentence_spans(text)]
+
+
+@lru_cache(maxsize=8192)
+def _validate(text, automaton):
+    prohibited = [
+        {"start": start, "end": end, "term": automaton.terms[idx][0], "category": automaton.terms[idx][1]}
+        for start, end, idx in automaton.iter_matches(text)
+    ]
+    bad_endings = [
+        {"index": i, "sentence": sentence}
+        for i, sentence in enumerate(split_sentences(text)) if not _ENDING.search(sentence)
+    ]
+    return {"prohibited": prohibited, "bad_endings": bad_endings, "ok": not prohibited and not bad_endings}
+
+
+def validate(text):
+    """정제된 본문 검증 결과 (금지어 위치/분류, 종결 어미 위반 문장)
+
+    같은 본문은 다시 검사하지 않도록 본문 + 현재 금지어 사전 기준으로 메모이즈합니다.
+    반환값은 공유되므로 수정하지 마십시오.
+    """
+    return _validate(text or "", get_matcher().automaton)
+
+
+def validate_partial(text):
+    """스트리밍 중간 검증: 마침표로 끝난 문장만 문장 단위로 검사
+
+    문장별로 메모이즈되므로 조각이 도착할 때마다 새로 끝난 문장만 실제로 검사합니다.
+    금지어 위치(start/end)는 해당 문장 기준입니다.
+    """
+    sentences = split_sentences(text or "")
+    # 아직 끝나지 않은 마지막 문장 (마침표 없음, 또는 '평균 3.' 처럼 소수점 뒤 숫자가 아직 안 온 경우) 제외
+    if sentences and (not sentences[-1].endswith(".") or sentences[-1][-2:-1].isdigit()):
+        sentences = sentences[:-1]
+    prohibited, bad_endings = [], []
+    for i, sentence in enumerate(sentences):
+        diagnostics = validate(sentence)
+        prohibited.extend(diagnostics["prohibited"])
+        if diagnostics["bad_endings"]:
+            bad_endings.append({"index": i, "sentence": sentence})
+    return {"prohibited": prohibited, "bad_endings": bad_endings, "ok": not prohibited and not bad_endings}
+
+
+def clean_and_validate(text, student_name=""):
+    """정제 + 검증 (정제된 본문, 진단 결과)"""
+    text = normalize(text, student_name)
+    return text, validate(text)
+
+
+def clean_and_validate_batch(items):
+    """[(본문, 학생 이름), ...] 일괄 정제/검증"""
+    return [clean_and_validate(text, name) for text, name in items]
+
+
+def prohibited_terms(diagnostics):
+    """진단 결과의 금지어 목록 (중복 제거, 등장 순서)"""
+    return list(dict.fromkeys(m["term"] for m in diagnostics["prohibited"]))
+
+
+def format_status(diagnostics):
+    """시트 '최종 검증 상태' 표기용 문자열"""
+    if diagnostics["ok"]:
+        return "검증완료"
+    parts = []
+    if diagnostics["prohibited"]:
+        parts.append(f"⚠️금지어주의({','.join(prohibited_terms(diagnostics))})")
+    if diagnostics["bad_endings"]:
+        parts.append(f"⚠️문체주의({len(diagnostics['bad_endings'])}문장)")
+    return " ".join(parts)